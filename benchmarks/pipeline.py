@@ -0,0 +1,223 @@
+"""
+Benchmark the scrape -> store -> recommend pipeline against simulated clusters and compare runs.
+
+Each cluster size is measured in a fresh interpreter (so peak RSS is per size) working in a
+temporary directory with its own database. Measured per size:
+
+  cycle_seconds              median monitor_resources pass over every namespace (scrape, store, history)
+  autoscale_seconds          median auto_scale pass (dry run, HPAs are planned but not applied)
+  insert_rows_per_second     UsageWriter throughput when writing the seeded history
+  average_query_seconds      get_bulk_average_usage over a 10 minute window, all namespaces
+  history_query_seconds      get_bulk_historical_usage over a 60 minute window, all namespaces
+  recommend_pods_per_second  building the columns plus recommend_batch
+  peak_rss_mb                peak resident set size of the process
+
+Usage:
+  python benchmarks/pipeline.py run [--sizes 100,1000,10000,50000] [--output results.json]
+  python benchmarks/pipeline.py compare baseline.json results.json [--threshold 0.2]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+PODS_PER_NAMESPACE = 500
+
+# Direction of each metric: True if higher is better
+METRICS = {
+    "cycle_seconds": False,
+    "autoscale_seconds": False,
+    "insert_rows_per_second": True,
+    "average_query_seconds": False,
+    "history_query_seconds": False,
+    "recommend_pods_per_second": True,
+    "peak_rss_mb": False,
+}
+
+DEFAULT_THRESHOLD = 0.2
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+
+
+def _elapsed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def measure(pods, cycles, history, seed):
+    """
+    Measure one cluster size in the current directory and return {metric: value}.
+    """
+    from k8s_monitor import monitor
+    from k8s_monitor.dashboard import Dashboard
+    from k8s_monitor.mock_k8s import set_mock_cluster
+    from k8s_monitor.simulator import SimulatedCluster
+    from k8s_monitor.storage.database import init_db, get_bulk_average_usage, get_bulk_historical_usage, UsageWriter
+    from k8s_monitor.recommendation import recommend_batch, averages_columns, history_columns
+
+    namespaces = max(1, pods // PODS_PER_NAMESPACE)
+    cluster = SimulatedCluster(namespaces, pods // namespaces, seed=seed)
+    set_mock_cluster(cluster)
+    init_db()
+
+    # Seed 'history' minutes of one-per-minute samples so window queries have data to read
+    now = int(time.time())
+    rows = 0
+    started = time.perf_counter()
+    with UsageWriter(max_rows=50000) as writer:
+        for minute in range(history, 0, -1):
+            timestamp = now - minute * 60
+            cpu, memory = cluster.usage(timestamp)
+            for i, pod in enumerate(pod for ns in cluster.namespaces for pod in cluster.pods[ns]):
+                writer.log(pod.metadata.name, pod.metadata.namespace, float(cpu[i]), int(memory[i]), timestamp)
+                rows += 1
+    insert_seconds = time.perf_counter() - started
+
+    # Rows go to a dashboard that is never drawn: rendering a terminal table of every pod
+    # would dwarf the pipeline being measured
+    dashboard = Dashboard()
+    with open(os.devnull, "w") as devnull:
+        monitor.console.file = devnull
+        with contextlib.redirect_stdout(devnull):
+            cycle_times = [_elapsed(monitor.monitor_resources, use_mock=True, all_namespaces=True, dashboard=dashboard)[0]
+                           for _ in range(cycles)]
+            autoscale_times = [_elapsed(monitor.auto_scale, use_mock=True, all_namespaces=True, dry_run=True)[0]
+                               for _ in range(cycles)]
+
+    average_seconds, averages = _elapsed(get_bulk_average_usage, cluster.namespaces, 10)
+    history_seconds, histories = _elapsed(get_bulk_historical_usage, cluster.namespaces, 60)
+
+    keys = [(ns, pod.metadata.name) for ns in cluster.namespaces for pod in cluster.pods[ns]]
+    policy = {"cpu_threshold": 60, "memory_threshold": 60, "max_replicas_change": 5}
+    started = time.perf_counter()
+    avg_cpu, avg_memory = averages_columns(keys, averages)
+    cpu, memory, counts = history_columns(keys, histories)
+    recommend_batch(keys, avg_cpu, avg_memory, cpu, memory, counts, policy)
+    recommend_seconds = time.perf_counter() - started
+
+    return {
+        "pods": len(keys),
+        "namespaces": namespaces,
+        "cycle_seconds": statistics.median(cycle_times),
+        "autoscale_seconds": statistics.median(autoscale_times),
+        "insert_rows_per_second": rows / insert_seconds,
+        "average_query_seconds": average_seconds,
+        "history_query_seconds": history_seconds,
+        "recommend_pods_per_second": len(keys) / recommend_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _measure_in_subprocess(pods, args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory() as cwd:
+        # Keep the user's config files and database out of the measurement
+        env["K8S_MONITOR_CONFIG_DIR"] = cwd
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "measure", "--pods", str(pods), "--cycles", str(args.cycles),
+             "--history", str(args.history), "--seed", str(args.seed)],
+            cwd=cwd, env=env, stdout=subprocess.PIPE, text=True,
+        )
+    if result.returncode != 0:
+        raise SystemExit(f"Measuring {pods} pods failed with exit code {result.returncode}")
+    return json.loads(result.stdout)
+
+
+def run(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cycles": args.cycles,
+        "history": args.history,
+        "seed": args.seed,
+        "results": {},
+    }
+    for pods in sizes:
+        results = report["results"][str(pods)] = _measure_in_subprocess(pods, args)
+        print(f"{pods:>6} pods  cycle {results['cycle_seconds']:8.3f} s  autoscale {results['autoscale_seconds']:8.3f} s  "
+              f"insert {results['insert_rows_per_second']:10.0f} rows/s  "
+              f"avg query {results['average_query_seconds'] * 1000:8.1f} ms  "
+              f"history query {results['history_query_seconds'] * 1000:8.1f} ms  "
+              f"recommend {results['recommend_pods_per_second']:10.0f} pods/s  rss {results['peak_rss_mb']:7.1f} MB")
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+def compare(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    with open(args.current) as file:
+        current = json.load(file)["results"]
+
+    regressions = 0
+    for size in sorted(set(baseline) & set(current), key=int):
+        for metric, higher_is_better in METRICS.items():
+            before = baseline[size].get(metric)
+            after = current[size].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            # Positive 'worse' means the metric moved in the bad direction
+            worse = -change if higher_is_better else change
+            regressed = worse > args.threshold
+            regressions += regressed
+            status = "REGRESSION" if regressed else "improved" if worse < -args.threshold else "ok"
+            print(f"{size:>6} pods  {metric:26} {before:14.4f} -> {after:14.4f}  {change:+7.1%}  {status}")
+
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Measure every cluster size and write the results as JSON")
+    run_parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated pod counts")
+    run_parser.add_argument("--output", default="pipeline_results.json")
+
+    measure_parser = commands.add_parser("measure", help="Measure one size in this directory and print JSON")
+    measure_parser.add_argument("--pods", type=int, required=True)
+
+    for command_parser in (run_parser, measure_parser):
+        command_parser.add_argument("--cycles", type=int, default=3, help="Monitoring and auto-scaling passes per size")
+        command_parser.add_argument("--history", type=int, default=10, help="Minutes of samples per pod seeded before measuring")
+        command_parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline and fail on regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Relative change counted as a regression (default: 0.2)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "measure":
+        print(json.dumps(measure(args.pods, args.cycles, args.history, args.seed)))
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
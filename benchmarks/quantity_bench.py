@@ -0,0 +1,68 @@
+"""
+Benchmark the Kubernetes quantity parser against a naive regex-per-call parser.
+
+Usage: python benchmarks/quantity_bench.py [--samples 100000]
+"""
+import argparse
+import random
+import re
+import time
+
+from k8s_monitor.utils.quantity import parse_cpu, parse_memory
+
+_NAIVE_CPU = {'': 1000, 'm': 1, 'u': 1e-3, 'n': 1e-6}
+_NAIVE_MEMORY = {'': 1, 'k': 10**3, 'M': 10**6, 'G': 10**9, 'Ki': 2**10, 'Mi': 2**20, 'Gi': 2**30}
+
+
+def naive_parse(quantity, suffixes):
+    match = re.match(r'^([+-]?[0-9.]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$', quantity.strip())
+    if not match or match.group(2) not in suffixes:
+        raise ValueError(quantity)
+    return float(match.group(1)) * suffixes[match.group(2)]
+
+
+def make_samples(count, seed=42):
+    """
+    Generate metrics-server style quantities: CPU mostly in nanocores, memory mostly in Ki.
+    """
+    rng = random.Random(seed)
+    cpu = [rng.choice((f"{rng.randint(1, 4 * 10**9)}n", f"{rng.randint(1, 4000)}m", str(rng.randint(1, 4))))
+           for _ in range(count)]
+    memory = [rng.choice((f"{rng.randint(1, 8 * 2**20)}Ki", f"{rng.randint(1, 8192)}Mi", str(rng.randint(1, 2**33))))
+              for _ in range(count)]
+    return cpu, memory
+
+
+def timed(label, func, values, baseline=None):
+    started = time.perf_counter()
+    for value in values:
+        func(value)
+    elapsed = time.perf_counter() - started
+    speedup = f"  ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"{label:<24} {elapsed * 1000:9.1f} ms  {len(values) / elapsed / 1e6:6.2f} M/s{speedup}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100000)
+    args = parser.parse_args()
+
+    cpu, memory = make_samples(args.samples)
+
+    # Both parsers must agree before timing means anything
+    for value in cpu[:1000]:
+        assert abs(parse_cpu(value) - naive_parse(value, _NAIVE_CPU)) < 1e-6, value
+    for value in memory[:1000]:
+        assert parse_memory(value) == int(naive_parse(value, _NAIVE_MEMORY)), value
+
+    print(f"{args.samples} CPU samples")
+    baseline = timed("naive regex", lambda v: naive_parse(v, _NAIVE_CPU), cpu)
+    timed("parse_cpu", parse_cpu, cpu, baseline)
+    print(f"{args.samples} memory samples")
+    baseline = timed("naive regex", lambda v: naive_parse(v, _NAIVE_MEMORY), memory)
+    timed("parse_memory", parse_memory, memory, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark the vectorized scaling recommendations against the per-pod loop and check they agree.
+
+Usage: python benchmarks/recommendation_bench.py [--pods 10000] [--samples 240]
+"""
+import argparse
+import random
+import time
+
+from k8s_monitor.recommendation import recommend, recommend_batch, averages_columns, history_columns
+
+POLICY = {"cpu_threshold": 60, "memory_threshold": 60, "max_replicas_change": 5}
+
+
+def make_usage(pods, samples, seed=42):
+    """
+    Generate per-pod window averages and histories with a mix of idle, quiet and busy pods.
+    """
+    rng = random.Random(seed)
+    keys = [("bench", f"pod-{i}") for i in range(pods)]
+    averages = {}
+    histories = {}
+    for key in keys:
+        level = rng.choice((0, 20, 60, 120))
+        if rng.random() < 0.05:
+            continue
+        averages[key] = (level * rng.random(), level * rng.random())
+        histories[key] = [
+            {"cpu": rng.uniform(0, 2 * level), "memory": rng.uniform(0, 2 * level)}
+            for _ in range(rng.randint(0, samples))
+        ]
+    return keys, averages, histories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pods", type=int, default=10000)
+    parser.add_argument("--samples", type=int, default=240)
+    args = parser.parse_args()
+
+    keys, averages, histories = make_usage(args.pods, args.samples)
+
+    started = time.perf_counter()
+    expected = [recommend(key, *averages.get(key, (None, None)), POLICY, histories.get(key)) for key in keys]
+    loop_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    avg_cpu, avg_memory = averages_columns(keys, averages)
+    cpu, memory, counts = history_columns(keys, histories)
+    columns_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    decisions = recommend_batch(keys, avg_cpu, avg_memory, cpu, memory, counts, POLICY)
+    batch_time = time.perf_counter() - started
+
+    mismatches = sum(
+        1 for reference, decision in zip(expected, decisions)
+        if (reference.action, reference.replicas) != (decision.action, decision.replicas)
+    )
+
+    print(f"{args.pods} pods, up to {args.samples} samples each")
+    print(f"per-pod loop       {loop_time * 1000:9.1f} ms")
+    print(f"build columns      {columns_time * 1000:9.1f} ms")
+    print(f"recommend_batch    {batch_time * 1000:9.1f} ms  ({loop_time / batch_time:.0f}x)")
+    print(f"mismatched decisions: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
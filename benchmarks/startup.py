@@ -0,0 +1,90 @@
+"""
+Check CLI startup time against per-command budgets and fail on regressions.
+
+Each command runs in a fresh interpreter with -X importtime. The benchmark fails when the
+median wall time exceeds the command's budget, or when a command imports a heavy module
+it should not need (e.g. view-config loading the Kubernetes client).
+
+Usage: python benchmarks/startup.py [--repeat 5] [--scale 1.0]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ("kubernetes", "matplotlib", "numpy", "rich", "requests")
+
+# (command, wall-time budget in ms, heavy modules the command may import)
+CASES = [
+    (["--help"], 200, ()),
+    (["view-config"], 200, ()),
+    (["view-autoscaling-policy"], 200, ()),
+    (["view-namespaces"], 200, ()),
+    (["monitor", "--help"], 200, ()),
+    (["run", "--help"], 200, ()),
+    (["compact-db", "--help"], 200, ()),
+]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(args, cwd):
+    """
+    Run one CLI command; return its wall time in ms and the set of top-level modules it imported.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "k8s_monitor.cli", *args],
+        cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"k8s_monitor.cli {' '.join(args)} exited with {result.returncode}")
+
+    # Lines look like "import time:   self [us] | cumulative | <indent>module.name"
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            modules.add(name.split(".", 1)[0])
+    return elapsed, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. on slow CI machines")
+    args = parser.parse_args()
+
+    failures = 0
+    # Run from an empty directory so no local config files or database are touched
+    with tempfile.TemporaryDirectory() as cwd:
+        for command, budget, allowed in CASES:
+            times = []
+            imported = set()
+            for _ in range(args.repeat):
+                elapsed, modules = run_once(command, cwd)
+                times.append(elapsed)
+                imported |= modules
+
+            median = statistics.median(times)
+            limit = budget * args.scale
+            unexpected = sorted(set(HEAVY_MODULES) & imported - set(allowed))
+            ok = median <= limit and not unexpected
+            failures += not ok
+
+            label = " ".join(command)
+            print(f"{label:28} {median:7.1f} ms  (budget {limit:5.0f} ms)  {'ok' if ok else 'REGRESSION'}")
+            if unexpected:
+                print(f"{'':28} imports {', '.join(unexpected)}")
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
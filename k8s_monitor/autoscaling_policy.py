@@ -1,24 +1,25 @@
-import json
-import os
+from k8s_monitor.config_store import default_store
 
 AUTOSCALING_POLICY_FILE = "autoscaling_policy.json"
 
+AUTOSCALING_POLICY_SCHEMA = {
+    'cpu_threshold': ((int, float), lambda value: value > 0),
+    'memory_threshold': ((int, float), lambda value: value > 0),
+    'max_replicas_change': (int, lambda value: value >= 0),
+    'scaling_strategy': (str, lambda value: value in ('static', 'dynamic')),
+}
+
 def load_autoscaling_policy():
     """
     Load the auto-scaling policy from the autoscaling_policy.json file.
     """
-    if os.path.exists(AUTOSCALING_POLICY_FILE):
-        with open(AUTOSCALING_POLICY_FILE, 'r') as file:
-            return json.load(file)
-    else:
-        return {}
+    return default_store().load(AUTOSCALING_POLICY_FILE, AUTOSCALING_POLICY_SCHEMA)
 
 def save_autoscaling_policy(policy):
     """
     Save the auto-scaling policy to the autoscaling_policy.json file.
     """
-    with open(AUTOSCALING_POLICY_FILE, 'w') as file:
-        json.dump(policy, file, indent=4)
+    default_store().save(AUTOSCALING_POLICY_FILE, policy, AUTOSCALING_POLICY_SCHEMA)
 
 def view_autoscaling_policy():
     """
@@ -35,8 +36,7 @@ def reset_autoscaling_policy():
     """
     Reset the auto-scaling policy by deleting the autoscaling_policy.json file.
     """
-    if os.path.exists(AUTOSCALING_POLICY_FILE):
-        os.remove(AUTOSCALING_POLICY_FILE)
+    if default_store().remove(AUTOSCALING_POLICY_FILE):
         print("Auto-scaling policy reset successfully.")
     else:
         print("No auto-scaling policy file found to reset.")
@@ -1,11 +1,76 @@
+import contextlib
+import os
 import click
-from k8s_monitor.monitor import monitor_resources, auto_scale as auto_scale_command, get_historical_usage
-from k8s_monitor.utils.email_alerts import send_email_alert
+# Only light modules are imported here; each command imports what it needs (the monitor pulls
+# in the Kubernetes client, rich and numpy, visualize pulls in matplotlib) so that quick
+# commands like view-config start fast.
+from k8s_monitor.defaults import DEFAULT_CONCURRENCY, DEFAULT_NAMESPACE_TIMEOUT, DEFAULT_METRICS_HOST, DEFAULT_PAGE_SIZE
 from k8s_monitor.config import load_config, save_config, view_config as view_current_config, reset_config as reset_current_config
 from k8s_monitor.autoscaling_policy import load_autoscaling_policy, save_autoscaling_policy, view_autoscaling_policy as view_current_autoscaling_policy, reset_autoscaling_policy as reset_current_autoscaling_policy
 from k8s_monitor.namespace_config import load_namespaces, save_namespaces, view_namespaces as view_current_namespaces, reset_namespaces as reset_current_namespaces
-from k8s_monitor.visualize import plot_resource_trends
-import os
+
+def dashboard_options(command):
+    """
+    Add the live dashboard options shared by monitor and run.
+    """
+    options = [
+        click.option('--dashboard', is_flag=True, help='Show a live table that updates as namespaces are fetched'),
+        click.option('--sort', type=click.Choice(['cpu', 'memory', 'name']), default='cpu', help='Dashboard row order (highest usage first)'),
+        click.option('--top', default=25, help='Dashboard rows per page'),
+        click.option('--page', default=1, help='Dashboard page to show'),
+        click.option('--refresh-rate', default=4.0, help='Maximum dashboard redraws per second'),
+        click.option('--verbose', is_flag=True, help='Also print per-namespace and per-pod progress'),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def profile_options(command):
+    """
+    Add the profiling options shared by monitor and auto-scale.
+    """
+    options = [
+        click.option('--profile', is_flag=True, help='Time each phase per namespace and print a breakdown at the end'),
+        click.option('--profile-output', default=None, help='Also run under cProfile and write pstats output to this file'),
+        click.option('--trace-output', default=None, help='Write the phase spans as Chrome trace-event JSON to this file'),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+@contextlib.contextmanager
+def _profiling(enabled, profile_output, trace_output):
+    if not (enabled or profile_output or trace_output):
+        yield
+        return
+
+    from k8s_monitor.profiling import Profiler
+    from k8s_monitor.monitor import console
+
+    profiler = Profiler(cprofile=bool(profile_output))
+    with profiler:
+        yield
+    profiler.print_summary(console)
+    if profile_output:
+        print(f"cProfile statistics written to {profiler.dump_stats(profile_output)}")
+    if trace_output:
+        print(f"Trace written to {profiler.write_trace(trace_output)}")
+
+
+@contextlib.contextmanager
+def _live_dashboard(enabled, sort, top, page, refresh_rate):
+    if not enabled:
+        yield None
+        return
+
+    from k8s_monitor.dashboard import Dashboard
+    from k8s_monitor.monitor import console
+
+    with Dashboard(sort, top, page, refresh_rate, console=console) as dashboard:
+        yield dashboard
+
 
 @click.group()
 def cli():
@@ -126,61 +191,188 @@ def reset_namespaces():
     reset_current_namespaces()
 
 @cli.command()
-@click.option('--namespace', default='default', help='Kubernetes namespace to monitor')
+@click.option('--namespace', default=None, help='Kubernetes namespace to monitor (default: the configured namespaces, or "default")')
 @click.option('--use-mock', is_flag=True, help='Use mock data instead of live Kubernetes cluster')
-def monitor(namespace, use_mock):
+@click.option('--concurrency', default=DEFAULT_CONCURRENCY, help='Maximum number of namespaces fetched in parallel')
+@click.option('--namespace-timeout', default=DEFAULT_NAMESPACE_TIMEOUT, help='Seconds allowed for fetching a single namespace')
+@click.option('--all-namespaces', is_flag=True, help='List pods and metrics with one cluster-wide call each, then filter to the selected namespaces')
+@click.option('-l', '--selector', default=None, help='Only pods matching this label selector, e.g. app=web,tier!=batch')
+@click.option('--page-size', default=DEFAULT_PAGE_SIZE, help='Pods fetched per list request')
+@dashboard_options
+@profile_options
+def monitor(namespace, use_mock, concurrency, namespace_timeout, all_namespaces, selector, page_size, dashboard, sort, top, page,
+            refresh_rate, verbose, profile, profile_output, trace_output):
     """
     Monitor real-time resource usage in a specific namespace.
     """
+    from k8s_monitor.monitor import monitor_resources
+
     try:
         print(f"Monitor command called with namespace={namespace}, use_mock={use_mock}")
-        monitor_resources(namespace=namespace, use_mock=use_mock)
+        with _profiling(profile, profile_output, trace_output):
+            with _live_dashboard(dashboard, sort, top, page, refresh_rate) as live:
+                monitor_resources(namespace=namespace, use_mock=use_mock, concurrency=concurrency, timeout=namespace_timeout,
+                                  all_namespaces=all_namespaces, dashboard=live, verbose=verbose, label_selector=selector,
+                                  page_size=page_size)
     except Exception as e:
         print(f"Error in monitor command: {e}")
 
 @cli.command()
-@click.option('--namespace', default='default', help='Kubernetes namespace to monitor')
+@click.option('--namespace', default=None, help='Kubernetes namespace to monitor (default: the configured namespaces, or "default")')
 @click.option('--use-mock', is_flag=True, help='Use mock data instead of live Kubernetes cluster')
-def auto_scale(namespace, use_mock):
+@click.option('--concurrency', default=DEFAULT_CONCURRENCY, help='Maximum number of namespaces fetched in parallel')
+@click.option('--namespace-timeout', default=DEFAULT_NAMESPACE_TIMEOUT, help='Seconds allowed for fetching a single namespace')
+@click.option('--all-namespaces', is_flag=True, help='List pods with one cluster-wide call, then filter to the selected namespaces')
+@click.option('--dry-run', is_flag=True, help='Print the planned HPA changes without applying them')
+@click.option('-l', '--selector', default=None, help='Only pods matching this label selector, e.g. app=web,tier!=batch')
+@click.option('--page-size', default=DEFAULT_PAGE_SIZE, help='Pods fetched per list request')
+@profile_options
+def auto_scale(namespace, use_mock, concurrency, namespace_timeout, all_namespaces, dry_run, selector, page_size, profile,
+               profile_output, trace_output):
     """
     Provide auto-scaling recommendations based on the average usage in a given namespace.
     """
+    from k8s_monitor.monitor import auto_scale as auto_scale_command
+
     try:
         print(f"Auto-scale command called with namespace={namespace}, use_mock={use_mock}")
-        auto_scale_command(namespace=namespace, use_mock=use_mock)  # This will now refer to the auto-scaling logic
+        with _profiling(profile, profile_output, trace_output):
+            auto_scale_command(namespace=namespace, use_mock=use_mock, concurrency=concurrency, timeout=namespace_timeout,
+                               all_namespaces=all_namespaces, dry_run=dry_run, label_selector=selector,
+                               page_size=page_size)  # This will now refer to the auto-scaling logic
     except Exception as e:
         print(f"Error in auto_scale command: {e}")
 
+@cli.command()
+@click.option('--interval', default='15s', help='Time between monitoring cycles, e.g. 15s, 1m')
+@click.option('--namespace', default=None, help='Kubernetes namespace to monitor (default: the configured namespaces, or "default")')
+@click.option('--use-mock', is_flag=True, help='Use mock data instead of live Kubernetes cluster')
+@click.option('--concurrency', default=DEFAULT_CONCURRENCY, help='Maximum number of namespaces fetched in parallel')
+@click.option('--namespace-timeout', default=DEFAULT_NAMESPACE_TIMEOUT, help='Seconds allowed for fetching a single namespace')
+@click.option('--all-namespaces', is_flag=True, help='List pods and metrics with one cluster-wide call each, then filter to the selected namespaces')
+@click.option('--auto-scale', 'with_auto_scale', is_flag=True, help='Also run the auto-scaling analysis every cycle')
+@click.option('--no-informer', is_flag=True, help='List pods from the API every cycle instead of watching them')
+@click.option('--dry-run', is_flag=True, help='With --auto-scale, print the planned HPA changes without applying them')
+@click.option('--metrics-port', default=None, type=int, help='Serve Prometheus metrics at /metrics on this port')
+@click.option('--metrics-host', default=DEFAULT_METRICS_HOST, help='Address the metrics endpoint listens on')
+@click.option('-l', '--selector', default=None, help='Only pods matching this label selector, e.g. app=web,tier!=batch')
+@click.option('--page-size', default=DEFAULT_PAGE_SIZE, help='Pods fetched per list request')
+@dashboard_options
+def run(interval, namespace, use_mock, concurrency, namespace_timeout, all_namespaces, with_auto_scale, no_informer, dry_run,
+        metrics_port, metrics_host, selector, page_size, dashboard, sort, top, page, refresh_rate, verbose):
+    """
+    Run monitoring continuously at a fixed interval until stopped (SIGTERM or Ctrl+C).
+    """
+    from k8s_monitor.scheduler import parse_interval
+
+    try:
+        seconds = parse_interval(interval)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--interval')
+
+    from k8s_monitor.monitor import run_daemon
+
+    try:
+        print(f"Run command called with interval={interval}, namespace={namespace}, use_mock={use_mock}")
+        with _live_dashboard(dashboard, sort, top, page, refresh_rate) as live:
+            run_daemon(seconds, namespace=namespace, use_mock=use_mock, concurrency=concurrency, timeout=namespace_timeout,
+                       all_namespaces=all_namespaces, with_auto_scale=with_auto_scale, use_informer=not no_informer,
+                       dry_run=dry_run, dashboard=live, verbose=verbose, metrics_port=metrics_port,
+                       metrics_host=metrics_host, label_selector=selector, page_size=page_size)
+    except Exception as e:
+        print(f"Error in run command: {e}")
+
 @cli.command()
 @click.option('--namespace', default='default', help='Kubernetes namespace to monitor')
-@click.option('--pod-name', required=True, help='The name of the pod to visualize trends for')
+@click.option('--pod-name', default=None, help='The name of the pod to visualize trends for')
+@click.option('--all-pods', is_flag=True, help='Render a chart for every pod in the namespace')
 @click.option('--duration', default=60, help='Time duration (in minutes) for historical data')
-def visualize_trends(namespace, pod_name, duration):
+@click.option('--output', default=None, help='Image file to write for --pod-name (default: <pod-name>_trends.<format>)')
+@click.option('--output-dir', default='trends', help='Directory for the charts written by --all-pods')
+@click.option('--format', 'fmt', type=click.Choice(['png', 'svg']), default='png', help='Image format')
+@click.option('--downsample', type=click.Choice(['lttb', 'minmax']), default='lttb', help='How long series are reduced to the plot width')
+@click.option('--max-points', default=None, type=int, help='Points kept per series (default: one per pixel of plot width)')
+def visualize_trends(namespace, pod_name, all_pods, duration, output, output_dir, fmt, downsample, max_points):
     """
-    Visualize resource trends for a specific pod over a specified duration.
+    Visualize resource trends for a specific pod (or every pod) over a specified duration.
     """
+    from k8s_monitor.storage.database import get_historical_usage, get_bulk_historical_usage
+    from k8s_monitor.visualize import render_trends, render_many, DEFAULT_MAX_POINTS
+
+    if not pod_name and not all_pods:
+        raise click.UsageError("Pass --pod-name or --all-pods")
+    max_points = max_points or DEFAULT_MAX_POINTS
+
     try:
+        if all_pods:
+            histories = get_bulk_historical_usage(namespace, duration)
+            paths = render_many(histories, output_dir, fmt, max_points, downsample)
+            if not paths:
+                print(f"No historical data available in namespace {namespace}.")
+            for path in paths:
+                print(f"Saved {path}")
+            return
+
         history = get_historical_usage(pod_name, namespace, duration)
-        
+
         if not history:
             print(f"No historical data available for pod {pod_name}.")
             return
-        
-        # Extract CPU and memory usage histories from the data
-        cpu_usage_history = [entry['cpu'] for entry in history]
-        memory_usage_history = [entry['memory'] for entry in history]
 
-        # Ensure they are lists (in case of unexpected data types)
-        if not isinstance(cpu_usage_history, list) or not isinstance(memory_usage_history, list):
-            raise ValueError("CPU or memory usage history is not in list form")
-
-        # Plot the trends
-        plot_resource_trends(cpu_usage_history, memory_usage_history, pod_name)
+        path = render_trends(history, pod_name, output or f"{pod_name}_trends.{fmt}", max_points, downsample)
+        print(f"Saved {path}")
 
     except Exception as e:
         print(f"Error visualizing trends: {e}")
 
 
+@cli.command()
+@click.option('--retention', type=int, default=None, help='Minutes of raw samples to keep (default: one day); older data stays available in the rollup tiers')
+def compact_db(retention):
+    """
+    Drop raw usage samples past the retention window and expire old rollup buckets.
+    """
+    from k8s_monitor.storage.database import init_db, compact_usage
+
+    try:
+        init_db()
+        deleted = compact_usage(retention)
+        for table, count in deleted.items():
+            print(f"{table}: deleted {count} rows")
+    except Exception as e:
+        print(f"Error compacting database: {e}")
+
+@cli.command()
+@click.option('--namespaces', default=3, help='Number of simulated namespaces ("default", "sim-1", ...)')
+@click.option('--pods', default=20, help='Pods per namespace')
+@click.option('--seed', default=0, help='Seed for the generated cluster and usage')
+@click.option('--latency', default=0.0, help='Seconds added to every API call')
+@click.option('--error-rate', default=0.0, help='Share of API calls that fail with a 503')
+@click.option('--host', default='127.0.0.1', help='Address to listen on')
+@click.option('--port', default=8001, help='Port to listen on')
+@click.option('--kubeconfig', default='simulator.kubeconfig', help='Kubeconfig file to write for reaching the simulator')
+def simulate(namespaces, pods, seed, latency, error_rate, host, port, kubeconfig):
+    """
+    Serve a simulated cluster over HTTP until stopped, for running the monitor against it.
+    """
+    import json
+    import time
+    from k8s_monitor.simulator import SimulatedCluster, kubeconfig as simulator_kubeconfig, server_url
+
+    cluster = SimulatedCluster(namespaces, pods, seed=seed, latency=latency, error_rate=error_rate)
+    server = cluster.serve(port, host)
+    with open(kubeconfig, 'w') as file:
+        json.dump(simulator_kubeconfig(server), file, indent=4)
+
+    print(f"Simulating {namespaces * pods} pods in {namespaces} namespace(s) at {server_url(server)}")
+    print(f"Use it with: KUBECONFIG={kubeconfig} python3 -m k8s_monitor.cli monitor --all-namespaces")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
 
 @cli.command()
 @click.option('--email-host', required=True, help='SMTP host for sending alerts')
@@ -194,6 +386,8 @@ def email_alert(email_host, email_port, sender_email, sender_password, recipient
     """
     Send email alerts independently of monitoring.
     """
+    from k8s_monitor.utils.email_alerts import send_email_alert
+
     try:
         print("Email alert command called")
         os.environ['EMAIL_HOST'] = email_host
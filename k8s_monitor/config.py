@@ -1,25 +1,28 @@
-import json
-import os
+from k8s_monitor.config_store import default_store
 
 CONFIG_FILE = "config.json"
 
+CONFIG_SCHEMA = {
+    'slack_webhook_url': (str, None),
+    'email_host': (str, None),
+    'email_port': ((int, str), lambda port: str(port).isdigit()),
+    'sender_email': (str, None),
+    'sender_password': (str, None),
+    'recipient_email': (str, None),
+}
+
 def load_config():
     """
     Load configuration from the config.json file.
     If it doesn't exist, return an empty dictionary.
     """
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as file:
-            return json.load(file)
-    else:
-        return {}
+    return default_store().load(CONFIG_FILE, CONFIG_SCHEMA)
 
 def save_config(config):
     """
     Save configuration to the config.json file.
     """
-    with open(CONFIG_FILE, 'w') as file:
-        json.dump(config, file, indent=4)
+    default_store().save(CONFIG_FILE, config, CONFIG_SCHEMA)
 
 def view_config():
     """
@@ -36,8 +39,7 @@ def reset_config():
     """
     Reset the configuration by deleting the config.json file.
     """
-    if os.path.exists(CONFIG_FILE):
-        os.remove(CONFIG_FILE)
+    if default_store().remove(CONFIG_FILE):
         print("Configuration reset successfully.")
     else:
         print("No configuration file found to reset.")
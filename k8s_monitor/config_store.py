@@ -0,0 +1,146 @@
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+
+# Directory holding config.json, autoscaling_policy.json and namespaces.json
+CONFIG_DIR_ENV = "K8S_MONITOR_CONFIG_DIR"
+DEFAULT_CONFIG_DIR = os.path.join("~", ".k8s_monitor")
+
+
+class ConfigError(ValueError):
+    """
+    A configuration file that is not valid JSON or does not match its schema.
+    """
+
+
+def config_dir():
+    return os.path.expanduser(os.environ.get(CONFIG_DIR_ENV) or DEFAULT_CONFIG_DIR)
+
+
+def validate(document, schema, filename):
+    """
+    Check a parsed document against a schema of {key: (allowed types, check or None)}.
+    Unknown keys are allowed so newer files still load; known keys must have the right type.
+    """
+    if not isinstance(document, dict):
+        raise ConfigError(f"{filename}: expected a JSON object")
+    for key, value in document.items():
+        if key not in schema:
+            continue
+        types, check = schema[key]
+        # bool is an int subclass, but never a valid number here
+        if isinstance(value, bool) or not isinstance(value, types):
+            raise ConfigError(f"{filename}: '{key}' has an invalid type ({type(value).__name__})")
+        if check is not None and not check(value):
+            raise ConfigError(f"{filename}: '{key}' has an invalid value ({value!r})")
+    return document
+
+
+class ConfigStore:
+    """
+    Load and save the JSON config documents with caching and atomic writes.
+
+    Parsed documents are cached per file and revalidated only when the file's inode, mtime
+    or size changes, so a long-running monitor picks up edits on its next read without
+    re-parsing unchanged files. Files live in config_dir(); a file that only exists in the
+    current directory (where older versions kept it) is still read from there.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, filename):
+        primary = os.path.join(self.directory or config_dir(), filename)
+        return primary, os.path.abspath(filename)
+
+    def path(self, filename):
+        """
+        Return the file a document is read from: the config dir, or the legacy CWD copy.
+        """
+        primary, legacy = self._paths(filename)
+        if not os.path.exists(primary) and os.path.exists(legacy):
+            return legacy
+        return primary
+
+    def load(self, filename, schema=None):
+        """
+        Return a copy of the parsed document ({} if the file does not exist).
+        """
+        path = self.path(filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return {}
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is None or cached[0] != version:
+                try:
+                    with open(path, 'r') as file:
+                        document = json.load(file)
+                except json.JSONDecodeError as e:
+                    raise ConfigError(f"{path}: {e}") from e
+                if schema is not None:
+                    validate(document, schema, path)
+                if cached is not None:
+                    logging.info(f"Reloaded {path}")
+                cached = self._cache[path] = (version, document)
+
+        # Callers are free to modify what they get back
+        return copy.deepcopy(cached[1])
+
+    def save(self, filename, document, schema=None):
+        """
+        Validate and write a document atomically into the config dir, readable by the owner only.
+        """
+        if schema is not None:
+            validate(document, schema, filename)
+
+        path, _ = self._paths(filename)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write a temporary file next to the target and rename it over, so readers see
+        # either the old or the new document, never a partial one
+        fd, temp_path = tempfile.mkstemp(prefix=f".{filename}.", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(document, file, indent=4)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            self._cache.pop(path, None)
+        return path
+
+    def remove(self, filename):
+        """
+        Delete a document from the config dir and any legacy CWD copy. Returns True if a file was removed.
+        """
+        removed = False
+        for path in self._paths(filename):
+            try:
+                os.remove(path)
+                removed = True
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._cache.pop(path, None)
+        return removed
+
+
+_store = ConfigStore()
+
+
+def default_store():
+    return _store
@@ -0,0 +1,106 @@
+import heapq
+from itertools import chain
+import threading
+import time
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+from k8s_monitor.utils.quantity import format_cpu, format_memory
+
+SORT_KEYS = ("cpu", "memory", "name")
+
+DEFAULT_PAGE_SIZE = 25
+
+# Upper bound on screen redraws per second, however fast rows arrive
+DEFAULT_REFRESH_RATE = 4
+
+
+class Dashboard:
+    """
+    Live terminal view of pod usage, updated namespace by namespace as data arrives.
+
+    update() only stores rows; the table is rebuilt by rich.Live at most refresh_rate times
+    per second, and only for the rows on the visible page, so the cost of drawing does not
+    grow with the number of pods. Rows are ordered by CPU or memory (highest first) or by
+    name, and shown page_size at a time.
+    """
+
+    def __init__(self, sort_by="cpu", page_size=DEFAULT_PAGE_SIZE, page=1, refresh_rate=DEFAULT_REFRESH_RATE, console=None):
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_by}")
+        self.sort_by = sort_by
+        self.page_size = page_size
+        self.page = max(1, page)
+        self.refresh_rate = refresh_rate
+        self.console = console or Console()
+        self._rows = {}
+        self._lock = threading.Lock()
+        self._updated = None
+        self._live = None
+        self.status = ""
+
+    def update(self, namespace, rows):
+        """
+        Replace a namespace's rows with [(pod_name, phase, cpu, memory, avg_cpu, avg_memory)].
+        """
+        rows = [(namespace,) + tuple(row) for row in rows]
+        with self._lock:
+            self._rows[namespace] = rows
+            self._updated = time.strftime("%H:%M:%S")
+
+    def _visible_rows(self):
+        with self._lock:
+            rows = list(chain.from_iterable(self._rows.values()))
+        total = len(rows)
+        last = self.page * self.page_size
+
+        if self.sort_by == "name":
+            ordered = sorted(rows, key=lambda row: (row[0], row[1]))
+        else:
+            column = 3 if self.sort_by == "cpu" else 4
+            # Only the rows up to the visible page need ordering
+            ordered = heapq.nlargest(last, rows, key=lambda row: -1 if row[column] is None else row[column])
+        return ordered[last - self.page_size:last], total
+
+    def render(self):
+        rows, total = self._visible_rows()
+        pages = max(1, -(-total // self.page_size))
+
+        table = Table(show_header=True, header_style="bold magenta", expand=False)
+        table.title = f"{total} pods in {len(self._rows)} namespace(s), sorted by {self.sort_by}"
+        table.caption = f"Page {min(self.page, pages)}/{pages}" + (f" | updated {self._updated}" if self._updated else "")
+        if self.status:
+            table.caption += f" | {self.status}"
+        table.add_column("Namespace", style="dim")
+        table.add_column("Pod Name")
+        table.add_column("Phase")
+        table.add_column("CPU Usage (m)", justify="right")
+        table.add_column("Memory Usage (Mi)", justify="right")
+        table.add_column("Avg CPU (m)", justify="right")
+        table.add_column("Avg Memory (Mi)", justify="right")
+
+        for namespace, pod_name, phase, cpu, memory, avg_cpu, avg_memory in rows:
+            table.add_row(
+                namespace, pod_name, phase,
+                format_cpu(cpu), format_memory(memory),
+                format_cpu(avg_cpu), format_memory(avg_memory),
+            )
+        return table
+
+    def start(self):
+        if self._live is None:
+            self._live = Live(get_renderable=self.render, console=self.console,
+                              refresh_per_second=self.refresh_rate, auto_refresh=True)
+            self._live.start()
+        return self
+
+    def stop(self):
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
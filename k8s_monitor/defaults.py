@@ -0,0 +1,12 @@
+# Defaults shared by the monitor and the CLI options. Kept free of heavy imports so the
+# CLI can build its options without loading the Kubernetes client.
+
+# Default number of namespaces fetched in parallel and seconds allowed per namespace
+DEFAULT_CONCURRENCY = 8
+DEFAULT_NAMESPACE_TIMEOUT = 30
+
+# The metrics endpoint only listens locally unless told otherwise
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+# Pods fetched per list request; only one page of full pod objects is held at a time
+DEFAULT_PAGE_SIZE = 500
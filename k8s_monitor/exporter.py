@@ -0,0 +1,191 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from k8s_monitor.defaults import DEFAULT_METRICS_HOST
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class Histogram:
+    """
+    Cumulative latency histogram in seconds, safe to observe from several threads.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def lines(self, name, **labels):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            yield f"{name}_bucket{_labels(**labels, le=_number(bound))} {cumulative}"
+        yield f"{name}_sum{_labels(**labels)} {_number(total)}"
+        yield f"{name}_count{_labels(**labels)} {count}"
+
+
+class MetricsRegistry:
+    """
+    Collect the monitor's latest per-pod usage, scaling recommendations and phase latencies.
+
+    Scrapes are answered from a text snapshot that publish() rebuilds (once per cycle), so
+    serving /metrics never queries the database or walks live state.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._phases = {}
+        self._pods = {}
+        self._recommendations = {}
+        self._lock = threading.Lock()
+        self._snapshot = b""
+
+    def observe(self, phase, seconds):
+        histogram = self._phases.get(phase)
+        if histogram is None:
+            with self._lock:
+                histogram = self._phases.setdefault(phase, Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, phase):
+        """
+        Time the enclosed block as one observation of 'phase'.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def update_pods(self, namespace, rows):
+        """
+        Replace a namespace's latest samples with [(pod_name, cpu_millicores, memory_bytes)].
+        """
+        with self._lock:
+            self._pods[namespace] = list(rows)
+
+    def update_recommendations(self, namespace, workloads, decisions):
+        """
+        Replace a namespace's scaling recommendations, one per Workload.
+        """
+        with self._lock:
+            self._recommendations[namespace] = [
+                (workload.kind, workload.name, decision.action, decision.replicas)
+                for workload, decision in zip(workloads, decisions)
+            ]
+
+    def retain_namespaces(self, namespaces):
+        """
+        Drop the samples and recommendations of every namespace not in 'namespaces', so series
+        for a namespace that is no longer monitored stop being served.
+        """
+        keep = set(namespaces)
+        with self._lock:
+            for series in (self._pods, self._recommendations):
+                for namespace in [namespace for namespace in series if namespace not in keep]:
+                    del series[namespace]
+
+    def _lines(self):
+        with self._lock:
+            pods = sorted(self._pods.items())
+            recommendations = sorted(self._recommendations.items())
+            phases = sorted(self._phases.items())
+
+        yield "# HELP k8s_monitor_pod_cpu_millicores Latest CPU usage of the pod summed over its containers."
+        yield "# TYPE k8s_monitor_pod_cpu_millicores gauge"
+        for namespace, rows in pods:
+            for pod_name, cpu, _ in rows:
+                if cpu is not None:
+                    yield f"k8s_monitor_pod_cpu_millicores{_labels(namespace=namespace, pod=pod_name)} {_number(cpu)}"
+
+        yield "# HELP k8s_monitor_pod_memory_bytes Latest memory usage of the pod summed over its containers."
+        yield "# TYPE k8s_monitor_pod_memory_bytes gauge"
+        for namespace, rows in pods:
+            for pod_name, _, memory in rows:
+                if memory is not None:
+                    yield f"k8s_monitor_pod_memory_bytes{_labels(namespace=namespace, pod=pod_name)} {_number(memory)}"
+
+        yield "# HELP k8s_monitor_scaling_recommendation Replicas to add or remove per the latest recommendation for the workload."
+        yield "# TYPE k8s_monitor_scaling_recommendation gauge"
+        for namespace, rows in recommendations:
+            for kind, name, action, replicas in rows:
+                labels = _labels(namespace=namespace, kind=kind, workload=name, action=action)
+                yield f"k8s_monitor_scaling_recommendation{labels} {replicas}"
+
+        yield "# HELP k8s_monitor_phase_duration_seconds Time spent in each phase of a monitoring cycle."
+        yield "# TYPE k8s_monitor_phase_duration_seconds histogram"
+        for phase, histogram in phases:
+            yield from histogram.lines("k8s_monitor_phase_duration_seconds", phase=phase)
+
+    def publish(self):
+        """
+        Rebuild the snapshot served to scrapers.
+        """
+        self._snapshot = ("\n".join(self._lines()) + "\n").encode("utf-8")
+
+    def snapshot(self):
+        return self._snapshot
+
+
+# Process-wide registry the monitor records into (phase timings arrive through profiling.span)
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.snapshot()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host=DEFAULT_METRICS_HOST, registry=REGISTRY):
+    """
+    Serve registry snapshots at http://host:port/metrics from a background thread. Returns
+    the server; call shutdown() on it to stop.
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    registry.publish()
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,154 @@
+import logging
+from collections import namedtuple
+from kubernetes.client.exceptions import ApiException
+from k8s_monitor.profiling import span, HPA_RECONCILE
+
+DEFAULT_MIN_REPLICAS = 1
+DEFAULT_MAX_REPLICAS = 10
+
+# Merge patches replace lists wholesale, so a changed metrics list is sent as a whole
+MERGE_PATCH = "application/merge-patch+json"
+
+CREATE = "create"
+PATCH = "patch"
+UNCHANGED = "unchanged"
+
+HPAChange = namedtuple("HPAChange", ["action", "namespace", "name", "body"])
+
+
+def hpa_name(workload_name):
+    return f"{workload_name}-hpa"
+
+
+def desired_spec(kind, workload_name, target_cpu_utilization_percentage, target_memory_utilization_percentage=None,
+                 min_replicas=DEFAULT_MIN_REPLICAS, max_replicas=DEFAULT_MAX_REPLICAS):
+    """
+    Build an autoscaling/v2 HPA spec (camelCase dict, as sent to the API) for a workload.
+    """
+    metrics = [_resource_metric("cpu", target_cpu_utilization_percentage)]
+    if target_memory_utilization_percentage:
+        metrics.append(_resource_metric("memory", target_memory_utilization_percentage))
+
+    return {
+        "scaleTargetRef": {"apiVersion": "apps/v1", "kind": kind, "name": workload_name},
+        "minReplicas": min_replicas,
+        "maxReplicas": max_replicas,
+        "metrics": metrics,
+    }
+
+
+def _resource_metric(resource, utilization):
+    return {
+        "type": "Resource",
+        "resource": {"name": resource, "target": {"type": "Utilization", "averageUtilization": utilization}},
+    }
+
+
+def diff_spec(current, desired):
+    """
+    Return the spec fields of 'desired' that differ from 'current' (an empty dict if none do).
+    Only fields this tool manages are compared; anything else on the HPA is left alone.
+    """
+    patch = {}
+    if current.get("scaleTargetRef") != desired["scaleTargetRef"]:
+        patch["scaleTargetRef"] = desired["scaleTargetRef"]
+    # The API server defaults minReplicas to 1 when it is omitted
+    if current.get("minReplicas", DEFAULT_MIN_REPLICAS) != desired["minReplicas"]:
+        patch["minReplicas"] = desired["minReplicas"]
+    if current.get("maxReplicas") != desired["maxReplicas"]:
+        patch["maxReplicas"] = desired["maxReplicas"]
+    if _metric_key(current.get("metrics")) != _metric_key(desired["metrics"]):
+        patch["metrics"] = desired["metrics"]
+    return patch
+
+
+def _metric_key(metrics):
+    # Order-insensitive view of the metrics list
+    return sorted(repr(sorted(_flatten(metric))) for metric in metrics or ())
+
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}{key}.")
+    else:
+        yield prefix, value
+
+
+class HPAReconciler:
+    """
+    Reconcile HPAs against their desired specs with as few API calls as possible.
+
+    Each namespace's HPAs are listed once (per reconciler) and cached; an HPA is created when
+    missing, patched with only the changed spec fields when it differs, and left untouched
+    otherwise. With dry_run nothing is written, but the planned changes are still returned.
+    Create one reconciler per cycle so the cached listings never go stale.
+    """
+
+    def __init__(self, autoscaling_v2, dry_run=False):
+        self._api = autoscaling_v2
+        self.dry_run = dry_run
+        self._current = {}
+
+    def _list(self, namespace):
+        if namespace not in self._current:
+            with span(HPA_RECONCILE, namespace):
+                hpas = self._api.list_namespaced_horizontal_pod_autoscaler(namespace).items
+            serialize = self._api.api_client.sanitize_for_serialization
+            self._current[namespace] = {
+                hpa.metadata.name: serialize(hpa.spec) or {} for hpa in hpas
+            }
+        return self._current[namespace]
+
+    def plan(self, namespace, kind, workload_name, target_cpu_utilization_percentage,
+             target_memory_utilization_percentage=None):
+        """
+        Work out the change needed for one workload's HPA without applying it.
+        """
+        name = hpa_name(workload_name)
+        desired = desired_spec(kind, workload_name, target_cpu_utilization_percentage,
+                               target_memory_utilization_percentage)
+        current = self._list(namespace).get(name)
+
+        if current is None:
+            body = {
+                "apiVersion": "autoscaling/v2",
+                "kind": "HorizontalPodAutoscaler",
+                "metadata": {"name": name, "namespace": namespace},
+                "spec": desired,
+            }
+            return HPAChange(CREATE, namespace, name, body)
+
+        patch = diff_spec(current, desired)
+        if not patch:
+            return HPAChange(UNCHANGED, namespace, name, None)
+        return HPAChange(PATCH, namespace, name, {"spec": patch})
+
+    def reconcile(self, namespace, kind, workload_name, target_cpu_utilization_percentage,
+                  target_memory_utilization_percentage=None):
+        """
+        Bring one workload's HPA to the desired spec and return the HPAChange that was (or,
+        in dry-run mode, would be) made.
+        """
+        change = self.plan(namespace, kind, workload_name, target_cpu_utilization_percentage,
+                           target_memory_utilization_percentage)
+        if self.dry_run or change.action == UNCHANGED:
+            return change
+
+        try:
+            with span(HPA_RECONCILE, namespace):
+                if change.action == CREATE:
+                    self._api.create_namespaced_horizontal_pod_autoscaler(namespace, change.body)
+                else:
+                    self._api.patch_namespaced_horizontal_pod_autoscaler(change.name, namespace, change.body,
+                                                                        _content_type=MERGE_PATCH)
+        except ApiException as e:
+            # Someone else changed the HPA; list again next time instead of trusting the cache
+            self._current.pop(namespace, None)
+            logging.error(f"Failed to {change.action} HPA {namespace}/{change.name}: {e.status} {e.reason}")
+            raise
+
+        # Later reconciles of the same HPA in this cycle see the applied spec
+        current = self._current[namespace].setdefault(change.name, {})
+        current.update(change.body["spec"])
+        return change
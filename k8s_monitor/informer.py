@@ -0,0 +1,209 @@
+import logging
+import threading
+from kubernetes import watch
+from kubernetes.client.exceptions import ApiException
+from k8s_monitor.defaults import DEFAULT_PAGE_SIZE
+from k8s_monitor.pods import pod_record, pod_record_from_dict, list_pages, ACTIVE_PODS_SELECTOR
+
+# Upper bound on cached pods; pods added beyond it are ignored (and the cache reports
+# itself as overflowed) until the next relist
+DEFAULT_MAX_PODS = 100000
+
+# Server-side timeout of a single watch request before it is re-established
+DEFAULT_WATCH_TIMEOUT = 300
+
+
+class PodInformer:
+    """
+    In-process pod inventory kept current by the Kubernetes watch API.
+
+    start() lists the pods once and then applies ADDED/MODIFIED/DELETED events from a
+    background watch that resumes from the last seen resourceVersion. If the server
+    reports that version as expired (410 Gone) the cache is rebuilt from a fresh list.
+    Only slim PodRecords of active pods matching label_selector are cached, and at most
+    max_pods of them; the list is paged so only page_size full pod objects are held at once.
+    A pod that stops matching the selectors (say it completes) arrives as DELETED. Once a pod
+    has been ignored because the cache was full, overflowed() is True until the next relist.
+    """
+
+    def __init__(self, v1, namespaces=None, max_pods=DEFAULT_MAX_PODS, watch_timeout=DEFAULT_WATCH_TIMEOUT,
+                 label_selector=None, page_size=DEFAULT_PAGE_SIZE):
+        self._v1 = v1
+        self._namespaces = None if namespaces is None else set(namespaces)
+        self.label_selector = label_selector
+        self.page_size = page_size
+        self.max_pods = max_pods
+        self.watch_timeout = watch_timeout
+        self._pods = {}
+        self._count = 0
+        self._overflowed = False
+        self._lock = threading.Lock()
+        self._resource_version = None
+        self._stop = threading.Event()
+        self._watch = None
+        self._thread = None
+
+    def _list_call(self):
+        # A single configured namespace can be watched directly; otherwise watch the cluster and filter
+        if self._namespaces is not None and len(self._namespaces) == 1:
+            namespace = next(iter(self._namespaces))
+            return self._v1.list_namespaced_pod, {"namespace": namespace}
+        return self._v1.list_pod_for_all_namespaces, {}
+
+    def _wanted(self, namespace):
+        return self._namespaces is None or namespace in self._namespaces
+
+    def relist(self):
+        """
+        Rebuild the cache from a full (paged, raw JSON) list and remember its resourceVersion.
+        """
+        list_func, kwargs = self._list_call()
+
+        pods = {}
+        count = 0
+        overflowed = False
+        resource_version = None
+        for page in list_pages(list_func, self.page_size, ACTIVE_PODS_SELECTOR, self.label_selector, raw=True, **kwargs):
+            resource_version = page["metadata"].get("resourceVersion")
+            for pod in page.get("items") or ():
+                record = pod_record_from_dict(pod)
+                if not self._wanted(record.namespace):
+                    continue
+                if count >= self.max_pods:
+                    break
+                pods.setdefault(record.namespace, {})[record.name] = record
+                count += 1
+            else:
+                continue
+            logging.warning(f"Pod informer cache is full ({self.max_pods} pods); ignoring the remaining pods")
+            overflowed = True
+            break
+
+        with self._lock:
+            self._pods = pods
+            self._count = count
+            self._overflowed = overflowed
+            self._resource_version = resource_version
+
+    def _apply(self, event):
+        event_type = event["type"]
+        pod = event["object"]
+
+        if event_type == "ERROR":
+            # Raw error events carry a Status; 410 means our resourceVersion is too old
+            code = pod.get("code") if isinstance(pod, dict) else getattr(pod, "code", None)
+            raise ApiException(status=code, reason="watch error")
+
+        if event_type == "BOOKMARK":
+            # The client leaves bookmarks undecoded: a dict carrying only the resourceVersion
+            raw = event.get("raw_object") or pod
+            resource_version = raw["metadata"]["resourceVersion"] if isinstance(raw, dict) else pod.metadata.resource_version
+            with self._lock:
+                self._resource_version = resource_version
+            return
+
+        record = pod_record(pod)
+        with self._lock:
+            namespace_pods = self._pods.get(record.namespace, {})
+            if event_type == "DELETED":
+                if namespace_pods.pop(record.name, None) is not None:
+                    self._count -= 1
+            elif self._wanted(record.namespace):
+                if record.name in namespace_pods:
+                    namespace_pods[record.name] = record
+                elif self._count < self.max_pods:
+                    self._pods.setdefault(record.namespace, {})[record.name] = record
+                    self._count += 1
+                else:
+                    self._overflowed = True
+                    logging.warning(f"Pod informer cache is full; ignoring pod {record.namespace}/{record.name}")
+            self._resource_version = pod.metadata.resource_version
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            list_func, kwargs = self._list_call()
+            self._watch = watch.Watch()
+            try:
+                for event in self._watch.stream(list_func, resource_version=self._resource_version,
+                                                timeout_seconds=self.watch_timeout,
+                                                allow_watch_bookmarks=True, field_selector=ACTIVE_PODS_SELECTOR,
+                                                label_selector=self.label_selector, **kwargs):
+                    if self._stop.is_set():
+                        break
+                    self._apply(event)
+                    # A stream that delivers events is healthy, however it ends
+                    backoff = 1
+                backoff = 1
+            except ApiException as e:
+                if e.status == 410:
+                    logging.info("Pod watch resourceVersion expired; relisting")
+                    self._relist_with_backoff()
+                else:
+                    logging.error(f"Pod watch failed: {e}")
+                    self._stop.wait(backoff)
+                    backoff = min(backoff * 2, 60)
+            except Exception as e:
+                logging.error(f"Pod watch failed: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+            finally:
+                self._watch.stop()
+
+    def _relist_with_backoff(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self.relist()
+                return
+            except Exception as e:
+                logging.error(f"Pod relist failed: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def start(self):
+        """
+        Do the initial list and start watching in a background thread.
+        """
+        self.relist()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pod-informer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the background watch.
+        """
+        self._stop.set()
+        if self._watch is not None:
+            self._watch.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def list_pods(self, namespace):
+        """
+        Return the cached pods of a namespace.
+        """
+        with self._lock:
+            return list(self._pods.get(namespace, {}).values())
+
+    def list_all_pods(self):
+        """
+        Return every cached pod.
+        """
+        with self._lock:
+            return [record for namespace_pods in self._pods.values() for record in namespace_pods.values()]
+
+    def overflowed(self):
+        """
+        Return True if pods have been ignored because the cache was full, i.e. the cache is
+        missing pods and should not be used in place of listing them.
+        """
+        with self._lock:
+            return self._overflowed
+
+    def __len__(self):
+        with self._lock:
+            return self._count
@@ -0,0 +1,111 @@
+import os
+import threading
+from kubernetes import client, config as kube_config
+from kubernetes.config.config_exception import ConfigException
+
+# Connections kept per host; raised to the fetch concurrency (plus the informer watch) as needed
+DEFAULT_POOL_MAXSIZE = 10
+
+# Connections held outside the fetch workers, e.g. by the informer's long-running watch
+RESERVED_CONNECTIONS = 2
+
+_lock = threading.Lock()
+_pool_maxsize = DEFAULT_POOL_MAXSIZE
+_in_cluster = None
+_config_file = None
+_api_client = None
+_apis = {}
+
+
+def _load_configuration():
+    """
+    Load the cluster configuration once: the pod's service account when running inside the
+    cluster (or when forced with K8S_MONITOR_IN_CLUSTER=1), the kubeconfig otherwise.
+    """
+    configuration = client.Configuration()
+    in_cluster = _in_cluster
+    if in_cluster is None:
+        in_cluster = os.environ.get("K8S_MONITOR_IN_CLUSTER", "") == "1" or "KUBERNETES_SERVICE_HOST" in os.environ
+
+    if in_cluster:
+        try:
+            kube_config.load_incluster_config(client_configuration=configuration)
+        except ConfigException:
+            if _in_cluster:
+                raise
+            kube_config.load_kube_config(config_file=_config_file, client_configuration=configuration)
+    else:
+        kube_config.load_kube_config(config_file=_config_file, client_configuration=configuration)
+
+    configuration.connection_pool_maxsize = _pool_maxsize
+    return configuration
+
+
+def configure(concurrency=None, in_cluster=None, config_file=None):
+    """
+    Size the shared connection pool for 'concurrency' parallel requests and optionally force
+    (True) or forbid (False) in-cluster configuration, or read a specific kubeconfig file.
+    The pool only ever grows; growing it after the client was created builds a fresh client
+    on next use.
+    """
+    global _pool_maxsize, _in_cluster, _config_file, _api_client
+    with _lock:
+        if in_cluster is not None and in_cluster != _in_cluster:
+            _in_cluster = in_cluster
+            _api_client = None
+            _apis.clear()
+        if config_file is not None and config_file != _config_file:
+            _config_file = config_file
+            _api_client = None
+            _apis.clear()
+        if concurrency is not None and concurrency + RESERVED_CONNECTIONS > _pool_maxsize:
+            _pool_maxsize = concurrency + RESERVED_CONNECTIONS
+            # APIs already handed out (e.g. to a running informer) keep their old client
+            _api_client = None
+            _apis.clear()
+
+
+def api_client():
+    """
+    Return the process-wide ApiClient, loading the configuration on first use.
+    """
+    global _api_client
+    with _lock:
+        if _api_client is None:
+            _api_client = client.ApiClient(_load_configuration())
+        return _api_client
+
+
+def _api(api_class):
+    shared = api_client()
+    with _lock:
+        api = _apis.get(api_class)
+        if api is None or api.api_client is not shared:
+            api = _apis[api_class] = api_class(shared)
+        return api
+
+
+def core_v1():
+    return _api(client.CoreV1Api)
+
+
+def apps_v1():
+    return _api(client.AppsV1Api)
+
+
+def autoscaling_v2():
+    return _api(client.AutoscalingV2Api)
+
+
+def custom_objects():
+    return _api(client.CustomObjectsApi)
+
+
+def reset():
+    """
+    Drop the shared client so the configuration is loaded again on next use.
+    """
+    global _api_client
+    with _lock:
+        _api_client = None
+        _apis.clear()
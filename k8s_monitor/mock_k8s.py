@@ -1,26 +1,62 @@
-from unittest import mock
+import os
+import threading
+from k8s_monitor.simulator import SimulatedCluster
+
+# Shape of the simulated cluster behind --use-mock, e.g. "namespaces=10,pods=500,seed=1,latency=0.05,error_rate=0.01"
+MOCK_ENV = "K8S_MONITOR_MOCK"
+
+_SETTINGS = {
+    "namespaces": ("namespaces", int),
+    "pods": ("pods_per_namespace", int),
+    "seed": ("seed", int),
+    "latency": ("latency", float),
+    "jitter": ("jitter", float),
+    "error_rate": ("error_rate", float),
+    "period": ("period", float),
+}
+
+_lock = threading.Lock()
+_cluster = None
+
+
+def simulation_settings(spec=None):
+    """
+    Parse a "key=value,..." spec (default: $K8S_MONITOR_MOCK) into SimulatedCluster arguments.
+    """
+    if spec is None:
+        spec = os.environ.get(MOCK_ENV, "")
+    settings = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        if key not in _SETTINGS:
+            raise ValueError(f"Unknown {MOCK_ENV} setting: {key}")
+        name, convert = _SETTINGS[key]
+        settings[name] = convert(value)
+    return settings
+
+
+def mock_cluster():
+    """
+    Return the process-wide simulated cluster used by --use-mock, creating it on first use.
+    """
+    global _cluster
+    with _lock:
+        if _cluster is None:
+            _cluster = SimulatedCluster(**simulation_settings())
+        return _cluster
+
 
 def mock_kubernetes_api():
     """
     Simulates Kubernetes API responses for testing.
     """
-    mock_v1 = mock.MagicMock()
-
-    # Debugging: Print a message to confirm mock API is being used
-    print("Mock Kubernetes API is being used")
-
-    # Simulate response for list_namespaced_pod
-    mock_v1.list_namespaced_pod.return_value = mock.Mock(
-        items=[
-            mock.Mock(
-                metadata=mock.Mock(name="mock-pod-1"),
-                status=mock.Mock(phase="Running"),
-            ),
-            mock.Mock(
-                metadata=mock.Mock(name="mock-pod-2"),
-                status=mock.Mock(phase="Pending"),
-            ),
-        ]
-    )
-
-    return mock_v1
+    return mock_cluster().core_v1()
+
+
+def set_mock_cluster(cluster):
+    """
+    Use a specific SimulatedCluster for --use-mock (e.g. one built by a benchmark).
+    """
+    global _cluster
+    with _lock:
+        _cluster = cluster
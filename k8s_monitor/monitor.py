@@ -1,235 +1,712 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait as futures_wait
 from rich.console import Console
 from rich.table import Table
-from k8s_monitor.mock_k8s import mock_kubernetes_api
-from k8s_monitor.storage.database import init_db, log_pod_usage, get_average_usage, get_historical_usage
+from kubernetes.client.exceptions import ApiException
+from k8s_monitor import kube_client
+from k8s_monitor.defaults import DEFAULT_CONCURRENCY, DEFAULT_NAMESPACE_TIMEOUT, DEFAULT_METRICS_HOST, DEFAULT_PAGE_SIZE
+from k8s_monitor.mock_k8s import mock_cluster
+from k8s_monitor.pods import iter_pods
+from k8s_monitor.workloads import WorkloadResolver
+from k8s_monitor.hpa import HPAReconciler, CREATE, UNCHANGED
+from k8s_monitor.exporter import REGISTRY, start_metrics_server
+from k8s_monitor.profiling import (
+    span, LIST_PODS, FETCH_METRICS, STORE, HISTORY, RENDER, GROUP, RECOMMEND, CYCLE
+)
+from k8s_monitor.informer import PodInformer
+from k8s_monitor.scheduler import Scheduler
+from k8s_monitor.storage.database import init_db, get_bulk_average_usage, get_bulk_historical_usage, UsageWriter
+from k8s_monitor.storage.ring_buffer import RecentUsage, capacity_for
+from k8s_monitor.recommendation import (
+    SCALE_UP, SCALE_DOWN, recommend, recommend_batch, averages_columns, history_columns, buffer_columns, window_averages,
+    group_columns
+)
 from k8s_monitor.utils.email_alerts import send_email_alert
+from k8s_monitor.utils.alert_dispatcher import AlertDispatcher, channels_from_config
+from k8s_monitor.utils.quantity import parse_cpu, parse_memory, format_cpu, format_memory
 from k8s_monitor.config import load_config
+from k8s_monitor.config_store import ConfigError
 from k8s_monitor.autoscaling_policy import load_autoscaling_policy
 from k8s_monitor.namespace_config import load_namespaces
 import requests
-from kubernetes import client, config as kube_config
-from kubernetes.client import V2HorizontalPodAutoscaler, V2HorizontalPodAutoscalerSpec, V1CrossVersionObjectReference
-from kubernetes.client import V2ResourceMetricSource, V2MetricSpec
 
 # Configure logging
 logging.basicConfig(filename='monitor.log', level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 console = Console()
 
-# Monitor resources in real-time
-def monitor_resources(namespace=None, use_mock=False, minutes=10):
+
+def _print_api_source(use_mock):
+    if use_mock:
+        console.print("[green]Using mock Kubernetes API[/green]")
+    else:
+        console.print("[green]Using real Kubernetes API[/green]")
+
+
+def _core_api(use_mock):
+    if use_mock:
+        return mock_cluster().core_v1()
+    return kube_client.core_v1()
+
+
+def _apps_api(use_mock):
+    if use_mock:
+        return mock_cluster().apps_v1()
+    return kube_client.apps_v1()
+
+
+def _custom_objects_api(use_mock):
+    if use_mock:
+        return mock_cluster().custom_objects()
+    return kube_client.custom_objects()
+
+
+def _autoscaling_api(use_mock):
+    if use_mock:
+        return mock_cluster().autoscaling_v2()
+    return kube_client.autoscaling_v2()
+
+
+def workload_resolver(use_mock=False):
+    """
+    Create a WorkloadResolver that follows ReplicaSets to their Deployments.
+    """
+    return WorkloadResolver(_apps_api(use_mock))
+
+
+def list_pods(namespace, use_mock, timeout=None, informer=None, label_selector=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    List the active (not Succeeded/Failed) pods of a namespace as PodRecords, from the informer
+    cache if one is given and complete. Pods are fetched 'page_size' at a time, so only one page
+    of full pod objects is in memory however large the namespace is. Safe to call from worker threads.
+    """
+    if _informer_usable(informer):
+        return informer.list_pods(namespace)
+
+    v1 = _core_api(use_mock)
+    with span(LIST_PODS, namespace):
+        return list(iter_pods(v1.list_namespaced_pod, page_size, label_selector=label_selector,
+                              namespace=namespace, _request_timeout=timeout))
+
+
+def fetch_namespace(namespace, use_mock, timeout=None, informer=None, label_selector=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch the pods of a namespace and, if there are any, their metrics.
+    """
+    pods = list_pods(namespace, use_mock, timeout, informer, label_selector, page_size)
+    pod_metrics = get_pod_metrics(namespace, timeout, use_mock=use_mock) if pods else {}
+    return pods, pod_metrics
+
+
+def _result_within(future, started, timeout):
+    """
+    Return the future's result, or raise FuturesTimeoutError once 'timeout' seconds have
+    passed since it started running. started() is its start time, None while still queued.
+    """
+    while not future.done():
+        started_at = started()
+        # A queued fetch has not used any of its time yet
+        remaining = timeout if started_at is None else started_at + timeout - time.monotonic()
+        if remaining <= 0:
+            raise FuturesTimeoutError()
+        futures_wait([future], timeout=remaining)
+    return future.result()
+
+
+def fetch_namespaces(namespaces, fetch, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_NAMESPACE_TIMEOUT):
+    """
+    Run fetch(namespace) for every namespace on a bounded thread pool.
+    Yields (namespace, result, error) in the order the namespaces were given, so callers
+    can write and render deterministically while later namespaces are still in flight.
+    A namespace that fails or does not finish within 'timeout' seconds of a worker starting
+    on it yields its error instead of aborting the pass; how long the caller took to get to
+    it does not count. fetch should pass the same timeout to its API calls as
+    _request_timeout, so a namespace given up on does not keep its worker busy.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(namespaces))))
+    started = [None] * len(namespaces)
+
+    def run(index, ns):
+        started[index] = time.monotonic()
+        return fetch(ns)
+
+    futures = [(ns, executor.submit(run, index, ns)) for index, ns in enumerate(namespaces)]
     try:
-        if not namespace:
-            namespaces = load_namespaces().get("namespaces", ["default"])
+        for index, (ns, future) in enumerate(futures):
+            try:
+                yield ns, _result_within(future, lambda: started[index], timeout), None
+            except FuturesTimeoutError:
+                future.cancel()
+                yield ns, None, TimeoutError(f"timed out after {timeout}s")
+            except Exception as e:
+                yield ns, None, e
+    finally:
+        for _, future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def fetch_cluster(namespaces, use_mock, timeout=None, with_metrics=True, informer=None, label_selector=None,
+                  page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch the pods (and metrics) of the whole cluster with one cluster-scoped call each,
+    then split them by namespace in memory. Only the given namespaces are kept, or every
+    namespace that has pods if namespaces is None. Pods come from the informer cache if one is given.
+    Returns a list of (namespace, (pods, pod_metrics), None) shaped like fetch_namespaces.
+    """
+    wanted = None if namespaces is None else set(namespaces)
+    pods_by_namespace = {}
+    with span(LIST_PODS):
+        if _informer_usable(informer):
+            pods = informer.list_all_pods()
         else:
-            namespaces = [namespace]
+            pods = iter_pods(_core_api(use_mock).list_pod_for_all_namespaces, page_size, label_selector=label_selector,
+                             _request_timeout=timeout)
+        for pod in pods:
+            if wanted is None or pod.namespace in wanted:
+                pods_by_namespace.setdefault(pod.namespace, []).append(pod)
+
+    metrics_by_namespace = get_cluster_pod_metrics(timeout, use_mock=use_mock) if with_metrics and pods_by_namespace else {}
+
+    if namespaces is None:
+        namespaces = sorted(pods_by_namespace)
+
+    return [
+        (ns, (pods_by_namespace.get(ns, []), metrics_by_namespace.get(ns, {})), None)
+        for ns in namespaces
+    ]
+
+
+def _resolve_namespaces(namespace, all_namespaces=False):
+    """
+    Namespaces to process: the one given, else the configured ones. Without a configuration
+    this is ["default"], or None (every namespace) in cluster-wide mode.
+    """
+    if namespace:
+        return [namespace]
+    return load_namespaces().get("namespaces", None if all_namespaces else ["default"])
+
+
+def _informer_usable(informer):
+    # A cache that had to drop pods would hide them from the pass, so list from the API instead
+    return informer is not None and not informer.overflowed()
+
+
+def start_pod_informer(namespaces, use_mock=False, label_selector=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Start a watch-backed pod cache for long-running monitoring of the given namespaces
+    (every namespace if None). Pass it as 'informer' to skip listing pods on each pass.
+    """
+    return PodInformer(_core_api(use_mock), namespaces, label_selector=label_selector, page_size=page_size).start()
+
+
+def _namespace_set(namespaces):
+    return None if namespaces is None else set(namespaces)
+
+
+def _describe_namespaces(namespaces):
+    return "all" if namespaces is None else ", ".join(namespaces)
 
-        console.print(f"Monitoring namespaces: [bold cyan]{', '.join(namespaces)}[/bold cyan]")
+
+# Monitor resources in real-time
+def monitor_resources(namespace=None, use_mock=False, minutes=10, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_NAMESPACE_TIMEOUT,
+                      all_namespaces=False, informer=None, writer=None, recent=None, dispatcher=None, dashboard=None,
+                      verbose=False, label_selector=None, page_size=DEFAULT_PAGE_SIZE):
+    try:
+        namespaces = _resolve_namespaces(namespace, all_namespaces)
+
+        # With a live dashboard the progress lines would only scroll it away
+        if dashboard is None or verbose:
+            console.print(f"Monitoring namespaces: [bold cyan]{_describe_namespaces(namespaces)}[/bold cyan]")
+            _print_api_source(use_mock)
         init_db()
+        kube_client.configure(concurrency)
 
-        for ns in namespaces:
-            console.print(f"Fetching pods from namespace: {ns}")
-            monitor_namespace(ns, use_mock, minutes)
+        if all_namespaces:
+            results = fetch_cluster(namespaces, use_mock, timeout, informer=informer, label_selector=label_selector,
+                                    page_size=page_size)
+        else:
+            fetch = lambda ns: fetch_namespace(ns, use_mock, timeout, informer, label_selector, page_size)
+            results = fetch_namespaces(namespaces, fetch, concurrency, timeout)
+
+        owns_writer = writer is None
+        if owns_writer:
+            writer = UsageWriter()
+        config = load_config()
+        owns_dispatcher = dispatcher is None
+        if owns_dispatcher:
+            dispatcher = alert_dispatcher(config)
+
+        monitored = []
+        try:
+            for ns, result, error in results:
+                monitored.append(ns)
+                if error is not None:
+                    console.print(f"[red]Error fetching namespace {ns}: {error}[/red]")
+                    logging.error(f"Error fetching namespace {ns}: {error}")
+                    continue
+
+                pods, pod_metrics = result
+                monitor_namespace(ns, use_mock, minutes, writer=writer, pods=pods, pod_metrics=pod_metrics, recent=recent,
+                                  dispatcher=dispatcher, config=config, dashboard=dashboard, verbose=verbose)
+            # Namespaces that are no longer monitored stop appearing on /metrics
+            REGISTRY.retain_namespaces(monitored)
+        finally:
+            if owns_writer:
+                writer.close()
+            else:
+                writer.flush()
+            # One digest per channel for the whole pass
+            if dispatcher is not None:
+                if owns_dispatcher:
+                    dispatcher.close()
+                else:
+                    dispatcher.end_cycle()
 
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
 
 
-def monitor_namespace(namespace, use_mock, minutes=10):
-    config = load_config()
-    if use_mock:
-        console.print("[green]Using mock Kubernetes API[/green]")
-        v1 = mock_kubernetes_api()
-    else:
-        console.print("[green]Using real Kubernetes API[/green]")
-        kube_config.load_kube_config()
-        v1 = client.CoreV1Api()
+def monitor_namespace(namespace, use_mock, minutes=10, writer=None, pods=None, pod_metrics=None, informer=None, recent=None,
+                      dispatcher=None, config=None, dashboard=None, verbose=False):
+    if config is None:
+        config = load_config()
+    if pods is None:
+        _print_api_source(use_mock)
+        pods, pod_metrics = fetch_namespace(namespace, use_mock, informer=informer)
 
-    pods = v1.list_namespaced_pod(namespace=namespace)
-    console.print(f"Fetched {len(pods.items)} pods in namespace: {namespace}")
+    if dashboard is None or verbose:
+        console.print(f"Fetched {len(pods)} pods in namespace: {namespace}")
 
-    if not pods.items:
-        console.print(f"[red]No pods found in namespace: {namespace}[/red]")
+    if not pods:
+        if dashboard is None or verbose:
+            console.print(f"[red]No pods found in namespace: {namespace}[/red]")
+        if dashboard is not None:
+            dashboard.update(namespace, [])
+        REGISTRY.update_pods(namespace, [])
         return
 
-    pod_metrics = get_pod_metrics(namespace)
     table = Table(show_header=True, header_style="bold magenta")
     table.add_column("Pod Name", style="dim")
     table.add_column("Phase")
-    table.add_column("CPU Usage (%)")
+    table.add_column("CPU Usage (m)")
     table.add_column("Memory Usage (Mi)")
-    table.add_column("Historical CPU Usage (%)")
+    table.add_column("Historical CPU Usage (m)")
     table.add_column("Historical Memory Usage (Mi)")
 
-    for pod in pods.items:
-        pod_name = str(pod.metadata.name)
-        phase = str(pod.status.phase)
+    owns_writer = writer is None
+    if owns_writer:
+        writer = UsageWriter()
+
+    timestamp = int(time.time())
+    rows = []
+    pod_requests = {}
+    with span(STORE, namespace):
+        for pod in pods:
+            pod_name = str(pod.name)
+            phase = str(pod.phase)
+            pod_requests[pod_name] = (pod.cpu_request, pod.memory_request)
+
+            if verbose:
+                console.print(f"[blue]Processing pod: {pod_name} with phase {phase} in namespace {namespace}[/blue]")
+
+            if pod_name in pod_metrics:
+                cpu_usage = pod_metrics[pod_name]['cpu']
+                memory_usage = pod_metrics[pod_name]['memory']
+            else:
+                cpu_usage = None
+                memory_usage = None
+
+            writer.log(pod_name, namespace, cpu_usage, memory_usage, timestamp)
+            if recent is not None:
+                recent.record(namespace, pod_name, timestamp, cpu_usage, memory_usage)
+            rows.append((pod_name, phase, cpu_usage, memory_usage))
+
+        pod_names = [row[0] for row in rows]
+        if recent is not None:
+            recent.retain(namespace, pod_names)
+
+    with span(HISTORY, namespace):
+        if recent is not None and recent.covers_namespace(namespace, pod_names, 60):
+            histories = recent.histories(namespace)
+        else:
+            # Write the whole namespace in one transaction before reading history back
+            writer.flush()
+            histories = get_bulk_historical_usage(namespace)
+
+        if owns_writer:
+            writer.close()
+
+    with span(RENDER, namespace):
+        dashboard_rows = []
+        for pod_name, phase, cpu_usage, memory_usage in rows:
+            history = histories.get((namespace, pod_name), [])
+
+            historical_cpu = [usage['cpu'] for usage in history]
+            historical_memory = [usage['memory'] for usage in history]
+            avg_cpu = sum(historical_cpu) / len(historical_cpu) if history else None
+            avg_memory = sum(historical_memory) / len(historical_memory) if history else None
+
+            if dashboard is not None:
+                dashboard_rows.append((pod_name, phase, cpu_usage, memory_usage, avg_cpu, avg_memory))
+            else:
+                table.add_row(
+                    pod_name, phase,
+                    format_cpu(cpu_usage), format_memory(memory_usage),
+                    ", ".join(map(format_cpu, historical_cpu)),
+                    ", ".join(map(format_memory, historical_memory))
+                )
+
+            if dispatcher is not None and history:
+                cpu_request, memory_request = pod_requests[pod_name]
+                trigger_alerts(pod_name, avg_cpu, avg_memory, config, dispatcher=dispatcher, namespace=namespace,
+                               cpu_request=cpu_request, memory_request=memory_request)
+
+        REGISTRY.update_pods(namespace, [(pod_name, cpu_usage, memory_usage) for pod_name, _, cpu_usage, memory_usage in rows])
+        if dashboard is not None:
+            dashboard.update(namespace, dashboard_rows)
+        else:
+            console.print(table)
 
-        console.print(f"[blue]Processing pod: {pod_name} with phase {phase} in namespace {namespace}[/blue]")
 
-        if pod_name in pod_metrics:
-            cpu_usage = pod_metrics[pod_name]['cpu']
-            memory_usage = pod_metrics[pod_name]['memory']
+def run_daemon(interval, namespace=None, use_mock=False, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_NAMESPACE_TIMEOUT,
+               all_namespaces=False, with_auto_scale=False, use_informer=True, max_cycles=None, dry_run=False,
+               dashboard=None, verbose=False, metrics_port=None, metrics_host=DEFAULT_METRICS_HOST, label_selector=None,
+               page_size=DEFAULT_PAGE_SIZE):
+    """
+    Monitor continuously, starting a cycle every 'interval' seconds until SIGTERM/SIGINT.
+    Pods are watched through an informer (real clusters only), samples go through one
+    long-lived writer, and pending writes are flushed on exit. With metrics_port set, the
+    latest samples, recommendations and phase timings are served at /metrics. Changes to
+    the alert settings or the configured namespaces take effect from the next cycle.
+    """
+    init_db()
+    namespaces = _resolve_namespaces(namespace, all_namespaces)
+
+    # Size the shared connection pool before the informer takes its client
+    kube_client.configure(concurrency)
+
+    informer = None
+    if use_informer and not use_mock:
+        informer = start_pod_informer(namespaces, use_mock, label_selector, page_size)
+        console.print(f"[green]Watching {len(informer)} pods[/green]")
+
+    # Keep at least an hour of samples per pod in memory so history never needs the database
+    recent = RecentUsage(capacity_for(interval))
+    recent.warm(namespaces)
+
+    writer = UsageWriter()
+    alert_config = load_config()
+    dispatcher = alert_dispatcher(alert_config)
+    resolver = workload_resolver(use_mock) if with_auto_scale else None
+
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = start_metrics_server(metrics_port, metrics_host)
+        console.print(f"[green]Serving metrics at http://{metrics_host}:{metrics_server.server_port}/metrics[/green]")
+
+    def reload():
+        nonlocal namespaces, informer, alert_config, dispatcher
+        try:
+            config = load_config()
+            current = _resolve_namespaces(namespace, all_namespaces)
+        except ConfigError as e:
+            console.print(f"[yellow]Keeping the previous settings: {e}[/yellow]")
+            logging.warning(f"Keeping the previous settings: {e}")
+            return
+
+        if config != alert_config:
+            # Sends what the old channels still have buffered before switching
+            if dispatcher is not None:
+                dispatcher.close()
+            alert_config = config
+            dispatcher = alert_dispatcher(config)
+            logging.info("Alert settings changed; rebuilt the alert channels")
+
+        if _namespace_set(current) != _namespace_set(namespaces):
+            added = None if current is None or namespaces is None else sorted(set(current) - set(namespaces))
+            if informer is not None:
+                # Start the new watch first so a failed list keeps the old one running
+                replacement = start_pod_informer(current, use_mock, label_selector, page_size)
+                informer.stop()
+                informer = replacement
+                console.print(f"[green]Namespaces changed; watching {len(informer)} pods[/green]")
+            namespaces = current
+            # Namespaces already in memory would get their samples twice
+            if added:
+                recent.warm(added)
+
+    def cycle(number):
+        reload()
+        if dashboard is None or verbose:
+            console.print(f"[bold]Cycle {number}[/bold]")
+        monitor_resources(namespace, use_mock, concurrency=concurrency, timeout=timeout,
+                          all_namespaces=all_namespaces, informer=informer, writer=writer, recent=recent,
+                          dispatcher=dispatcher, dashboard=dashboard, verbose=verbose, label_selector=label_selector,
+                          page_size=page_size)
+        if with_auto_scale:
+            auto_scale(namespace, use_mock, concurrency=concurrency, timeout=timeout,
+                       all_namespaces=all_namespaces, informer=informer, recent=recent, resolver=resolver,
+                       dry_run=dry_run, label_selector=label_selector, page_size=page_size)
+
+    def report(number, duration, skipped):
+        REGISTRY.observe(CYCLE, duration)
+        REGISTRY.publish()
+        if dashboard is not None:
+            dashboard.status = f"cycle {number} took {duration:.2f}s"
         else:
-            cpu_usage = "N/A"
-            memory_usage = "N/A"
+            console.print(f"[cyan]Cycle {number} finished in {duration:.2f}s[/cyan]")
+        logging.info(f"Cycle {number} finished in {duration:.3f}s")
+        if skipped:
+            console.print(f"[yellow]Cycle {number} overran the {interval}s interval; skipped {skipped} cycle(s)[/yellow]")
+            logging.warning(f"Cycle {number} overran the {interval}s interval; skipped {skipped} cycle(s)")
+        if informer is not None and informer.overflowed():
+            console.print(f"[yellow]Pod cache is full (max {informer.max_pods} pods); listing pods from the API instead[/yellow]")
+
+    scheduler = Scheduler(interval, on_cycle=report)
+    scheduler.install_signal_handlers()
 
-        log_pod_usage(pod_name, namespace, cpu_usage, memory_usage)
-        history = get_historical_usage(pod_name, namespace)
+    try:
+        scheduler.run(cycle, max_cycles=max_cycles)
+    finally:
+        console.print("Shutting down: flushing pending writes")
+        writer.close()
+        if dispatcher is not None:
+            dispatcher.close()
+        if informer is not None:
+            informer.stop()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+
+
+def hpa_reconciler(dry_run=False, use_mock=False):
+    """
+    Create an HPAReconciler for one auto-scaling pass.
+    """
+    return HPAReconciler(_autoscaling_api(use_mock), dry_run=dry_run)
 
-        historical_cpu = [usage['cpu'] for usage in history]
-        historical_memory = [usage['memory'] for usage in history]
 
-        table.add_row(
-            pod_name, phase,
-            str(cpu_usage), str(memory_usage),
-            ", ".join(map(str, historical_cpu)),
-            ", ".join(map(str, historical_memory))
-        )
+def _report_hpa_change(change, dry_run):
+    target = f"{change.namespace}/{change.name}"
+    if change.action == UNCHANGED:
+        console.print(f"HPA {target} is up to date")
+    elif dry_run:
+        console.print(f"[cyan]\\[dry-run] Would {change.action} HPA {target}:[/cyan] {change.body['spec']}")
+    elif change.action == CREATE:
+        console.print(f"[green]Created HPA {target}[/green]")
+    else:
+        console.print(f"[green]Patched HPA {target}: {', '.join(change.body['spec'])}[/green]")
 
-    console.print(table)
 
-def configure_hpa(namespace, deployment_name, target_cpu_utilization_percentage=60, target_memory_utilization_percentage=None):
+def configure_hpa(namespace, workload_name, target_cpu_utilization_percentage=60, target_memory_utilization_percentage=None,
+                  kind="Deployment", reconciler=None):
     """
-    Configure or update the HPA for a given deployment.
+    Configure or update the HPA for a given workload (a Deployment unless 'kind' says otherwise).
+    Only the fields that differ are patched; pass a shared reconciler to reuse its HPA listing.
     """
-    kube_config.load_kube_config()
-    v1_autoscaling = client.AutoscalingV2Api()
+    if reconciler is None:
+        reconciler = hpa_reconciler()
 
-    hpa_name = f"{deployment_name}-hpa"
-    
-    try:
-        # Check if the HPA already exists
-        hpa = v1_autoscaling.read_namespaced_horizontal_pod_autoscaler(hpa_name, namespace)
-        console.print(f"[yellow]HPA {hpa_name} already exists. Modifying...[/yellow]")
-    except client.exceptions.ApiException as e:
-        if e.status == 404:
-            console.print(f"[green]Creating new HPA: {hpa_name}[/green]")
-            hpa = None
-        else:
-            raise
-
-    # Define CPU scaling policy
-    metrics = [V2MetricSpec(
-        type="Resource",
-        resource=V2ResourceMetricSource(name="cpu", target_average_utilization=target_cpu_utilization_percentage)
-    )]
-
-    # Optionally add memory scaling policy
-    if target_memory_utilization_percentage:
-        metrics.append(V2MetricSpec(
-            type="Resource",
-            resource=V2ResourceMetricSource(name="memory", target_average_utilization=target_memory_utilization_percentage)
-        ))
-
-    # Create the HPA specification
-    hpa_spec = V2HorizontalPodAutoscalerSpec(
-        scale_target_ref=V1CrossVersionObjectReference(
-            api_version="apps/v1",
-            kind="Deployment",
-            name=deployment_name,
-        ),
-        min_replicas=1,
-        max_replicas=10,  # Can be configured
-        metrics=metrics
-    )
-
-    # Either create or update the HPA
-    if not hpa:
-        hpa_body = V2HorizontalPodAutoscaler(
-            metadata={'name': hpa_name, 'namespace': namespace},
-            spec=hpa_spec
-        )
-        v1_autoscaling.create_namespaced_horizontal_pod_autoscaler(namespace, hpa_body)
-    else:
-        hpa.spec = hpa_spec
-        v1_autoscaling.replace_namespaced_horizontal_pod_autoscaler(hpa_name, namespace, hpa)
-    
-    console.print(f"[green]HPA {hpa_name} configured successfully.[/green]")
+    change = reconciler.reconcile(namespace, kind, workload_name, target_cpu_utilization_percentage,
+                                  target_memory_utilization_percentage)
+    _report_hpa_change(change, reconciler.dry_run)
+    return change
 
 
 # Auto-scale based on HPA logic
-def auto_scale(namespace=None, use_mock=False):
+def auto_scale(namespace=None, use_mock=False, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_NAMESPACE_TIMEOUT,
+               all_namespaces=False, informer=None, recent=None, resolver=None, dry_run=False, label_selector=None,
+               page_size=DEFAULT_PAGE_SIZE):
     try:
-        if not namespace:
-            namespaces = load_namespaces().get("namespaces", ["default"])
-        else:
-            namespaces = [namespace]
-
-        console.print(f"Auto-scaling namespaces: [bold cyan]{', '.join(namespaces)}[/bold cyan]")
+        namespaces = _resolve_namespaces(namespace, all_namespaces)
+        # Size the shared connection pool before the resolver and reconciler take its client
+        kube_client.configure(concurrency)
+        if resolver is None:
+            resolver = workload_resolver(use_mock)
+        # One reconciler per pass: each namespace's HPAs are listed at most once
+        reconciler = hpa_reconciler(dry_run, use_mock)
+        scaling_policy = load_autoscaling_policy()
+
+        console.print(f"Auto-scaling namespaces: [bold cyan]{_describe_namespaces(namespaces)}[/bold cyan]")
         init_db()
+        _print_api_source(use_mock)
+
+        if all_namespaces:
+            results = [(ns, pods, error) for ns, (pods, _), error in fetch_cluster(namespaces, use_mock, timeout, with_metrics=False, informer=informer,
+                                                                                   label_selector=label_selector, page_size=page_size)]
+            namespaces = [ns for ns, _, _ in results]
+        else:
+            fetch = lambda ns: list_pods(ns, use_mock, timeout, informer, label_selector, page_size)
+            results = fetch_namespaces(namespaces, fetch, concurrency, timeout)
+
+        # One grouped query per statistic for every namespace instead of one per pod;
+        # with recent samples in memory each namespace is answered from there instead
+        averages = histories = None
+        if recent is None:
+            with span(HISTORY):
+                averages = get_bulk_average_usage(namespaces, 10)
+                histories = get_bulk_historical_usage(namespaces)
+
+        monitored = []
+        for ns, pods, error in results:
+            monitored.append(ns)
+            if error is not None:
+                console.print(f"[red]Error fetching namespace {ns}: {error}[/red]")
+                logging.error(f"Error fetching namespace {ns}: {error}")
+                continue
 
-        for ns in namespaces:
             console.print(f"Auto-scaling analysis for namespace: {ns}")
-            auto_scale_namespace(ns, use_mock)
+            auto_scale_namespace(ns, use_mock, averages=averages, histories=histories, pods=pods, recent=recent,
+                                 resolver=resolver, reconciler=reconciler, scaling_policy=scaling_policy)
+        REGISTRY.retain_namespaces(monitored)
 
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
 
 
-def auto_scale_namespace(namespace, use_mock):
-    scaling_policy = load_autoscaling_policy()
+def auto_scale_namespace(namespace, use_mock, averages=None, histories=None, pods=None, informer=None, recent=None,
+                         resolver=None, reconciler=None, scaling_policy=None):
+    if scaling_policy is None:
+        scaling_policy = load_autoscaling_policy()
 
-    if use_mock:
-        console.print("[green]Using mock Kubernetes API[/green]")
-        v1 = mock_kubernetes_api()
-    else:
-        console.print("[green]Using real Kubernetes API[/green]")
-        kube_config.load_kube_config()
-        v1 = client.CoreV1Api()
+    if pods is None:
+        _print_api_source(use_mock)
+        pods = list_pods(namespace, use_mock, informer=informer)
+    if resolver is None:
+        resolver = workload_resolver(use_mock)
+    if reconciler is None:
+        reconciler = hpa_reconciler(use_mock=use_mock)
 
-    pods = v1.list_namespaced_pod(namespace=namespace)
-    console.print(f"Fetched {len(pods.items)} pods in namespace: {namespace}")
+    console.print(f"Fetched {len(pods)} pods in namespace: {namespace}")
 
-    if not pods.items:
+    if not pods:
         console.print(f"[red]No pods found in namespace: {namespace}[/red]")
+        REGISTRY.update_recommendations(namespace, [], [])
         return
 
-    table = Table(show_header=True, header_style="bold magenta")
-    table.add_column("Pod Name", style="dim")
-    table.add_column("Scaling Recommendation")
-
-    for pod in pods.items:
-        pod_name = str(pod.metadata.name)
-
-        avg_cpu, avg_memory = get_average_usage(pod_name, namespace, 10)
-        history = get_historical_usage(pod_name, namespace)
-
-        recommendation = get_scaling_recommendation(avg_cpu, avg_memory, scaling_policy, history=history)
+    # Group pods by the Deployment/StatefulSet that owns them; pods without a scalable owner are skipped
+    workloads = []
+    workload_index = {}
+    workload_pods = []
+    groups = []
+    pod_names = []
+    with span(GROUP, namespace):
+        for pod in pods:
+            workload = resolver.resolve(pod)
+            if workload is None:
+                continue
+            if workload not in workload_index:
+                workload_index[workload] = len(workloads)
+                workloads.append(workload)
+                workload_pods.append(0)
+            group = workload_index[workload]
+            workload_pods[group] += 1
+            groups.append(group)
+            pod_names.append(str(pod.name))
+
+    skipped = len(pods) - len(pod_names)
+    if skipped:
+        console.print(f"[yellow]Skipping {skipped} pod(s) without a scalable owner in namespace: {namespace}[/yellow]")
+    if not workloads:
+        REGISTRY.update_recommendations(namespace, [], [])
+        return
 
-        # Add the data to the table
-        table.add_row(pod_name, recommendation)
+    keys = [(namespace, pod_name) for pod_name in pod_names]
 
-        # Call HPA function to apply autoscaling based on the recommendation
-        if recommendation.startswith("Scale Up"):
-            configure_hpa(namespace, pod_name, target_cpu_utilization_percentage=80)
-        elif recommendation.startswith("Scale Down"):
-            configure_hpa(namespace, pod_name, target_cpu_utilization_percentage=30)
+    # Build per-pod columns (10-minute averages, 60-minute history), then pool them per workload
+    with span(RECOMMEND, namespace):
+        if (averages is None or histories is None) and recent is not None and recent.covers_namespace(namespace, pod_names, 60):
+            now = int(time.time())
+            buffers = recent.buffers(namespace)
+            avg_cpu, avg_memory = window_averages(*buffer_columns(pod_names, buffers, now - 10 * 60))
+            cpu, memory, counts = buffer_columns(pod_names, buffers, now - 60 * 60)
+        else:
+            if averages is None or histories is None:
+                averages = get_bulk_average_usage(namespace, 10)
+                histories = get_bulk_historical_usage(namespace)
+            avg_cpu, avg_memory = averages_columns(keys, averages)
+            cpu, memory, counts = history_columns(keys, histories)
+
+        columns = group_columns(groups, len(workloads), avg_cpu, avg_memory, cpu, memory, counts)
+        decisions = recommend_batch(workloads, *columns, scaling_policy)
+        REGISTRY.update_recommendations(namespace, workloads, decisions)
+
+    with span(RENDER, namespace):
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Workload", style="dim")
+        table.add_column("Pods")
+        table.add_column("Scaling Recommendation")
+
+        for workload, pod_count, decision in zip(workloads, workload_pods, decisions):
+            table.add_row(f"{workload.kind}/{workload.name}", str(pod_count), decision.describe())
+        console.print(table)
+
+    # Exactly one HPA per workload, however many pods it runs
+    for workload, decision in zip(workloads, decisions):
+        if decision.action == SCALE_UP:
+            target = 80
+        elif decision.action == SCALE_DOWN:
+            target = 30
+        else:
+            continue
+        try:
+            configure_hpa(namespace, workload.name, target_cpu_utilization_percentage=target, kind=workload.kind, reconciler=reconciler)
+        except ApiException as e:
+            # One rejected HPA (say a 403 or 422) should not leave the other workloads unscaled
+            console.print(f"[red]Could not configure the HPA for {workload.kind}/{workload.name} in {namespace}: {e.status} {e.reason}[/red]")
 
-    console.print(table)
 
+def _pod_usage(pod, per_container=False):
+    """
+    Sum the usage of every container in a metrics.k8s.io pod entry into millicores and bytes.
+    With per_container, the per-container values are included under "containers".
+    """
+    cpu = 0
+    memory = 0
+    containers = {}
+    for container in pod.get('containers', []):
+        usage = container.get('usage', {})
+        container_cpu = parse_cpu(usage.get('cpu', '0'))
+        container_memory = parse_memory(usage.get('memory', '0'))
+        cpu += container_cpu
+        memory += container_memory
+        if per_container:
+            containers[container.get('name')] = {"cpu": container_cpu, "memory": container_memory}
+
+    usage = {"cpu": cpu, "memory": memory}
+    if per_container:
+        usage["containers"] = containers
+    return usage
+
+
+def _add_pod_usage(pod_metrics, pod, per_container):
+    pod_name = pod['metadata']['name']
+    try:
+        pod_metrics[pod_name] = _pod_usage(pod, per_container)
+    except ValueError as e:
+        logging.warning(f"Skipping metrics for pod {pod_name}: {e}")
 
 
-def get_pod_metrics(namespace):
+def get_pod_metrics(namespace, timeout=None, per_container=False, use_mock=False):
+    """
+    Fetch pod metrics for a namespace, keyed by pod name. CPU is in millicores and memory
+    in bytes, summed over all containers of the pod.
+    """
     try:
-        api_instance = client.CustomObjectsApi()
-        metrics = api_instance.list_namespaced_custom_object(
-            group="metrics.k8s.io",
-            version="v1beta1",
-            namespace=namespace,
-            plural="pods"
-        )
+        api_instance = _custom_objects_api(use_mock)
+        with span(FETCH_METRICS, namespace):
+            metrics = api_instance.list_namespaced_custom_object(
+                group="metrics.k8s.io",
+                version="v1beta1",
+                namespace=namespace,
+                plural="pods",
+                _request_timeout=timeout
+            )
 
         pod_metrics = {}
         for pod in metrics['items']:
-            pod_name = pod['metadata']['name']
-            cpu_usage = pod['containers'][0]['usage']['cpu']
-            memory_usage = pod['containers'][0]['usage']['memory']
-            pod_metrics[pod_name] = {
-                "cpu": cpu_usage,
-                "memory": memory_usage
-            }
+            _add_pod_usage(pod_metrics, pod, per_container)
 
         return pod_metrics
 
@@ -238,56 +715,88 @@ def get_pod_metrics(namespace):
         return {}
 
 
-def get_scaling_recommendation(avg_cpu, avg_memory, scaling_policy, history=None):
-    target_cpu = scaling_policy.get("cpu_threshold", 60)
-    target_memory = scaling_policy.get("memory_threshold", 60)
-    max_replicas_change = scaling_policy.get("max_replicas_change", 5)
+def get_cluster_pod_metrics(timeout=None, per_container=False, use_mock=False):
+    """
+    Fetch the metrics of every pod in the cluster with a single call, grouped by namespace.
+    """
+    try:
+        api_instance = _custom_objects_api(use_mock)
+        with span(FETCH_METRICS):
+            metrics = api_instance.list_cluster_custom_object(
+                group="metrics.k8s.io",
+                version="v1beta1",
+                plural="pods",
+                _request_timeout=timeout
+            )
+
+        metrics_by_namespace = {}
+        for pod in metrics['items']:
+            namespace = pod['metadata']['namespace']
+            _add_pod_usage(metrics_by_namespace.setdefault(namespace, {}), pod, per_container)
 
-    recommendation = "No Scaling Needed"
+        return metrics_by_namespace
 
-    if avg_cpu is None or avg_memory is None:
-        return recommendation
+    except Exception as e:
+        console.print(f"[red]Error fetching cluster pod metrics: {e}[/red]")
+        return {}
 
-    avg_cpu = float(avg_cpu)
-    avg_memory = float(avg_memory)
 
-    if avg_cpu == 0 and avg_memory == 0:
-        return "No Scaling Needed"
+def get_scaling_recommendation(avg_cpu, avg_memory, scaling_policy, history=None):
+    """
+    Scaling recommendation for a single pod as display text; see recommendation.recommend_batch for many pods.
+    """
+    return recommend(None, avg_cpu, avg_memory, scaling_policy, history).describe()
 
-    if history:
-        avg_cpu_trend = sum([usage['cpu'] for usage in history]) / len(history)
-        avg_memory_trend = sum([usage['memory'] for usage in history]) / len(history)
 
-        if avg_cpu_trend > target_cpu or avg_memory_trend > target_memory:
-            scale_up_by = min(max_replicas_change, max(1, int((avg_cpu_trend - target_cpu) / 10)))
-            recommendation = f"Scale Up by {scale_up_by} replicas due to usage trend"
-        elif avg_cpu_trend < target_cpu and avg_memory_trend < target_memory:
-            scale_down_by = min(max_replicas_change, max(0, int((target_cpu - avg_cpu_trend) / 10)))
-            recommendation = f"Scale Down by {scale_down_by} replicas due to usage trend"
+# Alert logic remains unchanged from your original code
+def alert_dispatcher(config=None):
+    """
+    Start an AlertDispatcher for the channels in config.json, or return None if none are configured.
+    """
+    channels = channels_from_config(load_config() if config is None else config)
+    if not channels:
+        return None
+    return AlertDispatcher(channels).start()
 
-    return recommendation
 
+def _percent_of_request(usage, request):
+    if usage is None or not request:
+        return None
+    return usage / request * 100
 
-# Alert logic remains unchanged from your original code
-def trigger_alerts(pod_name, avg_cpu, avg_memory, config, cpu_threshold=80, memory_threshold=75):
+
+def trigger_alerts(pod_name, avg_cpu, avg_memory, config, cpu_threshold=80, memory_threshold=75, dispatcher=None,
+                   namespace=None, cpu_request=None, memory_request=None):
+    """
+    Alert when a pod's average usage is above a threshold percentage of what it requests
+    (avg_cpu and cpu_request in millicores, avg_memory and memory_request in bytes).
+    A resource the pod sets no request for is not checked.
+    """
     alert_triggered = False
     email_subject = f"Alert: High Resource Usage on {pod_name}"
     alert_message = ""
 
-    if avg_cpu > cpu_threshold:
-        console.print(f"[bold red]ALERT: High CPU usage on {pod_name}: {avg_cpu}% (Threshold: {cpu_threshold}%) [/bold red]")
-        alert_message += f"CPU usage on {pod_name} is at {avg_cpu}% (Threshold: {cpu_threshold}%)\n"
-        logging.info(f"High CPU usage on {pod_name}: {avg_cpu}%")
+    cpu_percent = _percent_of_request(avg_cpu, cpu_request)
+    if cpu_percent is not None and cpu_percent > cpu_threshold:
+        usage = f"{cpu_percent:.0f}% of its {format_cpu(cpu_request)}m request ({format_cpu(avg_cpu)}m)"
+        console.print(f"[bold red]ALERT: High CPU usage on {pod_name}: {usage} (Threshold: {cpu_threshold}%) [/bold red]")
+        alert_message += f"CPU usage on {pod_name} is at {usage} (Threshold: {cpu_threshold}%)\n"
+        logging.info(f"High CPU usage on {pod_name}: {usage}")
         alert_triggered = True
 
-    memory_usage_mib = avg_memory / 1024
-    if memory_usage_mib > memory_threshold:
-        console.print(f"[bold red]ALERT: High Memory usage on {pod_name}: {memory_usage_mib}Mi (Threshold: {memory_threshold}Mi) [/bold red]")
-        alert_message += f"Memory usage on {pod_name} is at {memory_usage_mib}Mi (Threshold: {memory_threshold}Mi)\n"
-        logging.info(f"High Memory usage on {pod_name}: {memory_usage_mib}Mi")
+    memory_percent = _percent_of_request(avg_memory, memory_request)
+    if memory_percent is not None and memory_percent > memory_threshold:
+        usage = f"{memory_percent:.0f}% of its {format_memory(memory_request)}Mi request ({format_memory(avg_memory)}Mi)"
+        console.print(f"[bold red]ALERT: High Memory usage on {pod_name}: {usage} (Threshold: {memory_threshold}%) [/bold red]")
+        alert_message += f"Memory usage on {pod_name} is at {usage} (Threshold: {memory_threshold}%)\n"
+        logging.info(f"High Memory usage on {pod_name}: {usage}")
         alert_triggered = True
 
-    if alert_triggered:
+    if alert_triggered and dispatcher is not None:
+        # Queued for the cycle digest; sending happens on the dispatcher's worker thread
+        label = f"{namespace}/{pod_name}" if namespace else pod_name
+        dispatcher.alert((namespace, pod_name), f"[{label}]\n{alert_message}")
+    elif alert_triggered:
         if "email_host" in config and "recipient_email" in config:
             send_email_alert(email_subject, alert_message)
             logging.info(f"Email alert sent for {pod_name}")
@@ -1,24 +1,22 @@
-import json
-import os
+from k8s_monitor.config_store import default_store
 
 NAMESPACE_FILE = "namespaces.json"
 
+NAMESPACE_SCHEMA = {
+    'namespaces': (list, lambda namespaces: all(isinstance(ns, str) and ns for ns in namespaces)),
+}
+
 def load_namespaces():
     """
     Load the list of namespaces to monitor from the namespaces.json file.
     """
-    if os.path.exists(NAMESPACE_FILE):
-        with open(NAMESPACE_FILE, 'r') as file:
-            return json.load(file)
-    else:
-        return {}
+    return default_store().load(NAMESPACE_FILE, NAMESPACE_SCHEMA)
 
 def save_namespaces(namespaces):
     """
     Save the list of namespaces to the namespaces.json file.
     """
-    with open(NAMESPACE_FILE, 'w') as file:
-        json.dump(namespaces, file, indent=4)
+    default_store().save(NAMESPACE_FILE, namespaces, NAMESPACE_SCHEMA)
 
 def view_namespaces():
     """
@@ -36,8 +34,7 @@ def reset_namespaces():
     """
     Reset the namespace list by clearing the namespaces.json file.
     """
-    if os.path.exists(NAMESPACE_FILE):
-        os.remove(NAMESPACE_FILE)
+    if default_store().remove(NAMESPACE_FILE):
         print("Namespaces reset successfully.")
     else:
         print("No namespace file found to reset.")
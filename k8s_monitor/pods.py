@@ -0,0 +1,151 @@
+import json
+from collections import namedtuple
+from k8s_monitor.defaults import DEFAULT_PAGE_SIZE
+from k8s_monitor.utils.quantity import parse_cpu, parse_memory
+
+try:
+    # Optional: several times faster than the json module on large pod lists
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Slim view of a pod holding only the fields the monitor reads; requests are summed over the
+# pod's containers (millicores and bytes), None when no container sets one
+PodRecord = namedtuple("PodRecord", ["namespace", "name", "phase", "owner_kind", "owner_name", "cpu_request",
+                                     "memory_request"], defaults=(None, None))
+
+
+def _controller_reference(owner_references):
+    """
+    Return the owner reference marked as the pod's controller, if any.
+    """
+    for reference in owner_references or ():
+        if reference.controller:
+            return reference
+    return None
+
+
+def _total_requests(container_requests):
+    """
+    Sum the cpu and memory requests of a pod's containers.
+    """
+    cpu = memory = None
+    for requests in container_requests:
+        if not requests:
+            continue
+        if "cpu" in requests:
+            cpu = (cpu or 0) + parse_cpu(requests["cpu"])
+        if "memory" in requests:
+            memory = (memory or 0) + parse_memory(requests["memory"])
+    return cpu, memory
+
+
+def pod_record(pod):
+    """
+    Project a V1Pod (or any object shaped like one) onto a PodRecord.
+    """
+    owner = _controller_reference(pod.metadata.owner_references)
+    spec = getattr(pod, "spec", None)
+    containers = (spec.containers or ()) if spec is not None else ()
+    cpu_request, memory_request = _total_requests(
+        container.resources.requests if container.resources else None for container in containers
+    )
+    return PodRecord(
+        pod.metadata.namespace,
+        pod.metadata.name,
+        pod.status.phase,
+        owner.kind if owner else None,
+        owner.name if owner else None,
+        cpu_request,
+        memory_request,
+    )
+
+
+def pod_record_from_dict(document):
+    """
+    Project a pod as decoded from the API's JSON (camelCase keys) onto a PodRecord.
+    """
+    metadata = document["metadata"]
+    owner = None
+    for reference in metadata.get("ownerReferences") or ():
+        if reference.get("controller"):
+            owner = reference
+            break
+    containers = (document.get("spec") or {}).get("containers") or ()
+    cpu_request, memory_request = _total_requests(
+        (container.get("resources") or {}).get("requests") for container in containers
+    )
+    return PodRecord(
+        metadata.get("namespace"),
+        metadata["name"],
+        (document.get("status") or {}).get("phase"),
+        owner["kind"] if owner else None,
+        owner["name"] if owner else None,
+        cpu_request,
+        memory_request,
+    )
+
+
+def read_json(response):
+    """
+    Decode the body of a call made with _preload_content=False and release its connection.
+    """
+    try:
+        return _loads(response.data)
+    finally:
+        response.release_conn()
+
+
+# Completed pods use no resources and are never scaled, so the API server leaves them out
+ACTIVE_PODS_SELECTOR = "status.phase!=Succeeded,status.phase!=Failed"
+
+
+def list_pages(list_func, page_size=DEFAULT_PAGE_SIZE, field_selector=ACTIVE_PODS_SELECTOR, label_selector=None, raw=False,
+               **kwargs):
+    """
+    Yield each page of a paginated list call (list_namespaced_pod, list_pod_for_all_namespaces, ...),
+    following the continue token until the last page. Every page belongs to the same
+    consistent snapshot, whose resourceVersion is on each page's metadata.
+
+    With raw the client's models are skipped: each page is the decoded JSON document
+    (a dict with camelCase keys) instead.
+    """
+    if field_selector:
+        kwargs["field_selector"] = field_selector
+    if label_selector:
+        kwargs["label_selector"] = label_selector
+    if raw:
+        kwargs["_preload_content"] = False
+    token = None
+    while True:
+        if token:
+            kwargs["_continue"] = token
+        page = list_func(limit=page_size, **kwargs)
+        if raw:
+            page = read_json(page)
+            token = page["metadata"].get("continue")
+        else:
+            token = page.metadata._continue
+        yield page
+        # Let the caller's page go before the next one is fetched
+        del page
+        if not token:
+            return
+
+
+def iter_pods(list_func, page_size=DEFAULT_PAGE_SIZE, field_selector=ACTIVE_PODS_SELECTOR, label_selector=None, raw=True,
+              **kwargs):
+    """
+    Stream PodRecords from a paginated list call, one page at a time, so memory stays bounded
+    by the page size rather than the number of pods. By default pods are projected straight
+    from the response JSON, which is far cheaper than building the client's V1Pod models.
+    """
+    for page in list_pages(list_func, page_size, field_selector, label_selector, raw, **kwargs):
+        if raw:
+            for pod in page.get("items") or ():
+                yield pod_record_from_dict(pod)
+        else:
+            for pod in page.items:
+                yield pod_record(pod)
+        del page
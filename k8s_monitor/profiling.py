@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from time import perf_counter_ns
+from k8s_monitor.exporter import REGISTRY
+
+# Phases of a monitoring or auto-scaling pass
+LIST_PODS = "list_pods"
+FETCH_METRICS = "fetch_metrics"
+STORE = "store"
+HISTORY = "history"
+DB_WRITE = "db_write"
+RENDER = "render"
+GROUP = "group"
+RECOMMEND = "recommend"
+HPA_RECONCILE = "hpa_reconcile"
+CYCLE = "cycle"
+
+# Namespaces listed in the per-namespace breakdown of the summary
+SUMMARY_NAMESPACES = 10
+
+_active = None
+
+
+class Span:
+    """
+    Time one phase (optionally of one namespace) with perf_counter_ns.
+
+    Every span feeds the phase latency histogram served at /metrics; it is only recorded
+    individually while a Profiler is running, so spans cost one clock read on each side and
+    a histogram update otherwise.
+    """
+
+    __slots__ = ("phase", "namespace", "started")
+
+    def __init__(self, phase, namespace=None):
+        self.phase = phase
+        self.namespace = namespace
+
+    def __enter__(self):
+        self.started = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = perf_counter_ns()
+        REGISTRY.observe(self.phase, (ended - self.started) / 1e9)
+        profiler = _active
+        if profiler is not None:
+            profiler.spans.append((self.phase, self.namespace, threading.get_ident(), self.started, ended))
+
+
+def span(phase, namespace=None):
+    return Span(phase, namespace)
+
+
+class Profiler:
+    """
+    Record every span between start() and stop() (from any thread), optionally under cProfile.
+
+    Spans nest (a db_write happens inside a history read, for example), so phase totals can
+    add up to more than the wall time. cProfile only sees the thread that started it, so
+    fetches running on worker threads show up as spans but not in the pstats output.
+    """
+
+    def __init__(self, cprofile=False):
+        self.spans = []
+        self.started = None
+        self.stopped = None
+        self._cprofile = None
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+
+    def start(self):
+        global _active
+        self.started = perf_counter_ns()
+        _active = self
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def stop(self):
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        _active = None
+        self.stopped = perf_counter_ns()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def wall_ms(self):
+        return ((self.stopped or perf_counter_ns()) - self.started) / 1e6
+
+    def phase_totals(self):
+        """
+        Return {phase: (calls, total_ms, max_ms)}.
+        """
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for phase, _, _, started, ended in self.spans:
+            duration = (ended - started) / 1e6
+            total = totals[phase]
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], duration)
+        return {phase: tuple(total) for phase, total in totals.items()}
+
+    def namespace_totals(self):
+        """
+        Return {namespace: {phase: total_ms}} for the spans attributed to a namespace.
+        """
+        totals = defaultdict(lambda: defaultdict(float))
+        for phase, namespace, _, started, ended in self.spans:
+            if namespace is not None:
+                totals[namespace][phase] += (ended - started) / 1e6
+        return totals
+
+    def print_summary(self, console=None):
+        from rich.console import Console
+        from rich.table import Table
+
+        console = console or Console()
+        wall = self.wall_ms()
+
+        table = Table(title=f"Profile: {wall:.1f} ms wall, {len(self.spans)} spans", header_style="bold magenta")
+        table.add_column("Phase")
+        table.add_column("Calls", justify="right")
+        table.add_column("Total (ms)", justify="right")
+        table.add_column("Mean (ms)", justify="right")
+        table.add_column("Max (ms)", justify="right")
+        table.add_column("Share of wall", justify="right")
+        for phase, (calls, total, longest) in sorted(self.phase_totals().items(), key=lambda item: -item[1][1]):
+            table.add_row(phase, str(calls), f"{total:.1f}", f"{total / calls:.2f}", f"{longest:.1f}",
+                          f"{total / wall:.0%}" if wall else "-")
+        console.print(table)
+
+        namespaces = self.namespace_totals()
+        if not namespaces:
+            return
+        phases = sorted({phase for totals in namespaces.values() for phase in totals})
+        slowest = sorted(namespaces.items(), key=lambda item: -sum(item[1].values()))[:SUMMARY_NAMESPACES]
+
+        table = Table(title=f"Slowest namespaces (of {len(namespaces)}), ms", header_style="bold magenta")
+        table.add_column("Namespace")
+        for phase in phases:
+            table.add_column(phase, justify="right")
+        for namespace, totals in slowest:
+            table.add_row(namespace, *(f"{totals[phase]:.1f}" if phase in totals else "" for phase in phases))
+        console.print(table)
+
+    def dump_stats(self, path):
+        """
+        Write the cProfile statistics for pstats / snakeviz.
+        """
+        if self._cprofile is None:
+            raise ValueError("Profiler was created without cprofile=True")
+        self._cprofile.dump_stats(path)
+        return path
+
+    def write_trace(self, path):
+        """
+        Write the spans as Chrome trace-event JSON (chrome://tracing, Perfetto).
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": phase,
+                "cat": "k8s_monitor",
+                "ph": "X",
+                "ts": (started - self.started) / 1000,
+                "dur": (ended - started) / 1000,
+                "pid": pid,
+                "tid": thread,
+                "args": {"namespace": namespace} if namespace is not None else {},
+            }
+            for phase, namespace, thread, started, ended in self.spans
+        ]
+        with open(path, 'w') as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        return path
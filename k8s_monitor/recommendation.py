@@ -0,0 +1,217 @@
+from collections import namedtuple
+from itertools import chain
+from operator import itemgetter
+import numpy as np
+
+SCALE_UP = "scale_up"
+SCALE_DOWN = "scale_down"
+NO_SCALING = "none"
+
+_CPU = itemgetter('cpu')
+_MEMORY = itemgetter('memory')
+
+
+class ScalingDecision(namedtuple("ScalingDecision", ["key", "action", "replicas", "cpu_trend", "memory_trend"])):
+    """
+    Scaling decision for one pod (or workload): the action, the replica change and the usage trends behind it.
+    """
+
+    __slots__ = ()
+
+    def describe(self):
+        """
+        Human-readable form, as shown in the auto-scale table.
+        """
+        if self.action == SCALE_UP:
+            return f"Scale Up by {self.replicas} replicas due to usage trend"
+        if self.action == SCALE_DOWN:
+            return f"Scale Down by {self.replicas} replicas due to usage trend"
+        return "No Scaling Needed"
+
+
+def _policy_targets(scaling_policy):
+    return (
+        scaling_policy.get("cpu_threshold", 60),
+        scaling_policy.get("memory_threshold", 60),
+        scaling_policy.get("max_replicas_change", 5),
+    )
+
+
+def recommend(key, avg_cpu, avg_memory, scaling_policy, history=None):
+    """
+    Decide scaling for a single pod from its window averages and usage history.
+    This is the reference implementation that recommend_batch() vectorizes.
+    """
+    target_cpu, target_memory, max_replicas_change = _policy_targets(scaling_policy)
+
+    if avg_cpu is None or avg_memory is None:
+        return ScalingDecision(key, NO_SCALING, 0, None, None)
+
+    if float(avg_cpu) == 0 and float(avg_memory) == 0:
+        return ScalingDecision(key, NO_SCALING, 0, None, None)
+
+    if not history:
+        return ScalingDecision(key, NO_SCALING, 0, None, None)
+
+    avg_cpu_trend = sum(usage['cpu'] for usage in history) / len(history)
+    avg_memory_trend = sum(usage['memory'] for usage in history) / len(history)
+
+    if avg_cpu_trend > target_cpu or avg_memory_trend > target_memory:
+        scale_up_by = min(max_replicas_change, max(1, int((avg_cpu_trend - target_cpu) / 10)))
+        return ScalingDecision(key, SCALE_UP, scale_up_by, avg_cpu_trend, avg_memory_trend)
+    if avg_cpu_trend < target_cpu and avg_memory_trend < target_memory:
+        scale_down_by = min(max_replicas_change, max(0, int((target_cpu - avg_cpu_trend) / 10)))
+        return ScalingDecision(key, SCALE_DOWN, scale_down_by, avg_cpu_trend, avg_memory_trend)
+    return ScalingDecision(key, NO_SCALING, 0, avg_cpu_trend, avg_memory_trend)
+
+
+def averages_columns(keys, averages):
+    """
+    Turn a {key: (avg_cpu, avg_memory)} mapping into two float arrays aligned with keys (NaN if unknown).
+    """
+    pairs = [averages.get(key, (None, None)) for key in keys]
+    avg_cpu = np.array([cpu for cpu, _ in pairs], dtype=float)
+    avg_memory = np.array([memory for _, memory in pairs], dtype=float)
+    return avg_cpu, avg_memory
+
+
+def window_averages(cpu, memory, counts):
+    """
+    Per-row means of zero-padded sample columns, NaN where a row has no samples.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cpu.sum(axis=1) / counts, memory.sum(axis=1) / counts
+
+
+def history_columns(keys, histories):
+    """
+    Turn a {key: [{'cpu', 'memory', ...}, ...]} mapping into zero-padded (pods x samples)
+    CPU and memory arrays plus the number of samples per pod.
+    """
+    rows = [histories.get(key, ()) for key in keys]
+    counts = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    width = int(counts.max()) if len(rows) else 0
+
+    # Scatter the flattened samples into the padded matrix in one step (row-major order matches)
+    filled = np.arange(width) < counts[:, None]
+    cpu = np.zeros((len(rows), width))
+    memory = np.zeros((len(rows), width))
+    total = int(counts.sum())
+    cpu[filled] = np.fromiter(map(_CPU, chain.from_iterable(rows)), dtype=float, count=total)
+    memory[filled] = np.fromiter(map(_MEMORY, chain.from_iterable(rows)), dtype=float, count=total)
+    return cpu, memory, counts
+
+
+def buffer_columns(keys, buffers, since):
+    """
+    Build the same columns as history_columns straight from PodRingBuffers (keyed like keys),
+    keeping only samples at or after 'since'. Unused buffer slots have timestamp 0 and drop out.
+    """
+    buffers = [buffers.get(key) for key in keys]
+    capacity = max((buffer.capacity for buffer in buffers if buffer is not None), default=0)
+    empty = np.zeros(capacity)
+
+    def stack(field):
+        return np.stack([
+            np.frombuffer(getattr(buffer, field), dtype=float) if buffer is not None else empty
+            for buffer in buffers
+        ]) if buffers else np.zeros((0, capacity))
+
+    in_window = stack("timestamps") >= since
+    cpu = np.where(in_window, stack("cpu"), 0.0)
+    memory = np.where(in_window, stack("memory"), 0.0)
+    return cpu, memory, in_window.sum(axis=1)
+
+
+def group_columns(groups, group_count, avg_cpu, avg_memory, cpu, memory, counts):
+    """
+    Pool per-pod columns into per-group columns (e.g. one group per workload). 'groups'
+    gives each pod's group index. Group averages are the mean of the pod averages that
+    are known; group histories collapse to one summed sample column so window_averages()
+    yields the trend over every sample of every pod in the group.
+    """
+    groups = np.asarray(groups, dtype=np.intp)
+
+    def mean_known(values):
+        known = ~np.isnan(values)
+        totals = np.bincount(groups, weights=np.where(known, values, 0.0), minlength=group_count)
+        known_counts = np.bincount(groups, weights=known, minlength=group_count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(known_counts > 0, totals / known_counts, np.nan)
+
+    group_cpu = np.bincount(groups, weights=cpu.sum(axis=1), minlength=group_count)[:, None]
+    group_memory = np.bincount(groups, weights=memory.sum(axis=1), minlength=group_count)[:, None]
+    group_counts = np.bincount(groups, weights=counts, minlength=group_count).astype(np.int64)
+
+    return mean_known(avg_cpu), mean_known(avg_memory), group_cpu, group_memory, group_counts
+
+
+class ScalingDecisions:
+    """
+    Columnar result of recommend_batch(): per-pod actions, replica changes and trends as arrays.
+    Indexing or iterating yields ScalingDecision records, built on access.
+    """
+
+    _ACTIONS = (NO_SCALING, SCALE_UP, SCALE_DOWN)
+
+    def __init__(self, keys, action_codes, replicas, cpu_trend, memory_trend, has_trend):
+        self.keys = keys
+        self.action_codes = action_codes
+        self.replicas = replicas
+        self.cpu_trend = cpu_trend
+        self.memory_trend = memory_trend
+        self.has_trend = has_trend
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        has_trend = bool(self.has_trend[i])
+        return ScalingDecision(
+            self.keys[i],
+            self._ACTIONS[self.action_codes[i]],
+            int(self.replicas[i]),
+            float(self.cpu_trend[i]) if has_trend else None,
+            float(self.memory_trend[i]) if has_trend else None,
+        )
+
+    def __iter__(self):
+        for i in range(len(self.keys)):
+            yield self[i]
+
+    def actionable(self):
+        """
+        Yield only the decisions that scale up or down.
+        """
+        for i in np.flatnonzero(self.action_codes):
+            yield self[i]
+
+
+def recommend_batch(keys, avg_cpu, avg_memory, cpu, memory, counts, scaling_policy):
+    """
+    Decide scaling for every pod at once. avg_cpu/avg_memory are per-pod window averages
+    (NaN if unknown), cpu/memory are zero-padded (pods x samples) histories with 'counts'
+    valid samples per row. Returns ScalingDecisions in the order of keys, with the same
+    decisions as calling recommend() per pod.
+    """
+    target_cpu, target_memory, max_replicas_change = _policy_targets(scaling_policy)
+
+    cpu_trend, memory_trend = window_averages(cpu, memory, counts)
+
+    eligible = (
+        ~np.isnan(avg_cpu) & ~np.isnan(avg_memory)
+        & ~((avg_cpu == 0) & (avg_memory == 0))
+        & (counts > 0)
+    )
+    scale_up = eligible & ((cpu_trend > target_cpu) | (memory_trend > target_memory))
+    scale_down = eligible & ~scale_up & (cpu_trend < target_cpu) & (memory_trend < target_memory)
+
+    with np.errstate(invalid="ignore"):
+        up_by = np.minimum(max_replicas_change, np.maximum(1, np.trunc((cpu_trend - target_cpu) / 10)))
+        down_by = np.minimum(max_replicas_change, np.maximum(0, np.trunc((target_cpu - cpu_trend) / 10)))
+
+    # Codes index ScalingDecisions._ACTIONS: 0 none, 1 up, 2 down
+    action_codes = scale_up.astype(np.int8) + 2 * scale_down.astype(np.int8)
+    replicas = np.where(scale_up, up_by, np.where(scale_down, down_by, 0)).astype(np.int64)
+
+    return ScalingDecisions(list(keys), action_codes, replicas, cpu_trend, memory_trend, eligible)
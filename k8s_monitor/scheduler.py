@@ -0,0 +1,84 @@
+import logging
+import re
+import signal
+import threading
+import time
+
+_INTERVAL_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$')
+_INTERVAL_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_interval(value):
+    """
+    Parse an interval such as "15s", "2m", "1h" or a plain number of seconds.
+    """
+    match = _INTERVAL_RE.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid interval: {value!r}")
+    seconds = float(match.group(1)) * _INTERVAL_UNITS[match.group(2) or 's']
+    if seconds <= 0:
+        raise ValueError(f"Interval must be positive: {value!r}")
+    return seconds
+
+
+class Scheduler:
+    """
+    Run a task at a fixed cadence on the monotonic clock.
+
+    Runs are aligned to a fixed grid (start + n * interval), so sleep jitter and task
+    duration never accumulate into drift. If a run overruns one or more ticks, the
+    missed ticks are coalesced and the next run starts at the next grid point.
+    """
+
+    def __init__(self, interval, on_cycle=None, clock=time.monotonic):
+        self.interval = interval
+        self.on_cycle = on_cycle
+        self.clock = clock
+        self._stop = threading.Event()
+
+    def run(self, task, max_cycles=None):
+        """
+        Call task(cycle) until stop() is called or max_cycles runs have completed.
+        """
+        next_run = self.clock()
+        cycle = 0
+
+        while not self._stop.is_set():
+            started = self.clock()
+            try:
+                task(cycle)
+            except Exception as e:
+                logging.exception(f"Cycle {cycle} failed: {e}")
+            finished = self.clock()
+
+            next_run += self.interval
+            skipped = 0
+            if finished > next_run:
+                skipped = int((finished - next_run) // self.interval) + 1
+                next_run += skipped * self.interval
+
+            if self.on_cycle is not None:
+                self.on_cycle(cycle, finished - started, skipped)
+
+            cycle += 1
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+
+            self._stop.wait(max(0.0, next_run - self.clock()))
+
+    def stop(self):
+        """
+        Ask the scheduler to exit after the current run; interrupts the wait between runs.
+        """
+        self._stop.set()
+
+    def install_signal_handlers(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """
+        Stop cleanly on SIGTERM/SIGINT. Must be called from the main thread.
+        """
+        def handler(signum, frame):
+            logging.info(f"Received signal {signum}, shutting down")
+            self.stop()
+
+        for signum in signals:
+            signal.signal(signum, handler)
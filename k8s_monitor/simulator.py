@@ -0,0 +1,613 @@
+import copy
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+from kubernetes.client.exceptions import ApiException
+
+DEFAULT_NAMESPACES = 3
+DEFAULT_PODS_PER_NAMESPACE = 20
+
+# metrics-server resolution: samples only change once per window
+DEFAULT_SAMPLE_INTERVAL = 15
+
+# Length of one usage cycle (load rising and falling) in seconds
+DEFAULT_PERIOD = 3600
+
+DEFAULT_HOST = "127.0.0.1"
+
+# Upper bound on how long the HTTP stand-in holds a watch open
+MAX_WATCH_SECONDS = 60
+
+# Chance of each owner kind for a generated workload
+KIND_WEIGHTS = (("Deployment", 0.75), ("StatefulSet", 0.15), ("DaemonSet", 0.05), ("Job", 0.05))
+
+_WORDS = ("api", "web", "worker", "cache", "auth", "billing", "search", "gateway", "ingest", "reports",
+          "scheduler", "notifier", "frontend", "backend", "queue", "metrics", "payments", "catalog")
+
+# Container requests a generated workload picks from (millicores, MiB)
+_CPU_REQUESTS = (100, 250, 500, 1000)
+_MEMORY_REQUESTS = (128, 256, 512, 1024)
+_SIDECAR_REQUESTS = {"cpu": "10m", "memory": "32Mi"}
+
+# Characters Kubernetes uses for generated name suffixes
+_SUFFIX_ALPHABET = "bcdfghjklmnpqrstvwxz2456789"
+
+OwnerReference = namedtuple("OwnerReference", ["api_version", "kind", "name", "uid", "controller"])
+ObjectMeta = namedtuple("ObjectMeta", ["name", "namespace", "owner_references", "resource_version", "labels"],
+                        defaults=(None,))
+PodStatus = namedtuple("PodStatus", ["phase"])
+ResourceRequirements = namedtuple("ResourceRequirements", ["requests"])
+Container = namedtuple("Container", ["name", "resources"])
+PodSpec = namedtuple("PodSpec", ["containers"])
+Pod = namedtuple("Pod", ["metadata", "status", "spec"], defaults=(None,))
+ReplicaSet = namedtuple("ReplicaSet", ["metadata"])
+HorizontalPodAutoscaler = namedtuple("HorizontalPodAutoscaler", ["metadata", "spec"])
+ObjectList = namedtuple("ObjectList", ["metadata", "items"])
+
+
+class ListMeta:
+    # A class rather than a namedtuple: the client names the field '_continue'
+    def __init__(self, resource_version, _continue=None):
+        self.resource_version = resource_version
+        self._continue = _continue
+
+
+_API_VERSIONS = {"ReplicaSet": "apps/v1", "Deployment": "apps/v1", "StatefulSet": "apps/v1",
+                 "DaemonSet": "apps/v1", "Job": "batch/v1"}
+
+
+def _uid(*parts):
+    digest = hashlib.md5("/".join(parts).encode()).hexdigest()
+    return f"{digest[:8]}-{digest[8:12]}-{digest[12:16]}-{digest[16:20]}-{digest[20:32]}"
+
+
+def _suffix(rng, length):
+    return "".join(rng.choice(_SUFFIX_ALPHABET) for _ in range(length))
+
+
+def _parse_selector(selector):
+    """
+    Parse a field or label selector ("a=b,c!=d,e,!f") into (key, operator, value) requirements.
+    Set-based label selectors ("env in (a,b)") are not supported.
+    """
+    requirements = []
+    for term in filter(None, (part.strip() for part in selector.split(","))):
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            requirements.append((key.strip(), "!=", value.strip()))
+        elif "=" in term:
+            key, value = term.replace("==", "=", 1).split("=", 1)
+            requirements.append((key.strip(), "=", value.strip()))
+        elif term.startswith("!"):
+            requirements.append((term[1:].strip(), "!", None))
+        else:
+            requirements.append((term, "", None))
+    return requirements
+
+
+def _matches(requirements, lookup):
+    for key, operator, value in requirements:
+        actual = lookup(key)
+        if operator == "=" and actual != value:
+            return False
+        if operator == "!=" and actual == value:
+            return False
+        if operator == "!" and actual is not None:
+            return False
+        if operator == "" and actual is None:
+            return False
+    return True
+
+
+def _pod_field(pod, field):
+    if field == "metadata.name":
+        return pod.metadata.name
+    if field == "metadata.namespace":
+        return pod.metadata.namespace
+    if field == "status.phase":
+        return pod.status.phase
+    raise ApiException(status=400, reason=f"Bad Request: field label not supported: {field}")
+
+
+def _owner(kind, namespace, name):
+    return OwnerReference(_API_VERSIONS[kind], kind, name, _uid(namespace, kind, name), True)
+
+
+class SimulatedCluster:
+    """
+    Deterministic fake cluster for exercising the monitor without a real API server.
+
+    The same seed always yields the same namespaces, workloads and pods: Deployments (through
+    ReplicaSets), StatefulSets, DaemonSets and Jobs with the owner references and name
+    patterns the real controllers use. Usage rises and falls over 'period' seconds, drifts
+    per workload and is re-sampled every sample_interval seconds like metrics-server. Every
+    API call can be slowed by 'latency' seconds (plus up to 'jitter' of it at random) and
+    fails with a 503 at 'error_rate'. Use core_v1() and friends in process, or serve() to
+    reach the same data over HTTP with the real client.
+    """
+
+    def __init__(self, namespaces=DEFAULT_NAMESPACES, pods_per_namespace=DEFAULT_PODS_PER_NAMESPACE, seed=0,
+                 latency=0.0, jitter=0.5, error_rate=0.0, period=DEFAULT_PERIOD,
+                 sample_interval=DEFAULT_SAMPLE_INTERVAL, clock=time.time):
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.period = period
+        self.sample_interval = sample_interval
+        self.clock = clock
+        self.calls = Counter()
+        self._faults = random.Random(seed)
+        self._lock = threading.Lock()
+        self._resource_version = 1
+        self.hpas = {}
+
+        self.namespaces = ["default"] + [f"sim-{i}" for i in range(1, namespaces)]
+        self.pods = {}
+        self.replica_sets = {}
+        self._generate(pods_per_namespace)
+
+    def _generate(self, pods_per_namespace):
+        rng = random.Random(self.seed)
+        # Drawn separately so adding requests left the generated names unchanged
+        sizes = random.Random(self.seed + 1)
+        kinds = [kind for kind, _ in KIND_WEIGHTS]
+        weights = [weight for _, weight in KIND_WEIGHTS]
+
+        workload_index = []
+        containers = []
+        workload_requests = []
+        for namespace in self.namespaces:
+            pods = self.pods[namespace] = []
+            used = Counter()
+            while len(pods) < pods_per_namespace:
+                kind = rng.choices(kinds, weights)[0]
+                word = rng.choice(_WORDS)
+                used[word] += 1
+                name = word if used[word] == 1 else f"{word}-{used[word]}"
+                replicas = min(rng.randint(1, 8), pods_per_namespace - len(pods))
+                workload = len(containers)
+                containers.append([name] if rng.random() > 0.2 else [name, "sidecar"])
+                cpu_request, memory_request = sizes.choice(_CPU_REQUESTS), sizes.choice(_MEMORY_REQUESTS)
+                workload_requests.append((cpu_request, memory_request * 2**20))
+                requests = {"cpu": f"{cpu_request}m", "memory": f"{memory_request}Mi"}
+                spec = PodSpec([
+                    Container(container, ResourceRequirements(requests if container == name else _SIDECAR_REQUESTS))
+                    for container in containers[-1]
+                ])
+
+                labels = {"app": name}
+                if kind == "Deployment":
+                    template_hash = _suffix(rng, 10)
+                    rs_name = f"{name}-{template_hash}"
+                    labels["pod-template-hash"] = template_hash
+                    self.replica_sets[(namespace, rs_name)] = ReplicaSet(
+                        ObjectMeta(rs_name, namespace, [_owner("Deployment", namespace, name)], "1", labels))
+                    owner = _owner("ReplicaSet", namespace, rs_name)
+                    names = [f"{rs_name}-{_suffix(rng, 5)}" for _ in range(replicas)]
+                elif kind == "StatefulSet":
+                    owner = _owner(kind, namespace, name)
+                    names = [f"{name}-{i}" for i in range(replicas)]
+                else:
+                    owner = _owner(kind, namespace, name)
+                    names = [f"{name}-{_suffix(rng, 5)}" for _ in range(replicas)]
+
+                for pod_name in names:
+                    if kind == "Job":
+                        phase = "Succeeded" if rng.random() < 0.7 else "Running"
+                    else:
+                        phase = "Pending" if rng.random() < 0.05 else "Running"
+                    pods.append(Pod(ObjectMeta(pod_name, namespace, [owner], "1", labels), PodStatus(phase), spec))
+                    workload_index.append(workload)
+
+        # Per-pod usage parameters, vectorised so sampling 50k pods stays cheap
+        workloads = len(containers)
+        params = np.random.default_rng(self.seed)
+        workload_index = np.asarray(workload_index, dtype=np.intp)
+        pod_count = len(workload_index)
+        self._containers = containers
+        self._workload_index = workload_index
+        # Baselines are a share of what each workload requests, mostly below it as on a sized cluster
+        cpu_requests, memory_requests = np.asarray(workload_requests, dtype=float).reshape(-1, 2).T
+        self._base_cpu = (cpu_requests * params.lognormal(np.log(0.5), 0.4, workloads))[workload_index] * params.normal(1, 0.1, pod_count).clip(0.5)
+        self._base_memory = (memory_requests * params.lognormal(np.log(0.5), 0.3, workloads))[workload_index] * params.normal(1, 0.05, pod_count).clip(0.5)
+        self._amplitude = params.uniform(0.1, 0.6, workloads)[workload_index]
+        self._phase = params.uniform(0, 2 * np.pi, workloads)[workload_index]
+        # Fractional change of the baseline per hour, so some workloads trend up and some down
+        self._drift = params.normal(0, 0.05, workloads)[workload_index]
+        self._started = self.clock()
+
+        self._offsets = {}
+        offset = 0
+        for namespace in self.namespaces:
+            self._offsets[namespace] = offset
+            offset += len(self.pods[namespace])
+
+    def _request(self, endpoint):
+        """
+        Count an API call and apply the configured latency and error rate to it.
+        """
+        with self._lock:
+            self.calls[endpoint] += 1
+            delay = self.latency * (1 + self.jitter * self._faults.random()) if self.latency else 0
+            failed = self.error_rate and self._faults.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise ApiException(status=503, reason="Service Unavailable (simulated)")
+
+    def _next_resource_version(self):
+        with self._lock:
+            self._resource_version += 1
+            return str(self._resource_version)
+
+    def _list_meta(self):
+        return ListMeta(str(self._resource_version), None)
+
+    def list_pods(self, namespace=None, limit=None, continue_token=None, field_selector=None, label_selector=None):
+        """
+        List pods like the API server: filtered by field and label selectors, and in pages of
+        'limit' pods when a limit is given, each page's continue token leading to the next.
+        """
+        self._request("list_pods")
+        if namespace is None:
+            items = [pod for ns in self.namespaces for pod in self.pods[ns]]
+        else:
+            items = list(self.pods.get(namespace, ()))
+        if field_selector:
+            requirements = _parse_selector(field_selector)
+            items = [pod for pod in items if _matches(requirements, lambda field: _pod_field(pod, field))]
+        if label_selector:
+            requirements = _parse_selector(label_selector)
+            items = [pod for pod in items if _matches(requirements, (pod.metadata.labels or {}).get)]
+        if not limit:
+            return ObjectList(self._list_meta(), items)
+
+        start = 0
+        if continue_token:
+            try:
+                start = int(continue_token)
+            except ValueError:
+                raise ApiException(status=400, reason="Bad Request: invalid continue token")
+        end = start + limit
+        return ObjectList(ListMeta(str(self._resource_version), str(end) if end < len(items) else None), items[start:end])
+
+    def usage(self, now=None):
+        """
+        Return (cpu_millicores, memory_bytes) arrays for every pod at 'now', in namespace order.
+        """
+        now = self.clock() if now is None else now
+        window = int(now // self.sample_interval)
+        sampled_at = window * self.sample_interval
+        noise = np.random.default_rng([self.seed, window]).normal(0, 0.05, (2, len(self._base_cpu)))
+
+        hours = (sampled_at - self._started) / 3600
+        trend = np.maximum(0.1, 1 + self._drift * hours)
+        wave = np.sin(2 * np.pi * sampled_at / self.period + self._phase)
+        cpu = self._base_cpu * trend * (1 + self._amplitude * wave) * (1 + noise[0])
+        memory = self._base_memory * trend * (1 + 0.3 * self._amplitude * wave) * (1 + noise[1])
+        return np.maximum(cpu, 1), np.maximum(memory, 2**20)
+
+    def list_metrics(self, namespace=None):
+        """
+        Return a metrics.k8s.io PodMetricsList (as a dict, like CustomObjectsApi) for running pods.
+        """
+        self._request("list_metrics")
+        cpu, memory = self.usage()
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.clock()))
+        namespaces = self.namespaces if namespace is None else [namespace] if namespace in self.pods else []
+
+        items = []
+        for ns in namespaces:
+            offset = self._offsets[ns]
+            for i, pod in enumerate(self.pods[ns], offset):
+                if pod.status.phase != "Running":
+                    continue
+                names = self._containers[self._workload_index[i]]
+                # The main container gets most of the usage, a sidecar the rest
+                shares = (1.0,) if len(names) == 1 else (0.85, 0.15)
+                items.append({
+                    "metadata": {"name": pod.metadata.name, "namespace": ns},
+                    "timestamp": timestamp,
+                    "window": f"{self.sample_interval}s",
+                    "containers": [
+                        {"name": name, "usage": {"cpu": f"{int(cpu[i] * share * 1e6)}n",
+                                                 "memory": f"{int(memory[i] * share) // 1024}Ki"}}
+                        for name, share in zip(names, shares)
+                    ],
+                })
+        return {"kind": "PodMetricsList", "apiVersion": "metrics.k8s.io/v1beta1", "metadata": {}, "items": items}
+
+    def read_replica_set(self, name, namespace):
+        self._request("read_replica_set")
+        replica_set = self.replica_sets.get((namespace, name))
+        if replica_set is None:
+            raise ApiException(status=404, reason="Not Found")
+        return replica_set
+
+    def list_hpas(self, namespace):
+        self._request("list_hpas")
+        with self._lock:
+            items = [
+                HorizontalPodAutoscaler(ObjectMeta(name, ns, None, hpa["metadata"]["resourceVersion"]), copy.deepcopy(hpa["spec"]))
+                for (ns, name), hpa in sorted(self.hpas.items()) if ns == namespace
+            ]
+        return ObjectList(self._list_meta(), items)
+
+    def create_hpa(self, namespace, body):
+        self._request("create_hpa")
+        name = body["metadata"]["name"]
+        hpa = copy.deepcopy(body)
+        hpa["metadata"].update(namespace=namespace, resourceVersion=self._next_resource_version())
+        with self._lock:
+            if (namespace, name) in self.hpas:
+                raise ApiException(status=409, reason="AlreadyExists")
+            self.hpas[(namespace, name)] = hpa
+        return copy.deepcopy(hpa)
+
+    def patch_hpa(self, name, namespace, body):
+        """
+        Apply a merge patch: each top-level spec field given replaces the stored one.
+        """
+        self._request("patch_hpa")
+        resource_version = self._next_resource_version()
+        with self._lock:
+            hpa = self.hpas.get((namespace, name))
+            if hpa is None:
+                raise ApiException(status=404, reason="Not Found")
+            hpa["spec"].update(copy.deepcopy(body.get("spec", {})))
+            hpa["metadata"]["resourceVersion"] = resource_version
+            return copy.deepcopy(hpa)
+
+    def core_v1(self):
+        return SimulatedCoreV1Api(self)
+
+    def apps_v1(self):
+        return SimulatedAppsV1Api(self)
+
+    def autoscaling_v2(self):
+        return SimulatedAutoscalingV2Api(self)
+
+    def custom_objects(self):
+        return SimulatedCustomObjectsApi(self)
+
+    def serve(self, port=0, host=DEFAULT_HOST):
+        """
+        Serve the cluster over HTTP from a background thread, speaking the API paths the
+        Kubernetes client calls. Returns the server; its URL is server_url(server).
+        """
+        handler = type("SimulatorHandler", (_SimulatorHandler,), {"cluster": self})
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="cluster-simulator", daemon=True).start()
+        return server
+
+
+def server_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+class _Serializer:
+    """
+    Stands in for ApiClient.sanitize_for_serialization; simulated specs are already plain dicts.
+    """
+
+    @staticmethod
+    def sanitize_for_serialization(obj):
+        return copy.deepcopy(obj)
+
+
+class RawResponse:
+    """
+    Stands in for the urllib3 response the client returns when called with _preload_content=False.
+    """
+
+    status = 200
+
+    def __init__(self, document):
+        self.data = json.dumps(document).encode("utf-8")
+
+    def read(self):
+        return self.data
+
+    def release_conn(self):
+        pass
+
+
+class SimulatedCoreV1Api:
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def list_namespaced_pod(self, namespace, limit=None, _continue=None, field_selector=None, label_selector=None,
+                            _preload_content=True, **kwargs):
+        response = self.cluster.list_pods(namespace, limit, _continue, field_selector, label_selector)
+        return response if _preload_content else RawResponse(_pod_list_document(response))
+
+    def list_pod_for_all_namespaces(self, limit=None, _continue=None, field_selector=None, label_selector=None,
+                                    _preload_content=True, **kwargs):
+        response = self.cluster.list_pods(None, limit, _continue, field_selector, label_selector)
+        return response if _preload_content else RawResponse(_pod_list_document(response))
+
+
+class SimulatedAppsV1Api:
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def read_namespaced_replica_set(self, name, namespace, **kwargs):
+        return self.cluster.read_replica_set(name, namespace)
+
+
+class SimulatedAutoscalingV2Api:
+    api_client = _Serializer()
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def list_namespaced_horizontal_pod_autoscaler(self, namespace, **kwargs):
+        return self.cluster.list_hpas(namespace)
+
+    def create_namespaced_horizontal_pod_autoscaler(self, namespace, body, **kwargs):
+        return self.cluster.create_hpa(namespace, body)
+
+    def patch_namespaced_horizontal_pod_autoscaler(self, name, namespace, body, **kwargs):
+        return self.cluster.patch_hpa(name, namespace, body)
+
+
+class SimulatedCustomObjectsApi:
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural, **kwargs):
+        return self.cluster.list_metrics(namespace)
+
+    def list_cluster_custom_object(self, group, version, plural, **kwargs):
+        return self.cluster.list_metrics()
+
+
+def _object_meta(meta):
+    document = {"name": meta.name, "namespace": meta.namespace, "resourceVersion": meta.resource_version,
+                "uid": _uid(meta.namespace, meta.name)}
+    if meta.labels:
+        document["labels"] = dict(meta.labels)
+    if meta.owner_references:
+        document["ownerReferences"] = [
+            {"apiVersion": ref.api_version, "kind": ref.kind, "name": ref.name, "uid": ref.uid, "controller": ref.controller}
+            for ref in meta.owner_references
+        ]
+    return document
+
+
+def _pod_document(pod):
+    document = {"metadata": _object_meta(pod.metadata), "status": {"phase": pod.status.phase}}
+    if pod.spec is not None:
+        document["spec"] = {"containers": [
+            {"name": container.name, "resources": {"requests": dict(container.resources.requests)}}
+            for container in pod.spec.containers
+        ]}
+    return document
+
+
+def _list_document(kind, api_version, response, items):
+    metadata = {"resourceVersion": response.metadata.resource_version}
+    if response.metadata._continue:
+        metadata["continue"] = response.metadata._continue
+    return {"kind": kind, "apiVersion": api_version, "metadata": metadata, "items": items}
+
+
+def _pod_list_document(response):
+    return _list_document("PodList", "v1", response, [_pod_document(pod) for pod in response.items])
+
+
+_ROUTES = [
+    (re.compile(r"^/api/v1/namespaces/(?P<namespace>[^/]+)/pods$"), "GET", "pods"),
+    (re.compile(r"^/api/v1/pods$"), "GET", "pods"),
+    (re.compile(r"^/apis/metrics\.k8s\.io/v1beta1/namespaces/(?P<namespace>[^/]+)/pods$"), "GET", "metrics"),
+    (re.compile(r"^/apis/metrics\.k8s\.io/v1beta1/pods$"), "GET", "metrics"),
+    (re.compile(r"^/apis/apps/v1/namespaces/(?P<namespace>[^/]+)/replicasets/(?P<name>[^/]+)$"), "GET", "replica_set"),
+    (re.compile(r"^/apis/autoscaling/v2/namespaces/(?P<namespace>[^/]+)/horizontalpodautoscalers$"), "GET", "list_hpas"),
+    (re.compile(r"^/apis/autoscaling/v2/namespaces/(?P<namespace>[^/]+)/horizontalpodautoscalers$"), "POST", "create_hpa"),
+    (re.compile(r"^/apis/autoscaling/v2/namespaces/(?P<namespace>[^/]+)/horizontalpodautoscalers/(?P<name>[^/]+)$"), "PATCH", "patch_hpa"),
+]
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    cluster = None
+
+    def _route(self, method):
+        url = urlsplit(self.path)
+        for pattern, route_method, route in _ROUTES:
+            match = pattern.match(url.path)
+            if match and route_method == method:
+                return route, match.groupdict(), parse_qs(url.query)
+        return None, {}, {}
+
+    def _send(self, code, document):
+        body = json.dumps(document).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_status(self, code, reason):
+        self._send(code, {"kind": "Status", "apiVersion": "v1", "status": "Failure", "message": reason, "code": code})
+
+    def _watch(self, query):
+        # Pods never change, so a watch just stays open (without events) until it times out
+        timeout = min(int(query.get("timeoutSeconds", [MAX_WATCH_SECONDS])[0]), MAX_WATCH_SECONDS)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        time.sleep(timeout)
+
+    def _handle(self, method):
+        route, params, query = self._route(method)
+        if route is None:
+            self._send_status(404, "Not Found")
+            return
+
+        cluster = self.cluster
+        namespace = params.get("namespace")
+        try:
+            if route == "pods":
+                if query.get("watch", ["false"])[0] == "true":
+                    self._watch(query)
+                    return
+                limit = int(query.get("limit", ["0"])[0])
+                response = cluster.list_pods(namespace, limit, query.get("continue", [None])[0],
+                                             query.get("fieldSelector", [None])[0], query.get("labelSelector", [None])[0])
+                self._send(200, _pod_list_document(response))
+            elif route == "metrics":
+                self._send(200, cluster.list_metrics(namespace))
+            elif route == "replica_set":
+                replica_set = cluster.read_replica_set(params["name"], namespace)
+                template_hash = replica_set.metadata.name.rsplit("-", 1)[-1]
+                self._send(200, {"kind": "ReplicaSet", "apiVersion": "apps/v1", "metadata": _object_meta(replica_set.metadata),
+                                 "spec": {"selector": {"matchLabels": {"pod-template-hash": template_hash}}}})
+            elif route == "list_hpas":
+                response = cluster.list_hpas(namespace)
+                items = [{"metadata": _object_meta(hpa.metadata), "spec": hpa.spec} for hpa in response.items]
+                self._send(200, _list_document("HorizontalPodAutoscalerList", "autoscaling/v2", response, items))
+            else:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if route == "create_hpa":
+                    self._send(201, cluster.create_hpa(namespace, body))
+                else:
+                    self._send(200, cluster.patch_hpa(params["name"], namespace, body))
+        except ApiException as e:
+            self._send_status(e.status, e.reason)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def kubeconfig(server):
+    """
+    Return a kubeconfig document (as a dict) pointing the Kubernetes client at a serving simulator.
+    """
+    return {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": "simulator", "cluster": {"server": server_url(server)}}],
+        "users": [{"name": "simulator", "user": {}}],
+        "contexts": [{"name": "simulator", "context": {"cluster": "simulator", "user": "simulator"}}],
+        "current-context": "simulator",
+    }
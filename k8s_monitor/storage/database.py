@@ -1,61 +1,457 @@
 import sqlite3
-from datetime import datetime, timedelta
+import time
+from collections import namedtuple
+from k8s_monitor.utils.quantity import parse_cpu, parse_memory
+from k8s_monitor.profiling import span, DB_WRITE
 
 DB_FILE = "k8s_resource_monitor.db"
 
+SCHEMA_VERSION = 3
+
+# Samples are clustered on (namespace, pod_name, timestamp) so per-pod window
+# queries are a single range scan; one sample per pod per second is kept.
+CREATE_POD_USAGE = '''
+CREATE TABLE IF NOT EXISTS pod_usage (
+    namespace TEXT NOT NULL,
+    pod_name TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    cpu_millicores REAL,
+    memory_bytes INTEGER,
+    PRIMARY KEY (namespace, pod_name, timestamp)
+) WITHOUT ROWID
+'''
+
+# Secondary index for namespace-wide window queries across all pods
+CREATE_POD_USAGE_NAMESPACE_INDEX = '''
+CREATE INDEX IF NOT EXISTS idx_pod_usage_namespace_timestamp ON pod_usage (namespace, timestamp)
+'''
+
+INSERT_POD_USAGE = '''
+INSERT OR REPLACE INTO pod_usage (namespace, pod_name, timestamp, cpu_millicores, memory_bytes)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+# Downsampled tiers: (table, bucket width in seconds, longest window in minutes read from it)
+ROLLUP_TIERS = (
+    ("pod_usage_1m", 60, 24 * 60),
+    ("pod_usage_5m", 5 * 60, 7 * 24 * 60),
+    ("pod_usage_1h", 60 * 60, None),
+)
+
+# Windows up to this length are answered from raw samples
+RAW_QUERY_MAX_MINUTES = 120
+
+# Retention applied by compact_usage(); None keeps a tier forever
+RAW_RETENTION_MINUTES = 24 * 60
+ROLLUP_RETENTION_MINUTES = {
+    "pod_usage_1m": 2 * 24 * 60,
+    "pod_usage_5m": 14 * 24 * 60,
+    "pod_usage_1h": None,
+}
+
+CREATE_ROLLUP = '''
+CREATE TABLE IF NOT EXISTS {table} (
+    namespace TEXT NOT NULL,
+    pod_name TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    cpu_min REAL,
+    cpu_max REAL,
+    cpu_avg REAL,
+    memory_min INTEGER,
+    memory_max INTEGER,
+    memory_avg REAL,
+    PRIMARY KEY (namespace, pod_name, bucket)
+) WITHOUT ROWID
+'''
+
+# Fold each staged sample that is new to pod_usage into its bucket (a sample replacing one
+# already stored for the same second was counted then); SET expressions see the row as it
+# was before the update
+UPSERT_ROLLUP = '''
+INSERT INTO {table} (namespace, pod_name, bucket, sample_count,
+                     cpu_min, cpu_max, cpu_avg, memory_min, memory_max, memory_avg)
+SELECT namespace, pod_name, timestamp - timestamp % {width}, 1,
+       cpu_millicores, cpu_millicores, cpu_millicores, memory_bytes, memory_bytes, memory_bytes
+FROM temp.pending_usage AS pending
+WHERE cpu_millicores IS NOT NULL AND memory_bytes IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM pod_usage AS stored
+                  WHERE stored.namespace = pending.namespace AND stored.pod_name = pending.pod_name
+                    AND stored.timestamp = pending.timestamp)
+ON CONFLICT (namespace, pod_name, bucket) DO UPDATE SET
+    sample_count = sample_count + 1,
+    cpu_min = MIN(cpu_min, excluded.cpu_min),
+    cpu_max = MAX(cpu_max, excluded.cpu_max),
+    cpu_avg = (cpu_avg * sample_count + excluded.cpu_avg) / (sample_count + 1),
+    memory_min = MIN(memory_min, excluded.memory_min),
+    memory_max = MAX(memory_max, excluded.memory_max),
+    memory_avg = (memory_avg * sample_count + excluded.memory_avg) / (sample_count + 1)
+'''
+
+# Samples of one write are staged here first, which also keeps only the last sample per pod
+# and second, as pod_usage itself would
+CREATE_PENDING_USAGE = '''
+CREATE TEMP TABLE IF NOT EXISTS pending_usage (
+    namespace TEXT NOT NULL,
+    pod_name TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    cpu_millicores REAL,
+    memory_bytes INTEGER,
+    PRIMARY KEY (namespace, pod_name, timestamp)
+) WITHOUT ROWID
+'''
+
+INSERT_PENDING_USAGE = '''
+INSERT OR REPLACE INTO temp.pending_usage (namespace, pod_name, timestamp, cpu_millicores, memory_bytes)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+# compact_usage() records the raw retention it applied, so reads know what pod_usage still covers
+CREATE_USAGE_META = '''
+CREATE TABLE IF NOT EXISTS usage_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+)
+'''
+
+BACKFILL_ROLLUP = '''
+INSERT INTO {table} (namespace, pod_name, bucket, sample_count,
+                     cpu_min, cpu_max, cpu_avg, memory_min, memory_max, memory_avg)
+SELECT namespace, pod_name, (timestamp / {width}) * {width}, COUNT(*),
+       MIN(cpu_millicores), MAX(cpu_millicores), AVG(cpu_millicores),
+       MIN(memory_bytes), MAX(memory_bytes), AVG(memory_bytes)
+FROM pod_usage
+WHERE cpu_millicores IS NOT NULL AND memory_bytes IS NOT NULL
+GROUP BY namespace, pod_name, timestamp / {width}
+'''
+
+def _to_millicores(value):
+    """
+    Convert a CPU quantity or number to millicores (None if unknown, e.g. "N/A").
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    try:
+        return parse_cpu(value)
+    except ValueError:
+        return None
+
+
+def _to_bytes(value):
+    """
+    Convert a memory quantity or number to bytes (None if unknown, e.g. "N/A").
+    """
+    if value is None or isinstance(value, (int, float)):
+        return None if value is None else int(value)
+    try:
+        return parse_memory(value)
+    except ValueError:
+        return None
+
+
+def _get_schema_version(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('schema_version', 'pod_usage')")
+    tables = {row[0] for row in cursor.fetchall()}
+
+    if 'schema_version' in tables:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+        return cursor.fetchone()[0] or 0
+    if 'pod_usage' in tables:
+        # Databases created before the schema_version table existed
+        return 1
+    return 0
+
+
+def _migrate_v1_to_v2(cursor):
+    """
+    Convert the v1 TEXT pod_usage table in place to typed columns and epoch timestamps.
+    """
+    cursor.execute("ALTER TABLE pod_usage RENAME TO pod_usage_v1")
+    cursor.execute(CREATE_POD_USAGE)
+
+    # v1 timestamps were written with datetime.now(), i.e. local time
+    cursor.execute('''
+    SELECT namespace, pod_name, CAST(strftime('%s', timestamp, 'utc') AS INTEGER), cpu_usage, memory_usage
+    FROM pod_usage_v1
+    WHERE timestamp IS NOT NULL
+    ''')
+    while True:
+        batch = cursor.fetchmany(10000)
+        if not batch:
+            break
+        cursor.connection.executemany(INSERT_POD_USAGE, [
+            (namespace, pod_name, timestamp, _to_millicores(cpu), _to_bytes(memory))
+            for namespace, pod_name, timestamp, cpu, memory in batch
+        ])
+
+    cursor.execute("DROP TABLE pod_usage_v1")
+
+
+def _create_rollup_tables(cursor):
+    for table, _, _ in ROLLUP_TIERS:
+        cursor.execute(CREATE_ROLLUP.format(table=table))
+
+
+def _migrate_v2_to_v3(cursor):
+    """
+    Add the rollup tiers and fill them from the raw samples already stored.
+    """
+    _create_rollup_tables(cursor)
+    for table, width, _ in ROLLUP_TIERS:
+        cursor.execute(BACKFILL_ROLLUP.format(table=table, width=width))
+
+
+def _write_samples(conn, rows):
+    """
+    Store raw sample rows and fold them into every rollup tier, inside the caller's transaction.
+    Each (namespace, pod_name, timestamp) is aggregated once, however often it is written;
+    samples without metrics are stored but not aggregated.
+    """
+    conn.execute(CREATE_PENDING_USAGE)
+    conn.execute("DELETE FROM temp.pending_usage")
+    conn.executemany(INSERT_PENDING_USAGE, rows)
+    for table, width, _ in ROLLUP_TIERS:
+        conn.execute(UPSERT_ROLLUP.format(table=table, width=width))
+    conn.execute("INSERT OR REPLACE INTO pod_usage SELECT * FROM temp.pending_usage")
+    conn.execute("DELETE FROM temp.pending_usage")
+
+
 def init_db():
     """
-    Initialize the SQLite database, creating necessary tables.
+    Initialize the SQLite database, creating or migrating the necessary tables.
+    """
+    conn = sqlite3.connect(DB_FILE, isolation_level=None)
+    cursor = conn.cursor()
+
+    # WAL lets readers run while a batch is being written and is persistent for the file
+    cursor.execute("PRAGMA journal_mode=WAL")
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        version = _get_schema_version(cursor)
+
+        if version == 0:
+            cursor.execute(CREATE_POD_USAGE)
+            _create_rollup_tables(cursor)
+        else:
+            if version < 2:
+                _migrate_v1_to_v2(cursor)
+            if version < 3:
+                _migrate_v2_to_v3(cursor)
+
+        if version < SCHEMA_VERSION:
+            cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+            cursor.execute("DELETE FROM schema_version")
+            cursor.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+
+        cursor.execute(CREATE_POD_USAGE_NAMESPACE_INDEX)
+        cursor.execute(CREATE_USAGE_META)
+
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def log_pod_usage(pod_name, namespace, cpu_usage, memory_usage):
+    """
+    Log pod resource usage into the database with a timestamp.
+    CPU and memory may be Kubernetes quantity strings or numbers in millicores/bytes.
     """
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
-    
-    # Create a table for storing pod resource usage
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS pod_usage (
-        id INTEGER PRIMARY KEY,
-        pod_name TEXT,
-        namespace TEXT,
-        cpu_usage TEXT,
-        memory_usage TEXT,
-        timestamp TEXT
-    )
-    ''')
+
+    timestamp = int(time.time())
+    row = (namespace, pod_name, timestamp, _to_millicores(cpu_usage), _to_bytes(memory_usage))
+
+    _write_samples(conn, [row])
 
     conn.commit()
     conn.close()
 
-def log_pod_usage(pod_name, namespace, cpu_usage, memory_usage):
+
+class UsageWriter:
     """
-    Log pod resource usage into the database with a timestamp.
+    Long-lived, batching writer for pod usage samples.
+
+    Samples are buffered in memory and written with a single executemany
+    transaction on one reused WAL-mode connection. A flush happens when
+    max_rows samples are pending, when the oldest pending sample is older
+    than max_latency seconds, or when flush() is called (once per scrape cycle).
+    """
+
+    def __init__(self, db_file=None, max_rows=5000, max_latency=30.0):
+        self.db_file = db_file or DB_FILE
+        self.max_rows = max_rows
+        self.max_latency = max_latency
+        self._pending = []
+        self._oldest_pending = None
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only syncs at checkpoints instead of on every commit
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def log(self, pod_name, namespace, cpu_usage, memory_usage, timestamp=None):
+        """
+        Queue one usage sample, flushing if a size or latency threshold is reached.
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        if not self._pending:
+            self._oldest_pending = time.monotonic()
+        self._pending.append((namespace, pod_name, timestamp, _to_millicores(cpu_usage), _to_bytes(memory_usage)))
+
+        if len(self._pending) >= self.max_rows or time.monotonic() - self._oldest_pending >= self.max_latency:
+            self.flush()
+
+    def pending(self):
+        """
+        Return the number of samples waiting to be written.
+        """
+        return len(self._pending)
+
+    def flush(self):
+        """
+        Write all pending samples in one transaction and return how many were written.
+        """
+        if not self._pending:
+            return 0
+
+        rows = self._pending
+        conn = self._connection()
+        with span(DB_WRITE), conn:
+            _write_samples(conn, rows)
+
+        self._pending = []
+        self._oldest_pending = None
+        return len(rows)
+
+    def close(self):
+        """
+        Flush pending samples and close the connection.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def compact_usage(retention_minutes=None):
+    """
+    Delete raw samples older than the retention window (RAW_RETENTION_MINUTES by default)
+    and expire rollup buckets past their tier's retention. Returns the number of rows deleted per table.
     """
+    if retention_minutes is None:
+        retention_minutes = RAW_RETENTION_MINUTES
+
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
+    now = int(time.time())
+    deleted = {}
 
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute("DELETE FROM pod_usage WHERE timestamp < ?", (now - retention_minutes * 60,))
+    deleted["pod_usage"] = cursor.rowcount
+    cursor.execute(CREATE_USAGE_META)
+    cursor.execute("INSERT OR REPLACE INTO usage_meta (key, value) VALUES ('raw_retention_minutes', ?)",
+                   (str(retention_minutes),))
 
-    cursor.execute('''
-    INSERT INTO pod_usage (pod_name, namespace, cpu_usage, memory_usage, timestamp)
-    VALUES (?, ?, ?, ?, ?)
-    ''', (pod_name, namespace, cpu_usage, memory_usage, timestamp))
+    for table, _, _ in ROLLUP_TIERS:
+        tier_retention = ROLLUP_RETENTION_MINUTES.get(table)
+        if tier_retention is None:
+            continue
+        cursor.execute(f"DELETE FROM {table} WHERE bucket < ?", (now - tier_retention * 60,))
+        deleted[table] = cursor.rowcount
 
     conn.commit()
     conn.close()
 
+    return deleted
+
+
+_UsageSource = namedtuple(
+    "_UsageSource",
+    ["table", "time_column", "cpu_column", "memory_column", "cpu_average", "memory_average", "sample_filter", "width"],
+)
+
+_RAW_SOURCE = _UsageSource(
+    "pod_usage", "timestamp", "cpu_millicores", "memory_bytes",
+    "AVG(cpu_millicores)", "AVG(memory_bytes)",
+    "AND cpu_millicores IS NOT NULL AND memory_bytes IS NOT NULL", 0,
+)
+
+
+def _raw_retention(cursor):
+    """
+    Return the raw retention last applied by compact_usage(), or RAW_RETENTION_MINUTES if
+    the raw samples have never been compacted.
+    """
+    try:
+        cursor.execute("SELECT value FROM usage_meta WHERE key = 'raw_retention_minutes'")
+    except sqlite3.OperationalError:
+        # Databases not yet opened by this version's init_db()
+        return RAW_RETENTION_MINUTES
+    row = cursor.fetchone()
+    return int(row[0]) if row else RAW_RETENTION_MINUTES
+
+
+def _usage_source(cursor, duration_minutes):
+    """
+    Pick where to read a window from: raw samples for short windows the raw table still
+    covers, otherwise the rollup tier whose resolution matches the window length, ending
+    at the 1-hour tier.
+    """
+    if duration_minutes <= min(RAW_QUERY_MAX_MINUTES, _raw_retention(cursor)):
+        return _RAW_SOURCE
+
+    for table, width, max_minutes in ROLLUP_TIERS:
+        if max_minutes is None or duration_minutes <= max_minutes:
+            break
+
+    return _UsageSource(
+        table, "bucket", "cpu_avg", "memory_avg",
+        "SUM(cpu_avg * sample_count) / SUM(sample_count)",
+        "SUM(memory_avg * sample_count) / SUM(sample_count)",
+        "", width,
+    )
+
+
+def _window_start(source, duration_minutes):
+    start = int(time.time()) - duration_minutes * 60
+    if source.width:
+        # Include the bucket the window starts in
+        start -= start % source.width
+    return start
+
+
 def get_average_usage(pod_name, namespace, minutes):
     """
-    Get the average CPU and memory usage for a pod over the past 'minutes' time period.
+    Get the average CPU (millicores) and memory (bytes) usage for a pod over the past 'minutes' time period.
     """
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
 
     # Calculate the time window
-    time_threshold = (datetime.now() - timedelta(minutes=minutes)).strftime('%Y-%m-%d %H:%M:%S')
+    source = _usage_source(cursor, minutes)
+    time_threshold = _window_start(source, minutes)
 
-    cursor.execute('''
-    SELECT AVG(CAST(cpu_usage AS INTEGER)), AVG(CAST(memory_usage AS INTEGER)) FROM pod_usage
-    WHERE pod_name = ? AND namespace = ? AND timestamp >= ?
-    ''', (pod_name, namespace, time_threshold))
+    cursor.execute(f'''
+    SELECT {source.cpu_average}, {source.memory_average} FROM {source.table}
+    WHERE namespace = ? AND pod_name = ? AND {source.time_column} >= ?
+    ''', (namespace, pod_name, time_threshold))
 
     result = cursor.fetchone()
     conn.close()
@@ -66,23 +462,95 @@ def get_average_usage(pod_name, namespace, minutes):
 def get_historical_usage(pod_name, namespace, duration_minutes=60):
     """
     Fetch historical CPU and memory usage for a pod over a specified time period from the database.
+    Long periods are read from a rollup tier, one averaged entry per bucket.
+    Samples without metrics are skipped.
     """
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
 
     # Calculate the time window
-    time_threshold = (datetime.now() - timedelta(minutes=duration_minutes)).strftime('%Y-%m-%d %H:%M:%S')
+    source = _usage_source(cursor, duration_minutes)
+    time_threshold = _window_start(source, duration_minutes)
 
-    cursor.execute('''
-    SELECT CAST(cpu_usage AS INTEGER), CAST(memory_usage AS INTEGER) FROM pod_usage
-    WHERE pod_name = ? AND namespace = ? AND timestamp >= ?
-    ORDER BY timestamp ASC
-    ''', (pod_name, namespace, time_threshold))
+    cursor.execute(f'''
+    SELECT {source.time_column}, {source.cpu_column}, {source.memory_column} FROM {source.table}
+    WHERE namespace = ? AND pod_name = ? AND {source.time_column} >= ?
+    {source.sample_filter}
+    ORDER BY {source.time_column} ASC
+    ''', (namespace, pod_name, time_threshold))
 
     result = cursor.fetchall()
     conn.close()
 
     # Convert the result to a list of dictionaries
-    history = [{'cpu': cpu, 'memory': memory} for cpu, memory in result]
+    history = [{'timestamp': timestamp, 'cpu': cpu, 'memory': memory} for timestamp, cpu, memory in result]
     return history
 
+
+def _namespace_filter(namespaces):
+    """
+    Build the namespace condition and parameters for bulk queries; None matches every namespace.
+    """
+    if namespaces is None:
+        return "1", ()
+    if isinstance(namespaces, str):
+        namespaces = [namespaces]
+    namespaces = list(namespaces)
+    return f"namespace IN ({', '.join('?' * len(namespaces))})", tuple(namespaces)
+
+
+def get_bulk_average_usage(namespaces, minutes):
+    """
+    Get the average CPU and memory usage of every pod in one or more namespaces (all if None)
+    over the past 'minutes'. Returns a dictionary keyed by (namespace, pod_name), built from a single grouped query.
+    """
+    condition, params = _namespace_filter(namespaces)
+    if not params and namespaces is not None:
+        return {}
+
+    conn = sqlite3.connect(DB_FILE)
+    cursor = conn.cursor()
+
+    source = _usage_source(cursor, minutes)
+    time_threshold = _window_start(source, minutes)
+
+    cursor.execute(f'''
+    SELECT namespace, pod_name, {source.cpu_average}, {source.memory_average} FROM {source.table}
+    WHERE {condition} AND {source.time_column} >= ?
+    GROUP BY namespace, pod_name
+    ''', (*params, time_threshold))
+
+    result = cursor.fetchall()
+    conn.close()
+
+    return {(namespace, pod_name): (cpu, memory) for namespace, pod_name, cpu, memory in result}
+
+
+def get_bulk_historical_usage(namespaces, duration_minutes=60):
+    """
+    Fetch the usage history of every pod in one or more namespaces (all if None) over a specified time period.
+    Returns a dictionary keyed by (namespace, pod_name) with the same entries as get_historical_usage.
+    """
+    condition, params = _namespace_filter(namespaces)
+    if not params and namespaces is not None:
+        return {}
+
+    conn = sqlite3.connect(DB_FILE)
+    cursor = conn.cursor()
+
+    source = _usage_source(cursor, duration_minutes)
+    time_threshold = _window_start(source, duration_minutes)
+
+    cursor.execute(f'''
+    SELECT namespace, pod_name, {source.time_column}, {source.cpu_column}, {source.memory_column} FROM {source.table}
+    WHERE {condition} AND {source.time_column} >= ?
+    {source.sample_filter}
+    ORDER BY namespace, pod_name, {source.time_column} ASC
+    ''', (*params, time_threshold))
+
+    histories = {}
+    for namespace, pod_name, timestamp, cpu, memory in cursor:
+        histories.setdefault((namespace, pod_name), []).append({'timestamp': timestamp, 'cpu': cpu, 'memory': memory})
+
+    conn.close()
+    return histories
@@ -0,0 +1,185 @@
+import time
+from array import array
+from k8s_monitor.storage.database import get_bulk_historical_usage
+
+# One hour of samples at a 15 second scrape interval
+DEFAULT_CAPACITY = 240
+
+# One hour at one sample per second, the finest resolution samples are stored at
+MAX_CAPACITY = 3601
+
+
+def capacity_for(interval, minutes=60):
+    """
+    Ring capacity that holds 'minutes' of samples taken every 'interval' seconds, between
+    DEFAULT_CAPACITY and MAX_CAPACITY. Below one second samples share timestamps, so a
+    larger ring would hold no more history.
+    """
+    return min(MAX_CAPACITY, max(DEFAULT_CAPACITY, int(minutes * 60 / interval) + 1))
+
+
+class PodRingBuffer:
+    """
+    Fixed-capacity ring of (timestamp, cpu, memory) samples for one pod, backed by typed arrays.
+    Samples must be appended in timestamp order; the oldest sample is overwritten when full.
+    """
+
+    __slots__ = ("capacity", "timestamps", "cpu", "memory", "_next", "size")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0]) * capacity
+        self.cpu = array('d', [0.0]) * capacity
+        self.memory = array('d', [0.0]) * capacity
+        self._next = 0
+        self.size = 0
+
+    def append(self, timestamp, cpu, memory):
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.cpu[i] = cpu
+        self.memory[i] = memory
+        self._next = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def oldest(self):
+        """
+        Return the timestamp of the oldest retained sample, or None if empty.
+        """
+        if not self.size:
+            return None
+        return self.timestamps[(self._next - self.size) % self.capacity]
+
+    def _indices_since(self, since):
+        # Walk back from the newest sample until one falls outside the window
+        indices = []
+        i = self._next
+        for _ in range(self.size):
+            i = (i - 1) % self.capacity
+            if self.timestamps[i] < since:
+                break
+            indices.append(i)
+        indices.reverse()
+        return indices
+
+    def window(self, since):
+        """
+        Return the samples at or after 'since', oldest first, shaped like get_historical_usage.
+        """
+        return [
+            {'timestamp': int(self.timestamps[i]), 'cpu': self.cpu[i], 'memory': self.memory[i]}
+            for i in self._indices_since(since)
+        ]
+
+    def average(self, since):
+        """
+        Return (avg_cpu, avg_memory) over the samples at or after 'since', or (None, None).
+        """
+        indices = self._indices_since(since)
+        if not indices:
+            return None, None
+        count = len(indices)
+        return sum(self.cpu[i] for i in indices) / count, sum(self.memory[i] for i in indices) / count
+
+
+class RecentUsage:
+    """
+    In-memory recent usage for every monitored pod, one PodRingBuffer per pod.
+
+    Warmed from the database at startup and fed by each monitoring pass, it answers
+    window averages and short histories without touching SQLite. Windows that reach
+    further back than a pod's buffer holds fall back to the database.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers = {}
+        # Samples before this time were never loaded into memory
+        self._since = int(time.time())
+
+    def record(self, namespace, pod_name, timestamp, cpu, memory):
+        """
+        Add a sample; samples without metrics are not kept, matching the database history.
+        """
+        if cpu is None or memory is None:
+            return
+        pods = self._buffers.setdefault(namespace, {})
+        buffer = pods.get(pod_name)
+        if buffer is None:
+            buffer = pods[pod_name] = PodRingBuffer(self.capacity)
+        buffer.append(timestamp, cpu, memory)
+
+    def warm(self, namespaces=None, duration_minutes=60):
+        """
+        Load the last 'duration_minutes' of samples from the database (every namespace if None).
+        """
+        histories = get_bulk_historical_usage(namespaces, duration_minutes)
+        for (namespace, pod_name), history in histories.items():
+            for usage in history[-self.capacity:]:
+                self.record(namespace, pod_name, usage['timestamp'], usage['cpu'], usage['memory'])
+        self._since = min(self._since, int(time.time()) - duration_minutes * 60)
+
+    def retain(self, namespace, pod_names):
+        """
+        Drop the buffers of pods in a namespace that no longer exist.
+        """
+        pods = self._buffers.get(namespace)
+        if pods:
+            keep = set(pod_names)
+            for pod_name in [name for name in pods if name not in keep]:
+                del pods[pod_name]
+
+    def covers(self, namespace, pod_name, minutes):
+        """
+        Whether the last 'minutes' of a pod's samples are all held in memory.
+        """
+        start = int(time.time()) - minutes * 60
+        buffer = self._buffers.get(namespace, {}).get(pod_name)
+        if buffer is None or buffer.size < buffer.capacity:
+            return self._since <= start
+        return buffer.oldest() <= start
+
+    def covers_namespace(self, namespace, pod_names, minutes):
+        """
+        Whether the last 'minutes' of samples are held in memory for every given pod.
+        """
+        return all(self.covers(namespace, pod_name, minutes) for pod_name in pod_names)
+
+    def history(self, namespace, pod_name, duration_minutes=60):
+        buffer = self._buffers.get(namespace, {}).get(pod_name)
+        if buffer is None:
+            return []
+        return buffer.window(int(time.time()) - duration_minutes * 60)
+
+    def average(self, namespace, pod_name, minutes):
+        buffer = self._buffers.get(namespace, {}).get(pod_name)
+        if buffer is None:
+            return None, None
+        return buffer.average(int(time.time()) - minutes * 60)
+
+    def histories(self, namespace, duration_minutes=60):
+        """
+        Histories of every buffered pod in a namespace, keyed like get_bulk_historical_usage.
+        """
+        since = int(time.time()) - duration_minutes * 60
+        return {
+            (namespace, pod_name): buffer.window(since)
+            for pod_name, buffer in self._buffers.get(namespace, {}).items()
+        }
+
+    def averages(self, namespace, minutes):
+        """
+        Window averages of every buffered pod in a namespace, keyed like get_bulk_average_usage.
+        """
+        since = int(time.time()) - minutes * 60
+        return {
+            (namespace, pod_name): buffer.average(since)
+            for pod_name, buffer in self._buffers.get(namespace, {}).items()
+        }
+
+    def buffers(self, namespace):
+        """
+        The PodRingBuffers of a namespace keyed by pod name.
+        """
+        return self._buffers.get(namespace, {})
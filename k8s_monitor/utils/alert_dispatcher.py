@@ -0,0 +1,199 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+import requests
+from k8s_monitor.utils import email_config
+
+# Seconds before the same pod may alert again
+DEFAULT_COOLDOWN = 15 * 60
+
+# Digests waiting to be sent; when full, new digests are dropped instead of blocking the monitor
+DEFAULT_MAX_PENDING = 100
+
+# Seconds allowed for a single SMTP or Slack request
+SEND_TIMEOUT = 10
+
+_STOP = object()
+
+
+class EmailChannel:
+    """
+    Send digests over one SMTP session, logging in once and reconnecting only when the
+    server has dropped the connection.
+    """
+
+    name = "email"
+
+    def __init__(self, host, port, sender, password, recipient):
+        self.host = host
+        self.port = int(port)
+        self.sender = sender
+        self.password = password
+        self.recipient = recipient
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=SEND_TIMEOUT)
+        server.starttls()
+        server.login(self.sender, self.password)
+        self._server = server
+
+    def send(self, subject, message):
+        msg = MIMEText(message, 'plain')
+        msg['From'] = self.sender
+        msg['To'] = self.recipient
+        msg['Subject'] = subject
+
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self._connect()
+            self._server.send_message(msg)
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except smtplib.SMTPException:
+                pass
+            self._server = None
+
+
+class SlackChannel:
+    """
+    Post digests to a Slack webhook through a pooled requests.Session.
+    """
+
+    name = "slack"
+
+    def __init__(self, webhook_url):
+        self.webhook_url = webhook_url
+        self._session = requests.Session()
+
+    def send(self, subject, message):
+        response = self._session.post(self.webhook_url, json={"text": f"*{subject}*\n{message}"}, timeout=SEND_TIMEOUT)
+        if response.status_code != 200:
+            raise RuntimeError(f"Slack webhook returned {response.status_code}")
+
+    def close(self):
+        self._session.close()
+
+
+def channels_from_config(config):
+    """
+    Build the alert channels configured in config.json (email settings fall back to the
+    EMAIL_* environment variables).
+    """
+    channels = []
+    if "email_host" in config and "recipient_email" in config:
+        channels.append(EmailChannel(
+            config["email_host"],
+            config.get("email_port", email_config.EMAIL_PORT),
+            config.get("sender_email", email_config.SENDER_EMAIL),
+            config.get("sender_password", email_config.SENDER_PASSWORD),
+            config["recipient_email"],
+        ))
+    if "slack_webhook_url" in config:
+        channels.append(SlackChannel(config["slack_webhook_url"]))
+    return channels
+
+
+class AlertDispatcher:
+    """
+    Collect alerts during a monitoring cycle and send them from a background worker.
+
+    alert() only buffers, so scraping never waits on SMTP or Slack. end_cycle() turns the
+    buffered alerts into one digest that the worker sends to every channel. A pod that
+    alerted within the cooldown window is suppressed, and repeated alerts for one pod in a
+    cycle collapse into the latest.
+    """
+
+    def __init__(self, channels, cooldown=DEFAULT_COOLDOWN, max_pending=DEFAULT_MAX_PENDING):
+        self.channels = channels
+        self.cooldown = cooldown
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._batch = {}
+        self._suppressed = 0
+        self._last_sent = {}
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._worker.start()
+        return self
+
+    def alert(self, key, message):
+        """
+        Buffer an alert for 'key' (e.g. (namespace, pod_name)). Returns False if the key is cooling down.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_sent.get(key)
+            if last is not None and now - last < self.cooldown:
+                self._suppressed += 1
+                return False
+            self._batch[key] = message
+            return True
+
+    def end_cycle(self):
+        """
+        Queue the alerts buffered this cycle as a single digest.
+        """
+        now = time.monotonic()
+        with self._lock:
+            batch, self._batch = self._batch, {}
+            suppressed, self._suppressed = self._suppressed, 0
+            for key in batch:
+                self._last_sent[key] = now
+            # Forget keys whose cooldown has passed so the table stays bounded
+            self._last_sent = {key: sent for key, sent in self._last_sent.items() if now - sent < self.cooldown}
+
+        if not batch:
+            return
+        if suppressed:
+            logging.info(f"Suppressed {suppressed} alert(s) still in their cooldown window")
+
+        subject = f"Alert: High Resource Usage on {len(batch)} pod(s)"
+        message = "\n".join(batch.values())
+        try:
+            self._pending.put_nowait((subject, message))
+        except queue.Full:
+            logging.error(f"Alert queue full; dropped a digest for {len(batch)} pod(s)")
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is _STOP:
+                break
+            subject, message = item
+            for channel in self.channels:
+                try:
+                    channel.send(subject, message)
+                    logging.info(f"Sent {channel.name} alert digest: {subject}")
+                except Exception as e:
+                    logging.error(f"Failed to send {channel.name} alert digest: {e}")
+
+    def close(self, timeout=SEND_TIMEOUT * 3):
+        """
+        Send what is still buffered, wait for the worker to drain the queue and close the channels.
+        """
+        self.end_cycle()
+        if self._worker is not None:
+            self._pending.put(_STOP)
+            self._worker.join(timeout)
+            self._worker = None
+        for channel in self.channels:
+            channel.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,97 @@
+# k8s_monitor/utils/quantity.py
+import re
+
+# Multipliers for every suffix Kubernetes accepts, precomputed once
+_CPU_MILLICORES = {'': 1000, 'm': 1, 'u': 1e-3, 'n': 1e-6, 'k': 10**6, 'M': 10**9}
+_MEMORY_BYTES = {
+    '': 1, 'm': 1e-3, 'k': 10**3, 'M': 10**6, 'G': 10**9, 'T': 10**12, 'P': 10**15, 'E': 10**18,
+    'Ki': 2**10, 'Mi': 2**20, 'Gi': 2**30, 'Ti': 2**40, 'Pi': 2**50, 'Ei': 2**60,
+}
+
+# Only used to validate inputs the fast path cannot split
+_QUANTITY_RE = re.compile(r'^([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)([a-zA-Z]{0,2})$')
+
+
+def _split(quantity):
+    """
+    Split a quantity string into its number and suffix without a regex in the common case.
+    """
+    last = quantity[-1:]
+    if last.isdigit() or last == '.':
+        return quantity, ''
+    if last == 'i':
+        return quantity[:-2], quantity[-2:]
+    if quantity[-2:-1].isalpha():
+        # Not a valid single-letter suffix form; let the regex decide
+        match = _QUANTITY_RE.match(quantity)
+        if not match:
+            raise ValueError(f"Invalid quantity: {quantity!r}")
+        return match.group(1), match.group(2)
+    return quantity[:-1], last
+
+
+def _number(text, quantity):
+    if text.isdigit():
+        return int(text)
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Invalid quantity: {quantity!r}") from None
+
+
+def parse_cpu(quantity):
+    """
+    Convert a CPU quantity ("250m", "2", "123456789n") to millicores.
+    """
+    # Fast path for what metrics-server reports: an integer with an optional one-letter suffix
+    number = quantity[:-1]
+    if number.isdigit():
+        multiplier = _CPU_MILLICORES.get(quantity[-1])
+        if multiplier is not None:
+            return int(number) * multiplier
+    elif quantity.isdigit():
+        return int(quantity) * 1000
+
+    quantity = quantity.strip()
+    number, suffix = _split(quantity)
+    try:
+        multiplier = _CPU_MILLICORES[suffix]
+    except KeyError:
+        raise ValueError(f"Invalid CPU quantity: {quantity!r}") from None
+    return _number(number, quantity) * multiplier
+
+
+def parse_memory(quantity):
+    """
+    Convert a memory quantity ("131072Ki", "1.5Gi", "512M") to bytes.
+    """
+    # Fast path for integers with a binary suffix, the form metrics-server reports
+    number = quantity[:-2]
+    if number.isdigit():
+        multiplier = _MEMORY_BYTES.get(quantity[-2:])
+        if multiplier is not None:
+            return int(number) * multiplier
+    if quantity.isdigit():
+        return int(quantity)
+
+    quantity = quantity.strip()
+    number, suffix = _split(quantity)
+    try:
+        multiplier = _MEMORY_BYTES[suffix]
+    except KeyError:
+        raise ValueError(f"Invalid memory quantity: {quantity!r}") from None
+    return int(_number(number, quantity) * multiplier)
+
+
+def format_cpu(millicores):
+    """
+    Format a CPU value in millicores for display.
+    """
+    return "N/A" if millicores is None else f"{millicores:.0f}"
+
+
+def format_memory(memory_bytes):
+    """
+    Format a memory value in bytes as MiB for display.
+    """
+    return "N/A" if memory_bytes is None else f"{memory_bytes / (1024 * 1024):.1f}"
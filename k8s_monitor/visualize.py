@@ -1,41 +1,200 @@
-import matplotlib.pyplot as plt
 import datetime
+import os
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
-def plot_resource_trends(cpu_usage_history, memory_usage_history, pod_name):
+FIGURE_SIZE = (12, 6)
+DPI = 100
+
+# Points kept per series; roughly one per horizontal pixel of each of the two plots
+DEFAULT_MAX_POINTS = FIGURE_SIZE[0] * DPI // 2
+
+SUBPLOT_MARGINS = {'left': 0.07, 'right': 0.98, 'bottom': 0.22, 'top': 0.93, 'wspace': 0.2}
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+_SECONDS_PER_DAY = 86400
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keep 'threshold' points (including the first
+    and last) that preserve the visual shape of the series. Returns (x, y) arrays.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    every = (n - 2) / (threshold - 2)
+    # Bucket i covers [bounds[i], bounds[i + 1]); the first and last points are always kept
+    bounds = np.minimum((np.arange(threshold) * every).astype(np.intp) + 1, n)
+
+    # Prefix sums give the average point of any bucket in O(1)
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        # The next bucket's average is the third triangle vertex; after the last bucket it is the final point
+        next_start, next_end = (end, bounds[i + 2]) if i + 3 < threshold else (n - 1, n)
+        avg_x = (cx[next_end] - cx[next_start]) / (next_end - next_start)
+        avg_y = (cy[next_end] - cy[next_start]) / (next_end - next_start)
+
+        bx = x[start:end]
+        by = y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return x[selected], y[selected]
+
+
+def minmax(x, y, max_points):
+    """
+    Min/max bucketing: split the series into max_points // 2 buckets and keep each bucket's
+    lowest and highest point, in time order, so spikes are never lost.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    buckets = max_points // 2
+    if n <= max_points or buckets < 1:
+        return x, y
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.intp)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        low = start + int(np.argmin(y[start:end]))
+        high = start + int(np.argmax(y[start:end]))
+        selected.extend(sorted({low, high}))
+    selected = np.asarray(selected, dtype=np.intp)
+    return x[selected], y[selected]
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    if method == "lttb":
+        return lttb(x, y, max_points)
+    if method == "minmax":
+        return minmax(x, y, max_points)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def _history_columns(history):
+    """
+    Split [{'timestamp', 'cpu', 'memory'}] into arrays: matplotlib date numbers, millicores, MiB.
+    """
+    timestamps = np.fromiter((entry['timestamp'] for entry in history), dtype=float, count=len(history))
+    cpu = np.fromiter((entry['cpu'] for entry in history), dtype=float, count=len(history))
+    memory = np.fromiter((entry['memory'] for entry in history), dtype=float, count=len(history))
+    order = np.argsort(timestamps, kind="stable")
+    # Matplotlib date numbers are days since the Unix epoch
+    return timestamps[order] / _SECONDS_PER_DAY, cpu[order], memory[order] / (1024 * 1024)
+
+
+class TrendRenderer:
+    """
+    Render CPU and memory trend charts to image files with the Agg backend.
+
+    One Figure is reused for every chart and pyplot is never touched, so rendering works on
+    headless hosts, never blocks, and many pods can be rendered in one process.
+    """
+
+    def __init__(self, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        self.max_points = max_points
+        self.method = method
+        self.figure = Figure(figsize=FIGURE_SIZE, dpi=DPI)
+        FigureCanvasAgg(self.figure)
+        # Fixed margins instead of tight_layout(), which costs a full extra draw per chart
+        self.figure.subplots_adjust(**SUBPLOT_MARGINS)
+        self.timezone = datetime.datetime.now().astimezone().tzinfo
+
+        # Axes and line artists are created once and only get new data per chart
+        cpu_axes, memory_axes = self.figure.subplots(1, 2)
+        self._series = [
+            self._setup(cpu_axes, "CPU Usage (m)", 'b'),
+            self._setup(memory_axes, "Memory Usage (Mi)", 'g'),
+        ]
+
+    def _setup(self, axes, label, color):
+        line, = axes.plot([], [], label=label, color=color)
+        axes.xaxis_date(self.timezone)
+        axes.set_xlabel("Time")
+        axes.set_ylabel(label)
+        axes.tick_params(axis='x', labelrotation=45)
+        axes.grid(True)
+        return {'axes': axes, 'line': line, 'fill': None, 'label': label, 'color': color}
+
+    def _plot(self, series, x, y, pod_name):
+        x, y = downsample(x, y, self.max_points, self.method)
+        axes = series['axes']
+        series['line'].set_data(x, y)
+        if series['fill'] is not None:
+            series['fill'].remove()
+        series['fill'] = axes.fill_between(x, y, color=series['color'], alpha=0.1)
+        axes.relim()
+        axes.autoscale_view()
+        axes.set_title(f"{series['label'].split(' (')[0]} Trend for Pod: {pod_name}")
+
+    def render(self, history, pod_name, output):
+        """
+        Render one pod's history (as returned by get_historical_usage) to 'output'; the
+        format follows the file extension (.png, .svg, ...). Returns the output path.
+        """
+        timestamps, cpu, memory = _history_columns(history)
+        cpu_series, memory_series = self._series
+        self._plot(cpu_series, timestamps, cpu, pod_name)
+        self._plot(memory_series, timestamps, memory, pod_name)
+        self.figure.savefig(output)
+        return output
+
+
+def render_trends(history, pod_name, output, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """
+    Render one pod's CPU and memory trends to an image file.
+    """
+    return TrendRenderer(max_points, method).render(history, pod_name, output)
+
+
+def render_many(histories, output_dir, fmt="png", max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """
+    Render a chart per pod for {(namespace, pod_name): history} (as returned by
+    get_bulk_historical_usage) into output_dir as <namespace>_<pod_name>.<fmt>. Returns the paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    renderer = TrendRenderer(max_points, method)
+    paths = []
+    for (namespace, pod_name), history in sorted(histories.items()):
+        if history:
+            output = os.path.join(output_dir, f"{namespace}_{pod_name}.{fmt}")
+            paths.append(renderer.render(history, pod_name, output))
+    return paths
+
+
+def plot_resource_trends(cpu_usage_history, memory_usage_history, pod_name, timestamps=None, output=None):
     """
-    Plot CPU and memory usage trends for a specific pod.
-    :param cpu_usage_history: List of CPU usage percentages.
-    :param memory_usage_history: List of memory usage in MiB.
+    Plot CPU and memory usage trends for a specific pod to an image file.
+    :param cpu_usage_history: List of CPU usage in millicores.
+    :param memory_usage_history: List of memory usage in bytes.
     :param pod_name: Name of the pod being visualized.
+    :param timestamps: Unix timestamps of the samples (default: one per minute, ending now).
+    :param output: Image file to write (default: <pod_name>_trends.png).
     """
-    timestamps = [datetime.datetime.now() - datetime.timedelta(minutes=i * 10) for i in range(len(cpu_usage_history))]
-
-    # Reverse the timestamps to plot correctly
-    timestamps.reverse()
-    cpu_usage_history.reverse()
-    memory_usage_history.reverse()
-
-    plt.figure(figsize=(12, 6))
-
-    # Plot CPU usage trend
-    plt.subplot(1, 2, 1)
-    plt.plot(timestamps, cpu_usage_history, label="CPU Usage (%)", color='b')
-    plt.fill_between(timestamps, cpu_usage_history, color='blue', alpha=0.1)
-    plt.xlabel("Time")
-    plt.ylabel("CPU Usage (%)")
-    plt.title(f"CPU Usage Trend for Pod: {pod_name}")
-    plt.xticks(rotation=45)
-    plt.grid(True)
-
-    # Plot Memory usage trend
-    plt.subplot(1, 2, 2)
-    plt.plot(timestamps, memory_usage_history, label="Memory Usage (Mi)", color='g')
-    plt.fill_between(timestamps, memory_usage_history, color='green', alpha=0.1)
-    plt.xlabel("Time")
-    plt.ylabel("Memory Usage (Mi)")
-    plt.title(f"Memory Usage Trend for Pod: {pod_name}")
-    plt.xticks(rotation=45)
-    plt.grid(True)
-
-    plt.tight_layout()
-    plt.show()
+    if timestamps is None:
+        now = int(datetime.datetime.now().timestamp())
+        timestamps = range(now - 60 * (len(cpu_usage_history) - 1), now + 1, 60)
+    history = [
+        {'timestamp': timestamp, 'cpu': cpu, 'memory': memory}
+        for timestamp, cpu, memory in zip(timestamps, cpu_usage_history, memory_usage_history)
+    ]
+    return render_trends(history, pod_name, output or f"{pod_name}_trends.png")
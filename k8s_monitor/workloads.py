@@ -0,0 +1,77 @@
+import logging
+import time
+from collections import namedtuple
+from kubernetes.client.exceptions import ApiException
+
+# Workload kinds an HPA can target
+SCALABLE_KINDS = ("Deployment", "StatefulSet", "ReplicaSet")
+
+# Resolved ReplicaSets kept before the cache is reset
+DEFAULT_CACHE_SIZE = 10000
+
+# Seconds a failed ReplicaSet lookup is answered from its derived name before it is retried
+DEFAULT_RETRY_AFTER = 300
+
+Workload = namedtuple("Workload", ["namespace", "kind", "name"])
+
+
+class WorkloadResolver:
+    """
+    Resolve pods to the workload that owns them through ownerReferences.
+
+    Pods owned by a ReplicaSet are followed to the ReplicaSet's Deployment. ReplicaSet
+    lookups are cached because a ReplicaSet's owner never changes. Without an apps API
+    (or if a lookup fails) the Deployment name is derived from the ReplicaSet name; a failed
+    lookup is cached too and only retried after retry_after seconds.
+    """
+
+    def __init__(self, apps_v1=None, cache_size=DEFAULT_CACHE_SIZE, retry_after=DEFAULT_RETRY_AFTER):
+        self._apps_v1 = apps_v1
+        self.cache_size = cache_size
+        self.retry_after = retry_after
+        # (namespace, replica set) -> (owner, monotonic time to look it up again or None)
+        self._replica_sets = {}
+
+    def _replica_set_owner(self, namespace, replica_set):
+        key = (namespace, replica_set)
+        cached = self._replica_sets.get(key)
+        if cached is not None and (cached[1] is None or cached[1] > time.monotonic()):
+            return cached[0]
+
+        owner = None
+        if self._apps_v1 is not None:
+            try:
+                rs = self._apps_v1.read_namespaced_replica_set(replica_set, namespace)
+                references = rs.metadata.owner_references or []
+                controller = next((ref for ref in references if ref.controller), None)
+                owner = Workload(namespace, controller.kind, controller.name) if controller else Workload(namespace, "ReplicaSet", replica_set)
+            except ApiException as e:
+                logging.warning(f"Could not read ReplicaSet {namespace}/{replica_set}: {e.status}")
+            except Exception as e:
+                # Timeouts and connection errors surface from urllib3 rather than as ApiException
+                logging.warning(f"Could not read ReplicaSet {namespace}/{replica_set}: {e}")
+
+        retry_at = None
+        if owner is None:
+            # Deployments name their ReplicaSets <deployment>-<pod-template-hash>
+            owner = Workload(namespace, "Deployment", replica_set.rsplit("-", 1)[0])
+            if self._apps_v1 is not None:
+                retry_at = time.monotonic() + self.retry_after
+
+        if len(self._replica_sets) >= self.cache_size:
+            self._replica_sets.clear()
+        self._replica_sets[key] = (owner, retry_at)
+        return owner
+
+    def resolve(self, pod):
+        """
+        Return the scalable Workload owning a PodRecord, or None (e.g. bare pods, DaemonSets, Jobs).
+        """
+        if pod.owner_kind == "ReplicaSet":
+            workload = self._replica_set_owner(pod.namespace, pod.owner_name)
+        elif pod.owner_kind is not None:
+            workload = Workload(pod.namespace, pod.owner_kind, pod.owner_name)
+        else:
+            return None
+
+        return workload if workload.kind in SCALABLE_KINDS else None
@@ -25,7 +25,12 @@ setup(
         "kubernetes",
         "matplotlib",
         "requests",
+        "numpy",
     ],
+    extras_require={
+        # Faster decoding of pod lists
+        "fast": ["orjson"],
+    },
     entry_points={
         "console_scripts": [
             "k8s-monitor=k8s_monitor.cli:cli",
@@ -0,0 +1,44 @@
+from k8s_monitor import monitor
+from k8s_monitor.storage import database
+
+MIB = 1024 * 1024
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.alerts = []
+
+    def alert(self, key, message):
+        self.alerts.append((key, message))
+
+
+def _alerts(avg_cpu, avg_memory, cpu_request, memory_request):
+    dispatcher = RecordingDispatcher()
+    monitor.trigger_alerts("web-1", avg_cpu, avg_memory, {}, dispatcher=dispatcher, namespace="default",
+                           cpu_request=cpu_request, memory_request=memory_request)
+    return [message for _, message in dispatcher.alerts]
+
+
+def test_usage_is_compared_with_a_share_of_the_requests():
+    assert _alerts(300, 200 * MIB, 500, 512 * MIB) == []
+
+    [message] = _alerts(450, 200 * MIB, 500, 512 * MIB)
+    assert "CPU usage on web-1 is at 90% of its 500m request (450m) (Threshold: 80%)" in message
+    assert "Memory" not in message
+
+    [message] = _alerts(300, 400 * MIB, 500, 512 * MIB)
+    assert "Memory usage on web-1 is at 78% of its 512.0Mi request (400.0Mi) (Threshold: 75%)" in message
+
+
+def test_resources_without_requests_are_not_checked():
+    assert _alerts(5000, 4096 * MIB, None, None) == []
+
+
+def test_simulated_cluster_does_not_alert_on_every_pod(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "usage.db"))
+    dispatcher = RecordingDispatcher()
+
+    monitor.monitor_resources("default", use_mock=True, dispatcher=dispatcher)
+
+    pods = monitor.list_pods("default", use_mock=True)
+    assert len(dispatcher.alerts) < len(pods)
@@ -0,0 +1,58 @@
+from kubernetes.client.exceptions import ApiException
+from k8s_monitor import monitor
+from k8s_monitor.hpa import HPAReconciler
+from k8s_monitor.pods import PodRecord
+from k8s_monitor.simulator import SimulatedCluster
+from k8s_monitor.storage import database
+
+
+def test_connection_pool_is_sized_before_apis_are_created(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "usage.db"))
+    calls = []
+    for name in ("workload_resolver", "hpa_reconciler"):
+        original = getattr(monitor, name)
+        monkeypatch.setattr(monitor, name, lambda *args, _name=name, _original=original, **kwargs:
+                            calls.append(_name) or _original(*args, **kwargs))
+    configure = monitor.kube_client.configure
+    monkeypatch.setattr(monitor.kube_client, "configure", lambda *args, **kwargs:
+                        calls.append("configure") or configure(*args, **kwargs))
+
+    monitor.auto_scale("default", use_mock=True, dry_run=True)
+
+    assert calls[:3] == ["configure", "workload_resolver", "hpa_reconciler"]
+
+
+class RejectingAutoscalingApi:
+    """
+    Simulated autoscaling API that refuses to create the HPA for one workload.
+    """
+
+    def __init__(self, cluster, rejected):
+        self.api = cluster.autoscaling_v2()
+        self.api_client = self.api.api_client
+        self.rejected = rejected
+
+    def list_namespaced_horizontal_pod_autoscaler(self, namespace, **kwargs):
+        return self.api.list_namespaced_horizontal_pod_autoscaler(namespace, **kwargs)
+
+    def create_namespaced_horizontal_pod_autoscaler(self, namespace, body, **kwargs):
+        if body["metadata"]["name"] == self.rejected:
+            raise ApiException(status=422, reason="Unprocessable Entity")
+        return self.api.create_namespaced_horizontal_pod_autoscaler(namespace, body, **kwargs)
+
+
+def test_one_rejected_hpa_does_not_stop_the_others(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "usage.db"))
+    cluster = SimulatedCluster()
+    reconciler = HPAReconciler(RejectingAutoscalingApi(cluster, "api-hpa"))
+
+    names = ("api", "web", "worker")
+    pods = [PodRecord("default", f"{name}-0", "Running", "StatefulSet", name) for name in names]
+    # Well above the default thresholds, so every workload is scaled up
+    averages = {("default", pod.name): (500.0, 2.0**30) for pod in pods}
+    histories = {("default", pod.name): [{"cpu": 500.0, "memory": 2.0**30}] for pod in pods}
+
+    monitor.auto_scale_namespace("default", True, averages, histories, pods=pods, reconciler=reconciler,
+                                 scaling_policy={})
+
+    assert sorted(name for _, name in cluster.hpas) == ["web-hpa", "worker-hpa"]
@@ -0,0 +1,71 @@
+import sqlite3
+import time
+import pytest
+from k8s_monitor.storage import database
+from k8s_monitor.storage.database import UsageWriter, init_db, compact_usage, get_bulk_average_usage
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "usage.db"))
+    init_db()
+    return database.DB_FILE
+
+
+def _rollup_counts(db_file, table):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute(f"SELECT SUM(sample_count), MAX(cpu_max) FROM {table}").fetchone()
+    finally:
+        conn.close()
+
+
+def _raw_count(db_file):
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM pod_usage").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_duplicate_samples_in_one_batch_are_folded_once(db):
+    now = int(time.time())
+    with UsageWriter() as writer:
+        writer.log("web-1", "default", 100, 2**20, now)
+        writer.log("web-1", "default", 300, 2**20, now)
+        writer.log("web-1", "default", 200, 2**20, now + 1)
+
+    assert _raw_count(db) == 2
+    for table, _, _ in database.ROLLUP_TIERS:
+        count, cpu_max = _rollup_counts(db, table)
+        assert count == 2
+        # The last sample of the second wins, as in pod_usage
+        assert cpu_max == 300
+
+
+def test_samples_replacing_stored_ones_are_not_counted_again(db):
+    now = int(time.time())
+    with UsageWriter() as writer:
+        writer.log("web-1", "default", 100, 2**20, now)
+        writer.flush()
+        writer.log("web-1", "default", 100, 2**20, now)
+
+    assert _raw_count(db) == 1
+    for table, _, _ in database.ROLLUP_TIERS:
+        assert _rollup_counts(db, table)[0] == 1
+
+
+def test_windows_beyond_compacted_raw_retention_read_rollups(db):
+    now = int(time.time())
+    with UsageWriter() as writer:
+        for minutes_ago in (50, 40, 5):
+            writer.log("web-1", "default", 100 * minutes_ago, 2**20, now - minutes_ago * 60)
+
+    compact_usage(retention_minutes=30)
+    assert _raw_count(db) == 1
+
+    # 60 minutes would be answered from raw samples, which now only cover 30 of them
+    cpu, memory = get_bulk_average_usage(["default"], 60)[("default", "web-1")]
+    assert cpu == pytest.approx((5000 + 4000 + 500) / 3)
+    cpu, _ = get_bulk_average_usage(["default"], 20)[("default", "web-1")]
+    assert cpu == 500
@@ -0,0 +1,90 @@
+import re
+from k8s_monitor import monitor
+from k8s_monitor.exporter import MetricsRegistry
+from k8s_monitor.recommendation import ScalingDecision, SCALE_UP
+from k8s_monitor.storage import database
+from k8s_monitor.workloads import Workload
+
+METRIC_NAME = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+
+
+def _text(registry):
+    registry.publish()
+    return registry.snapshot().decode("utf-8")
+
+
+def _samples(text):
+    return [line for line in text.splitlines() if line and not line.startswith("#")]
+
+
+def test_exposition_format():
+    registry = MetricsRegistry()
+    registry.update_pods("default", [("web-1", 250, 2**20), ("no-metrics", None, None)])
+    registry.update_recommendations("default", [Workload("default", "Deployment", "web")],
+                                    [ScalingDecision("web", SCALE_UP, 2, 90.0, 40.0)])
+    registry.observe("list_pods", 0.02)
+    text = _text(registry)
+
+    assert text.endswith("\n")
+    families = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name = line.split()[2]
+            families.setdefault(name, []).append("HELP")
+        elif line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            assert kind in ("gauge", "histogram")
+            families.setdefault(name, []).append("TYPE")
+    assert families == {name: ["HELP", "TYPE"] for name in (
+        "k8s_monitor_pod_cpu_millicores", "k8s_monitor_pod_memory_bytes",
+        "k8s_monitor_scaling_recommendation", "k8s_monitor_phase_duration_seconds",
+    )}
+
+    samples = _samples(text)
+    for line in samples:
+        name = line.split("{", 1)[0]
+        assert METRIC_NAME.match(name)
+        assert any(name == family or name.startswith(family + "_") for family in families)
+    assert 'k8s_monitor_pod_cpu_millicores{namespace="default",pod="web-1"} 250.0' in samples
+    assert 'k8s_monitor_pod_memory_bytes{namespace="default",pod="web-1"} 1048576.0' in samples
+    assert ('k8s_monitor_scaling_recommendation{namespace="default",kind="Deployment",workload="web",'
+            'action="scale_up"} 2') in samples
+    assert 'k8s_monitor_phase_duration_seconds_bucket{phase="list_pods",le="+Inf"} 1' in samples
+    assert 'k8s_monitor_phase_duration_seconds_count{phase="list_pods"} 1' in samples
+    assert not any("no-metrics" in line for line in samples)
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.update_pods('odd"ns', [('a\\b\nc"d', 1, 1)])
+
+    [line] = [line for line in _samples(_text(registry)) if line.startswith("k8s_monitor_pod_cpu")]
+    assert line == 'k8s_monitor_pod_cpu_millicores{namespace="odd\\"ns",pod="a\\\\b\\nc\\"d"} 1.0'
+
+
+def test_namespaces_no_longer_monitored_are_dropped():
+    registry = MetricsRegistry()
+    registry.update_pods("default", [("web-1", 1, 1)])
+    registry.update_pods("gone", [("old-1", 1, 1)])
+    registry.update_recommendations("gone", [Workload("gone", "Deployment", "old")],
+                                    [ScalingDecision("old", SCALE_UP, 1, 90.0, 40.0)])
+
+    registry.retain_namespaces(["default"])
+
+    text = _text(registry)
+    assert 'namespace="default"' in text
+    assert 'namespace="gone"' not in text
+
+
+def test_monitoring_another_namespace_drops_the_old_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "usage.db"))
+    registry = MetricsRegistry()
+    monkeypatch.setattr(monitor, "REGISTRY", registry)
+
+    monitor.monitor_resources("default", use_mock=True)
+    assert 'namespace="default"' in _text(registry)
+
+    monitor.monitor_resources("sim-1", use_mock=True)
+    text = _text(registry)
+    assert 'namespace="sim-1"' in text
+    assert 'namespace="default"' not in text
@@ -0,0 +1,42 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+import pytest
+from k8s_monitor.monitor import fetch_namespaces, _result_within
+
+
+def test_slow_namespace_times_out_and_the_others_come_back():
+    release = threading.Event()
+
+    def fetch(ns):
+        if ns == "slow":
+            release.wait()
+        return ns
+
+    try:
+        results = list(fetch_namespaces(["fast", "slow", "also-fast"], fetch, concurrency=3, timeout=0.2))
+    finally:
+        release.set()
+
+    assert [(ns, pods) for ns, pods, error in results if error is None] == [("fast", "fast"), ("also-fast", "also-fast")]
+    [(ns, _, error)] = [result for result in results if result[2] is not None]
+    assert ns == "slow"
+    assert isinstance(error, FuturesTimeoutError)
+
+
+def test_timeout_counts_from_when_the_fetch_started():
+    # Started an hour ago with an hour allowed: already overdue, however long the caller waited
+    started = time.monotonic() - 3601
+    with pytest.raises(FuturesTimeoutError):
+        _result_within(Future(), lambda: started, timeout=3600)
+
+
+def test_time_spent_queued_does_not_count():
+    def fetch(ns):
+        time.sleep(1.2)
+        return ns
+
+    # Together the fetches exceed the timeout, but each one alone is well within it
+    results = list(fetch_namespaces(["first", "queued"], fetch, concurrency=1, timeout=2.0))
+
+    assert results == [("first", "first", None), ("queued", "queued", None)]
@@ -0,0 +1,57 @@
+from k8s_monitor.hpa import CREATE, PATCH, UNCHANGED, HPAReconciler, desired_spec, diff_spec, hpa_name
+from k8s_monitor.simulator import SimulatedCluster
+
+
+def test_unchanged_spec_needs_no_patch():
+    spec = desired_spec("Deployment", "web", 80, 70)
+    current = dict(spec, metrics=list(reversed(spec["metrics"])))
+    del current["minReplicas"]
+
+    # Metric order and the defaulted minReplicas do not count as changes
+    assert diff_spec(current, spec) == {}
+
+
+def test_changed_fields_give_a_minimal_patch():
+    current = desired_spec("Deployment", "web", 80)
+
+    assert diff_spec(current, desired_spec("Deployment", "web", 80, max_replicas=20)) == {"maxReplicas": 20}
+    assert diff_spec(current, desired_spec("Deployment", "web", 80, min_replicas=2)) == {"minReplicas": 2}
+    desired = desired_spec("Deployment", "web", 30)
+    assert diff_spec(current, desired) == {"metrics": desired["metrics"]}
+
+
+def test_missing_hpa_is_created_then_patched_then_left_alone():
+    cluster = SimulatedCluster()
+    reconciler = HPAReconciler(cluster.autoscaling_v2())
+
+    change = reconciler.reconcile("default", "Deployment", "web", 80)
+    assert (change.action, change.name) == (CREATE, hpa_name("web"))
+    assert cluster.hpas[("default", "web-hpa")]["spec"] == desired_spec("Deployment", "web", 80)
+
+    change = reconciler.reconcile("default", "Deployment", "web", 30)
+    assert change.action == PATCH
+    assert list(change.body["spec"]) == ["metrics"]
+
+    assert reconciler.reconcile("default", "Deployment", "web", 30).action == UNCHANGED
+
+
+def test_each_namespace_is_listed_once_per_reconciler():
+    cluster = SimulatedCluster()
+    reconciler = HPAReconciler(cluster.autoscaling_v2())
+
+    for name in ("web", "api", "worker"):
+        reconciler.reconcile("default", "Deployment", name, 80)
+        reconciler.reconcile("sim-1", "Deployment", name, 80)
+    reconciler.reconcile("default", "Deployment", "web", 30)
+
+    assert cluster.calls["list_hpas"] == 2
+    assert cluster.calls["create_hpa"] == 6
+    assert cluster.calls["patch_hpa"] == 1
+
+
+def test_dry_run_plans_without_writing():
+    cluster = SimulatedCluster()
+    reconciler = HPAReconciler(cluster.autoscaling_v2(), dry_run=True)
+
+    assert reconciler.reconcile("default", "Deployment", "web", 80).action == CREATE
+    assert cluster.hpas == {}
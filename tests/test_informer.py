@@ -0,0 +1,56 @@
+from k8s_monitor.informer import PodInformer
+from k8s_monitor.monitor import list_pods, mock_cluster
+
+
+def _informer(max_pods):
+    informer = PodInformer(mock_cluster().core_v1(), namespaces=["default"], max_pods=max_pods, page_size=7)
+    informer.relist()
+    return informer
+
+
+def test_full_cache_reports_overflow():
+    informer = _informer(max_pods=5)
+
+    assert len(informer) == 5
+    assert informer.overflowed()
+
+
+def test_cache_holding_every_pod_is_not_overflowed():
+    informer = _informer(max_pods=1000)
+
+    assert len(informer) == len(list_pods("default", use_mock=True))
+    assert not informer.overflowed()
+
+
+def test_pods_are_listed_from_the_api_when_the_cache_overflowed():
+    informer = _informer(max_pods=5)
+
+    pods = list_pods("default", use_mock=True, informer=informer)
+    assert len(pods) == len(list_pods("default", use_mock=True)) > 5
+
+
+def _pod_event(event_type, pod, resource_version):
+    metadata = pod.metadata._replace(resource_version=resource_version)
+    return {"type": event_type, "object": pod._replace(metadata=metadata)}
+
+
+def test_bookmark_then_added_then_deleted():
+    informer = _informer(max_pods=1000)
+    count = len(informer)
+    pod = mock_cluster().pods["sim-1"][0]
+    pod = pod._replace(metadata=pod.metadata._replace(namespace="default", name="new-pod"))
+
+    # As the client yields it: the object is left as a dict with only a resourceVersion
+    bookmark = {"kind": "Pod", "apiVersion": "v1", "metadata": {"resourceVersion": "100"}}
+    informer._apply({"type": "BOOKMARK", "object": bookmark, "raw_object": bookmark})
+    assert informer._resource_version == "100"
+    assert len(informer) == count
+
+    informer._apply(_pod_event("ADDED", pod, "101"))
+    assert "new-pod" in [record.name for record in informer.list_pods("default")]
+    assert informer._resource_version == "101"
+
+    informer._apply(_pod_event("DELETED", pod, "102"))
+    assert "new-pod" not in [record.name for record in informer.list_pods("default")]
+    assert len(informer) == count
+    assert informer._resource_version == "102"
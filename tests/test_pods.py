@@ -0,0 +1,80 @@
+from k8s_monitor.pods import ACTIVE_PODS_SELECTOR, PodRecord, list_pages, iter_pods, pod_record_from_dict
+from k8s_monitor.simulator import SimulatedCluster
+
+MIB = 1024 * 1024
+
+
+def test_pod_record_from_dict_reads_owner_and_sums_requests():
+    document = {
+        "metadata": {
+            "name": "web-5d8f7c9b4-abcde",
+            "namespace": "default",
+            "ownerReferences": [
+                {"kind": "Node", "name": "node-1"},
+                {"kind": "ReplicaSet", "name": "web-5d8f7c9b4", "controller": True},
+            ],
+        },
+        "spec": {"containers": [
+            {"name": "web", "resources": {"requests": {"cpu": "250m", "memory": "128Mi"}}},
+            {"name": "sidecar", "resources": {"requests": {"cpu": "0.01"}}},
+            {"name": "init", "resources": {}},
+        ]},
+        "status": {"phase": "Running"},
+    }
+
+    assert pod_record_from_dict(document) == PodRecord(
+        "default", "web-5d8f7c9b4-abcde", "Running", "ReplicaSet", "web-5d8f7c9b4", 260, 128 * MIB)
+
+
+def test_pod_record_from_dict_without_owner_spec_or_status():
+    document = {"metadata": {"name": "bare", "namespace": "default"}}
+
+    assert pod_record_from_dict(document) == PodRecord("default", "bare", None, None, None, None, None)
+
+
+class RecordingList:
+    """
+    Wraps a list call, remembering its arguments and whether each raw response was released.
+    """
+
+    def __init__(self, list_func):
+        self.list_func = list_func
+        self.calls = []
+        self.released = 0
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        response = self.list_func(**kwargs)
+        if not kwargs.get("_preload_content", True):
+            release_conn = response.release_conn
+
+            def release():
+                self.released += 1
+                release_conn()
+            response.release_conn = release
+        return response
+
+
+def test_raw_pages_follow_the_continue_token_and_release_each_response():
+    v1 = SimulatedCluster().core_v1()
+    list_func = RecordingList(v1.list_namespaced_pod)
+
+    pages = list(list_pages(list_func, page_size=7, raw=True, namespace="default"))
+
+    names = [pod["metadata"]["name"] for page in pages for pod in page["items"]]
+    assert len(pages) == len(list_func.calls) == list_func.released > 1
+    assert len(names) == len(set(names)) == len(v1.list_namespaced_pod("default", field_selector=ACTIVE_PODS_SELECTOR).items)
+    assert all(call["_preload_content"] is False and call["limit"] == 7 for call in list_func.calls)
+    assert "_continue" not in list_func.calls[0]
+    assert [call["_continue"] for call in list_func.calls[1:]] == [page["metadata"]["continue"] for page in pages[:-1]]
+    assert not pages[-1]["metadata"].get("continue")
+
+
+def test_raw_and_model_pods_give_the_same_records():
+    v1 = SimulatedCluster().core_v1()
+
+    raw = list(iter_pods(v1.list_pod_for_all_namespaces, page_size=9, label_selector="app"))
+    models = list(iter_pods(v1.list_pod_for_all_namespaces, page_size=9, label_selector="app", raw=False))
+
+    assert raw == models
+    assert all(record.cpu_request and record.memory_request for record in raw)
@@ -0,0 +1,41 @@
+import pytest
+from k8s_monitor.utils.quantity import parse_cpu, parse_memory
+
+
+@pytest.mark.parametrize("quantity, millicores", [
+    ("250m", 250),
+    ("2", 2000),
+    ("0.5", 500),
+    ("123456789n", 123.456789),
+    ("500u", 0.5),
+    ("1k", 10**6),
+    ("1e3", 10**6),
+    (" 100m ", 100),
+])
+def test_parse_cpu(quantity, millicores):
+    assert parse_cpu(quantity) == pytest.approx(millicores)
+
+
+@pytest.mark.parametrize("quantity, size", [
+    ("131072Ki", 131072 * 2**10),
+    ("1.5Gi", 3 * 2**29),
+    ("512M", 512 * 10**6),
+    ("12E", 12 * 10**18),
+    ("1024", 1024),
+    ("1e3", 1000),
+    (" 100Mi ", 100 * 2**20),
+])
+def test_parse_memory(quantity, size):
+    assert parse_memory(quantity) == size
+
+
+@pytest.mark.parametrize("quantity", ["", "5i", "1Xi", "abc", "12E", "1.2.3"])
+def test_parse_cpu_rejects(quantity):
+    with pytest.raises(ValueError):
+        parse_cpu(quantity)
+
+
+@pytest.mark.parametrize("quantity", ["", "5i", "1Xi", "abc", "123456789n", "1.2.3"])
+def test_parse_memory_rejects(quantity):
+    with pytest.raises(ValueError):
+        parse_memory(quantity)
@@ -0,0 +1,65 @@
+import pytest
+from k8s_monitor.recommendation import (
+    SCALE_DOWN, SCALE_UP, NO_SCALING, averages_columns, history_columns, recommend, recommend_batch,
+)
+
+POLICY = {"cpu_threshold": 60, "memory_threshold": 50, "max_replicas_change": 3}
+
+
+def _samples(*pairs):
+    return [{"cpu": cpu, "memory": memory} for cpu, memory in pairs]
+
+
+# (avg_cpu, avg_memory, history) per pod
+CASES = {
+    "no averages": (None, None, _samples((90, 90))),
+    "idle": (0, 0, _samples((90, 90))),
+    "empty history": (10, 10, []),
+    "single sample up": (10, 10, _samples((95, 10))),
+    "single sample down": (10, 10, _samples((5, 5))),
+    "cpu at threshold": (10, 10, _samples((60, 10))),
+    "memory at threshold": (10, 10, _samples((10, 50))),
+    "both at threshold": (10, 10, _samples((60, 50))),
+    "just above cpu": (10, 10, _samples((60.5, 10))),
+    "memory only above": (10, 10, _samples((10, 80))),
+    "capped up": (10, 10, _samples((500, 10), (700, 10))),
+    "capped down": (10, 10, _samples((0, 1), (0, 1), (0, 1))),
+    "mixed history": (10, 10, _samples((40, 20), (80, 60), (55, 30))),
+}
+
+
+def _batch(cases):
+    keys = list(cases)
+    averages = {key: cases[key][:2] for key in keys}
+    histories = {key: cases[key][2] for key in keys}
+    avg_cpu, avg_memory = averages_columns(keys, averages)
+    return recommend_batch(keys, avg_cpu, avg_memory, *history_columns(keys, histories), POLICY)
+
+
+def test_batch_matches_scalar_recommendation():
+    batch = list(_batch(CASES))
+
+    for decision, (key, (avg_cpu, avg_memory, history)) in zip(batch, CASES.items()):
+        expected = recommend(key, avg_cpu, avg_memory, POLICY, history)
+        assert decision.key == expected.key
+        assert (decision.action, decision.replicas) == (expected.action, expected.replicas), key
+        if expected.cpu_trend is None:
+            assert decision.cpu_trend is None and decision.memory_trend is None, key
+        else:
+            assert decision.cpu_trend == pytest.approx(expected.cpu_trend), key
+            assert decision.memory_trend == pytest.approx(expected.memory_trend), key
+
+
+def test_threshold_values_are_not_scaled():
+    decisions = {decision.key: decision.action for decision in _batch(CASES)}
+
+    assert decisions["both at threshold"] == NO_SCALING
+    assert decisions["cpu at threshold"] == NO_SCALING
+    assert decisions["memory at threshold"] == NO_SCALING
+    assert decisions["just above cpu"] == SCALE_UP
+    assert decisions["single sample down"] == SCALE_DOWN
+    assert decisions["empty history"] == NO_SCALING
+
+
+def test_empty_batch():
+    assert list(_batch({})) == []
@@ -0,0 +1,13 @@
+from k8s_monitor.storage.ring_buffer import DEFAULT_CAPACITY, MAX_CAPACITY, capacity_for
+
+
+def test_capacity_holds_an_hour_of_samples():
+    assert capacity_for(15) == 241
+    assert capacity_for(5) == 721
+    assert capacity_for(600) == DEFAULT_CAPACITY
+
+
+def test_capacity_is_capped_for_sub_second_intervals():
+    assert capacity_for(1) == MAX_CAPACITY
+    assert capacity_for(0.1) == MAX_CAPACITY
+    assert capacity_for(0.001) == MAX_CAPACITY
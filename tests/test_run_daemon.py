@@ -0,0 +1,37 @@
+from k8s_monitor import monitor
+from k8s_monitor.config import save_config
+from k8s_monitor.config_store import CONFIG_DIR_ENV
+from k8s_monitor.informer import PodInformer
+from k8s_monitor.namespace_config import save_namespaces
+from k8s_monitor.storage import database
+
+
+def test_settings_changed_while_running_take_effect_next_cycle(tmp_path, monkeypatch):
+    monkeypatch.setenv(CONFIG_DIR_ENV, str(tmp_path / "config"))
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "usage.db"))
+    save_namespaces({"namespaces": ["default"]})
+
+    def start_pod_informer(namespaces, *args):
+        # Relisted but not watching, so the test needs no API server
+        informer = PodInformer(monitor.mock_cluster().core_v1(), namespaces)
+        informer.relist()
+        return informer
+    monkeypatch.setattr(monitor, "start_pod_informer", start_pod_informer)
+
+    seen = []
+
+    def monitor_resources(*args, informer=None, dispatcher=None, **kwargs):
+        seen.append((informer, dispatcher))
+        if len(seen) == 1:
+            save_namespaces({"namespaces": ["default", "sim-1"]})
+            save_config({"slack_webhook_url": "http://127.0.0.1:9/hook"})
+    monkeypatch.setattr(monitor, "monitor_resources", monitor_resources)
+
+    monitor.run_daemon(0.01, max_cycles=2)
+
+    (first_informer, first_dispatcher), (informer, dispatcher) = seen
+    assert first_dispatcher is None
+    assert [channel.name for channel in dispatcher.channels] == ["slack"]
+    assert first_informer.list_pods("sim-1") == []
+    assert informer is not first_informer
+    assert informer.list_pods("sim-1")
@@ -0,0 +1,59 @@
+import pytest
+from k8s_monitor.scheduler import Scheduler, parse_interval
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        return False
+
+
+def _run(durations, interval=10, jitter=0.0):
+    """
+    Run one cycle per duration on a fake clock; each wait oversleeps by 'jitter'.
+    Returns the start time of each cycle and what on_cycle was told.
+    """
+    clock = FakeClock()
+    reports = []
+    starts = []
+
+    def task(cycle):
+        starts.append(clock.now)
+        clock.now += durations[cycle]
+
+    scheduler = Scheduler(interval, on_cycle=lambda *report: reports.append(report), clock=clock)
+    scheduler._stop.wait = lambda seconds: clock.sleep(seconds + jitter)
+    scheduler.run(task, max_cycles=len(durations))
+    return [start - 1000.0 for start in starts], reports
+
+
+def test_runs_stay_on_the_grid_despite_task_time_and_jitter():
+    starts, reports = _run([3, 7.5, 1, 9.5], jitter=0.2)
+
+    # Each run is late by the oversleep only, never by the sum of earlier delays
+    assert starts == pytest.approx([0, 10.2, 20.2, 30.2])
+    assert [skipped for _, _, skipped in reports] == [0, 0, 0, 0]
+
+
+def test_overrunning_cycle_is_coalesced_not_replayed():
+    starts, reports = _run([2, 35, 2, 2])
+
+    # The 35s run covers the ticks at 20, 30 and 40; one run follows at 50, none catch up
+    assert starts == pytest.approx([0, 10, 50, 60])
+    assert [(duration, skipped) for _, duration, skipped in reports] == [(2, 0), (35, 3), (2, 0), (2, 0)]
+
+
+def test_parse_interval():
+    assert parse_interval("15s") == 15
+    assert parse_interval("2m") == 120
+    assert parse_interval("250ms") == 0.25
+    assert parse_interval("5") == 5
+    for value in ("0s", "-1s", "soon"):
+        with pytest.raises(ValueError):
+            parse_interval(value)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from k8s_monitor.visualize import downsample, lttb, minmax
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float) * 15
+    y = np.sin(x / 600) * 100 + rng.normal(0, 10, n)
+    return x, y
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("n", [0, 1, 2, 50, 100])
+def test_short_series_pass_through(method, n):
+    x, y = _series(n)
+    out_x, out_y = downsample(x, y, 100, method)
+
+    assert np.array_equal(out_x, x) and np.array_equal(out_y, y)
+
+
+@pytest.mark.parametrize("threshold", [3, 10, 99, 600])
+def test_lttb_keeps_endpoints_and_returns_threshold_points(threshold):
+    x, y = _series(5000)
+    out_x, out_y = lttb(x, y, threshold)
+
+    assert len(out_x) == len(out_y) == threshold
+    assert (out_x[0], out_y[0]) == (x[0], y[0])
+    assert (out_x[-1], out_y[-1]) == (x[-1], y[-1])
+    assert np.all(np.diff(out_x) > 0)
+    # Every kept point is a point of the input
+    assert np.array_equal(out_y, y[np.searchsorted(x, out_x)])
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _series(5000)
+    y[1234] = 1e6
+    y[4321] = -1e6
+    out_x, out_y = minmax(x, y, 100)
+
+    assert len(out_x) <= 100
+    assert np.all(np.diff(out_x) > 0)
+    assert out_y.max() == 1e6 and out_y.min() == -1e6
+    edges = np.linspace(0, len(x), 51).astype(np.intp)
+    kept = set(out_x)
+    for start, end in zip(edges[:-1], edges[1:]):
+        assert x[start + np.argmax(y[start:end])] in kept
+        assert x[start + np.argmin(y[start:end])] in kept
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        downsample([1, 2, 3], [1, 2, 3], 2, "mean")
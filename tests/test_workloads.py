@@ -0,0 +1,43 @@
+from urllib3.exceptions import ReadTimeoutError
+from kubernetes.client.exceptions import ApiException
+from k8s_monitor.pods import PodRecord
+from k8s_monitor.workloads import Workload, WorkloadResolver
+
+
+class FailingAppsApi:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def read_namespaced_replica_set(self, name, namespace):
+        self.calls += 1
+        raise self.error
+
+
+def _pod(name):
+    return PodRecord("default", name, "Running", "ReplicaSet", "web-5d8f7c9b4")
+
+
+def test_failed_lookup_is_cached():
+    apps = FailingAppsApi(ApiException(status=403))
+    resolver = WorkloadResolver(apps)
+
+    for name in ("web-5d8f7c9b4-abcde", "web-5d8f7c9b4-fghij"):
+        assert resolver.resolve(_pod(name)) == Workload("default", "Deployment", "web")
+    assert apps.calls == 1
+
+
+def test_failed_lookup_is_retried_later():
+    apps = FailingAppsApi(ApiException(status=404))
+    resolver = WorkloadResolver(apps, retry_after=0)
+
+    resolver.resolve(_pod("web-5d8f7c9b4-abcde"))
+    resolver.resolve(_pod("web-5d8f7c9b4-fghij"))
+    assert apps.calls == 2
+
+
+def test_transport_errors_fall_back_to_the_derived_name():
+    apps = FailingAppsApi(ReadTimeoutError(None, "/apis/apps/v1", "Read timed out."))
+    resolver = WorkloadResolver(apps)
+
+    assert resolver.resolve(_pod("web-5d8f7c9b4-abcde")) == Workload("default", "Deployment", "web")